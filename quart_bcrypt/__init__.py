@@ -8,7 +8,36 @@ A Quart extension providing bcrypt hashing and comparison facilities.
     :license: MIT, see LICENSE for more details.
 """
 
+from .adaptive import AdaptiveLimiter, LimitChange
+from .backends import (
+    BcryptBackend,
+    HashBackend,
+    HashInfo,
+    ScryptBackend,
+    parse_hash,
+    parse_hashes,
+    register_backend
+)
+from .cache import VerificationCache
+from .coalesce import CheckCoalescer
 from .core import Bcrypt
+from .exceptions import (
+    BcryptOverloaded,
+    BcryptRateLimited,
+    BcryptTimeout
+)
+from .executor import HashingExecutor
+from .instrumentation import (
+    HashEvent,
+    HashObserver,
+    Histogram,
+    InMemoryMetrics
+)
+from .limits import AdmissionController
+from .pepper import PepperKeyring
+from .ratelimit import MemoryRateLimitStore, RateLimiter, RateLimitStore
+from .salts import SaltPool
+from .sidecar import SidecarClient, SidecarUnavailable
 
 from .helpers import (
     generate_password_hash,
@@ -18,7 +47,34 @@ from .helpers import (
 )
 
 __all__ = (
+    'AdaptiveLimiter',
+    'AdmissionController',
     'Bcrypt',
+    'BcryptBackend',
+    'BcryptOverloaded',
+    'BcryptRateLimited',
+    'BcryptTimeout',
+    'CheckCoalescer',
+    'HashBackend',
+    'HashEvent',
+    'HashInfo',
+    'HashObserver',
+    'HashingExecutor',
+    'Histogram',
+    'InMemoryMetrics',
+    'LimitChange',
+    'MemoryRateLimitStore',
+    'PepperKeyring',
+    'RateLimitStore',
+    'RateLimiter',
+    'SaltPool',
+    'ScryptBackend',
+    'SidecarClient',
+    'SidecarUnavailable',
+    'VerificationCache',
+    'parse_hash',
+    'parse_hashes',
+    'register_backend',
     'generate_password_hash',
     'check_password_hash',
     'async_generate_password_hash',
@@ -0,0 +1,189 @@
+"""
+quart_bcrypt.adaptive
+"""
+from __future__ import annotations
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, List, NamedTuple, Optional
+import math
+
+from .limits import AdmissionController
+
+
+class LimitChange(NamedTuple):
+    '''
+    Describes a change of the concurrency limit by an
+    :class:`AdaptiveLimiter`.
+
+    :param old: The limit before the change.
+    :param new: The limit after the change.
+    :param reason: Why the limit changed.
+    :param ratio: The mean ratio of the recent compute times to their
+        baseline that led to the change.
+    '''
+
+    old: int
+    new: int
+    reason: str
+    ratio: float
+
+
+class AdaptiveLimiter(object):
+    '''
+    Adjusts the concurrency limit of an :class:`AdmissionController` from
+    the compute time of the jobs it admits, in the manner of TCP's additive
+    increase and multiplicative decrease. While the jobs take as long as
+    they do on an idle host, more of them are let through at once; once
+    they slow down, because they compete for CPU with each other or with
+    other work on the host, the limit is cut::
+
+        limiter = AdaptiveLimiter(admission, max_limit=16)
+        limiter.observe(('2b', 12), compute_time)
+
+    Compute times are compared with a baseline kept for each kind of job,
+    such as each bcrypt cost, as those take very different times. The
+    baseline follows the fastest times seen and creeps up slowly towards
+    slower ones, so it adapts to a host that became slower for good. After
+    every `window` jobs the mean ratio of their times to the baseline is
+    compared with `tolerance`: above it the limit is multiplied by
+    `backoff`, otherwise it is raised by one if the jobs used every slot.
+    Each change is recorded in :attr:`changes` with its reason.
+
+    :param admission: The admission controller to adjust.
+    :param min_limit: The lowest limit. Defaults to one more than the slots
+        reserved for interactive calls.
+    :param max_limit: The highest limit. Defaults to the current limit.
+    :param window: The number of jobs between decisions.
+    :param tolerance: The ratio to the baseline above which the limit is
+        cut.
+    :param backoff: The factor the limit is cut by.
+    :param history: The number of changes kept in :attr:`changes`.
+    '''
+
+    def __init__(
+        self,
+        admission: AdmissionController,
+        min_limit: Optional[int] = None,
+        max_limit: Optional[int] = None,
+        window: int = 20,
+        tolerance: float = 1.5,
+        backoff: float = 0.75,
+        history: int = 32
+    ) -> None:
+        if min_limit is None:
+            min_limit = admission.reserved + 1
+        if max_limit is None:
+            max_limit = admission.max_concurrency
+
+        if not admission.reserved < min_limit <= max_limit:
+            raise ValueError(
+                'min_limit must be greater than the reserved slots and at '
+                'most max_limit.'
+                )
+        if window < 1:
+            raise ValueError('window must be greater than 0.')
+        if not 0 < backoff < 1:
+            raise ValueError('backoff must be between 0 and 1.')
+
+        self.admission = admission
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.window = window
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.changes: Deque[LimitChange] = deque(maxlen=history)
+        self._baselines: Dict[Hashable, float] = {}
+        self._ratios: List[float] = []
+        self._saturated = False
+
+        if not min_limit <= admission.max_concurrency <= max_limit:
+            admission.resize(
+                min(max(admission.max_concurrency, min_limit), max_limit))
+
+    @property
+    def limit(self) -> int:
+        '''
+        The current concurrency limit.
+        '''
+        return self.admission.max_concurrency
+
+    @property
+    def reason(self) -> Optional[str]:
+        '''
+        The reason of the last change, or None if there was none.
+        '''
+        return self.changes[-1].reason if self.changes else None
+
+    def observe(
+        self,
+        kind: Hashable,
+        compute_time: float
+    ) -> Optional[LimitChange]:
+        '''
+        Records the compute time of a job that just released its slot, and
+        returns the change of the limit it led to, if any.
+
+        :param kind: What the job was, such as the prefix and cost of its
+            hash. Only times of the same kind are compared.
+        :param compute_time: The seconds the job spent in the worker.
+        '''
+        if compute_time <= 0:
+            return None
+
+        baseline = self._baselines.get(kind, compute_time)
+        if compute_time < baseline:
+            baseline = compute_time
+        else:
+            baseline += (compute_time - baseline) * 0.01
+        self._baselines[kind] = baseline
+
+        self._ratios.append(compute_time / baseline)
+        # The limit is only worth raising if the jobs use every slot, which
+        # is the case if calls are waiting or this job held the last one.
+        admission = self.admission
+        if (admission.queued
+                or admission.in_flight + 1 >= admission.max_concurrency):
+            self._saturated = True
+
+        if len(self._ratios) < self.window:
+            return None
+
+        ratio = sum(self._ratios) / len(self._ratios)
+        saturated = self._saturated
+        self._ratios = []
+        self._saturated = False
+
+        old = self.limit
+        if ratio > self.tolerance:
+            new = max(self.min_limit, math.floor(old * self.backoff))
+            reason = (
+                f'compute time rose to {ratio:.2f}x its baseline, '
+                f'above {self.tolerance:.2f}x'
+            )
+        elif saturated:
+            new = min(self.max_limit, old + 1)
+            reason = (
+                f'compute time held at {ratio:.2f}x its baseline with every '
+                f'slot in use'
+            )
+        else:
+            return None
+
+        if new == old:
+            return None
+
+        admission.resize(new)
+        change = LimitChange(old, new, reason, ratio)
+        self.changes.append(change)
+        return change
+
+    def stats(self) -> Dict[str, Any]:
+        '''
+        Returns the current limit, its bounds and the reason of the last
+        change.
+        '''
+        return {
+            'limit': self.limit,
+            'min_limit': self.min_limit,
+            'max_limit': self.max_limit,
+            'reason': self.reason,
+        }
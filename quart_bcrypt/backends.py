@@ -0,0 +1,482 @@
+"""
+quart_bcrypt.backends
+"""
+from __future__ import annotations
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Protocol,
+    Tuple,
+    Union
+)
+import base64
+import hashlib
+import os
+import re
+
+import bcrypt
+
+#: The `(backend, prefix, cost, pepper, prehash)` of a hash, which decide
+#: whether it needs a new one.
+HashSettings = Tuple[str, str, int, Optional[str], Optional[str]]
+
+
+class HashInfo(object):
+    '''
+    The parts of a password hash, as returned by :func:`parse_hash`.
+
+    :param backend: The name of the backend that made the hash.
+    :param prefix: The algorithm version, such as `'2b'` or `'scrypt'`.
+    :param cost: The cost factor, the base 2 logarithm of the work.
+    :param salt: The encoded salt.
+    :param checksum: The encoded checksum, or None for a salt.
+    :param prehash: The hash the password was pre-hashed with, such as
+        `'sha256'`, or None if the hash is not tagged.
+    :param pepper: The id of the pepper key the password was combined
+        with, or None if the hash is not peppered.
+    '''
+
+    __slots__ = (
+        'backend', 'prefix', 'cost', 'salt', 'checksum', 'prehash', 'pepper'
+    )
+
+    def __init__(
+        self,
+        backend: str,
+        prefix: str,
+        cost: int,
+        salt: bytes,
+        checksum: Optional[bytes] = None,
+        prehash: Optional[str] = None,
+        pepper: Optional[str] = None
+    ) -> None:
+        self.backend = backend
+        self.prefix = prefix
+        self.cost = cost
+        self.salt = salt
+        self.checksum = checksum
+        self.prehash = prehash
+        self.pepper = pepper
+
+    @property
+    def settings(self) -> HashSettings:
+        '''
+        The `(backend, prefix, cost, pepper, prehash)` of the hash, as
+        compared by :meth:`Bcrypt.is_outdated`.
+        '''
+        return (
+            self.backend, self.prefix, self.cost, self.pepper, self.prehash
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f'HashInfo(backend={self.backend!r}, prefix={self.prefix!r}, '
+            f'cost={self.cost!r}, prehash={self.prehash!r}, '
+            f'pepper={self.pepper!r})'
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, HashInfo):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name)
+            for name in self.__slots__
+        )
+
+
+class HashBackend(Protocol):
+    '''
+    The interface of a password hashing algorithm usable by :class:`Bcrypt`.
+
+    Every backend works like `bcrypt.hashpw`: :meth:`gensalt` returns a
+    setting string holding the parameters and salt, and :meth:`hashpw`
+    hashes a password with either a setting string or a complete hash, which
+    starts with the setting string. Checking a password is then a constant
+    time comparison of `hashpw(password, pw_hash)` with `pw_hash`. Hashes
+    have the form `$<ident>$...`, and the `ident` tells which backend made
+    them.
+
+    :meth:`format_salt` builds a salt from `salt_size` random bytes given by
+    the caller, which lets a :class:`SaltPool` read the randomness for many
+    salts at once.
+
+    :meth:`parse` reads a hash or setting string without hashing anything,
+    raising `ValueError` if it is malformed.
+
+    `hashpw` is run in the hashing pool, so for process pools the backend
+    must be picklable.
+    '''
+
+    #: The name used to select the backend with `BCRYPT_BACKEND`.
+    name: str
+    #: The identifiers found between the first two `$` of its hashes.
+    idents: Tuple[str, ...]
+    #: The prefix used when `BCRYPT_HASH_PREFIX` is not set.
+    default_prefix: str
+    #: The cost used when `BCRYPT_LOG_ROUNDS` is not set.
+    default_rounds: int
+    #: The lowest and highest valid costs.
+    min_rounds: int
+    max_rounds: int
+    #: The number of random bytes in a salt.
+    salt_size: int
+
+    def gensalt(self, rounds: int, prefix: bytes) -> bytes:
+        ...
+
+    def format_salt(self, rounds: int, prefix: bytes, raw: bytes) -> bytes:
+        ...
+
+    def hashpw(self, password: bytes, salt: bytes) -> bytes:
+        ...
+
+    def parse(self, pw_hash: bytes) -> HashInfo:
+        ...
+
+
+class BcryptBackend(object):
+    '''
+    Hashes passwords with bcrypt. The cost is the base 2 logarithm of the
+    number of rounds, and the prefix one of `2a`, `2b` or `2y`.
+    '''
+
+    name = 'bcrypt'
+    idents: Tuple[str, ...] = ('2a', '2b', '2y')
+    default_prefix = '2b'
+    default_rounds = 12
+    min_rounds = 4
+    max_rounds = 31
+    salt_size = 16
+
+    def gensalt(self, rounds: int, prefix: bytes) -> bytes:
+        '''
+        Generates a bcrypt salt.
+
+        :param rounds: The number of rounds.
+        :param prefix: The algorithm version to use.
+        '''
+        return bcrypt.gensalt(rounds=rounds, prefix=prefix)
+
+    def format_salt(self, rounds: int, prefix: bytes, raw: bytes) -> bytes:
+        '''
+        Builds the same salt as `bcrypt.gensalt` from the given random
+        bytes.
+
+        :param rounds: The number of rounds.
+        :param prefix: The algorithm version to use.
+        :param raw: `salt_size` random bytes.
+        '''
+        if prefix not in (b'2a', b'2b'):
+            raise ValueError("Supported prefixes are b'2a' or b'2b'")
+
+        if not self.min_rounds <= rounds <= self.max_rounds:
+            raise ValueError('Invalid rounds')
+
+        encoded = base64.b64encode(raw)[:22].translate(_BCRYPT_ALPHABET)
+        return b'$%s$%02d$%s' % (prefix, rounds, encoded)
+
+    def hashpw(self, password: bytes, salt: bytes) -> bytes:
+        '''
+        Hashes a password with `bcrypt.hashpw`.
+
+        :param password: The prepared password.
+        :param salt: A salt or a complete hash.
+        '''
+        return bcrypt.hashpw(password, salt)
+
+    def parse(self, pw_hash: bytes) -> HashInfo:
+        '''
+        Parses a bcrypt hash or salt.
+
+        :param pw_hash: The encoded hash.
+        '''
+        match = _BCRYPT_HASH.match(pw_hash)
+        if match is None:
+            raise ValueError('Invalid bcrypt hash.')
+
+        prefix, cost, salt, checksum = match.groups()
+        cost = int(cost)
+        if not self.min_rounds <= cost <= self.max_rounds:
+            raise ValueError('Invalid bcrypt cost.')
+        return HashInfo(
+            self.name, prefix.decode('ascii'), cost, salt, checksum
+            )
+
+
+_BCRYPT_HASH = re.compile(
+    rb'\$(2[aby])\$(\d\d)\$([./A-Za-z0-9]{22})([./A-Za-z0-9]{31})?\Z'
+    )
+_SCRYPT_HASH = re.compile(
+    rb'\$scrypt\$ln=(\d{1,2}),r=(\d+),p=(\d+)\$([A-Za-z0-9+/]+)'
+    rb'(?:\$([A-Za-z0-9+/]+))?\Z'
+    )
+_BCRYPT_ALPHABET = bytes.maketrans(
+    b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/',
+    b'./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
+    )
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.b64encode(data).rstrip(b'=')
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.b64decode(data + b'=' * (-len(data) % 4), validate=True)
+
+
+def scrypt_hashpw(
+    password: bytes,
+    salt: bytes,
+    dklen: int = 32
+) -> bytes:
+    '''
+    Hashes a password with `hashlib.scrypt` in the format
+    `$scrypt$ln=<log2 N>,r=<r>,p=<p>$<salt>$<checksum>`, which is also used
+    by passlib. The salt and checksum are base64 encoded without padding.
+    Like `bcrypt.hashpw`, `salt` may be a setting string or a complete hash.
+
+    :param password: The prepared password.
+    :param salt: A setting string or a complete hash.
+    :param dklen: The length of the derived key.
+    '''
+    try:
+        _, ident, params, salt_text = salt.split(b'$')[:4]
+        settings = dict(
+            param.split(b'=', 1) for param in params.split(b',')
+            )
+        ln, r, p = (int(settings[name]) for name in (b'ln', b'r', b'p'))
+        raw_salt = _b64decode(salt_text)
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Invalid salt') from None
+
+    if ident != b'scrypt' or not 0 < ln < 64:
+        raise ValueError('Invalid salt')
+
+    n = 1 << ln
+    key = hashlib.scrypt(
+        password, salt=raw_salt, n=n, r=r, p=p, dklen=dklen,
+        maxmem=256 * r * n + 1024 * 1024
+        )
+    return b'$scrypt$%s$%s$%s' % (params, salt_text, _b64encode(key))
+
+
+class ScryptBackend(object):
+    '''
+    Hashes passwords with the memory hard scrypt algorithm from
+    :mod:`hashlib`. The cost is the base 2 logarithm of the CPU and memory
+    cost `N`, and each hash uses about `128 * r * N` bytes of memory.
+
+    :param r: The block size.
+    :param p: The parallelization factor.
+    '''
+
+    name = 'scrypt'
+    idents: Tuple[str, ...] = ('scrypt',)
+    default_prefix = 'scrypt'
+    default_rounds = 15
+    min_rounds = 1
+    max_rounds = 31
+    salt_size = 16
+
+    def __init__(self, r: int = 8, p: int = 1) -> None:
+        self.r = r
+        self.p = p
+
+    def gensalt(self, rounds: int, prefix: bytes) -> bytes:
+        '''
+        Generates a scrypt setting string.
+
+        :param rounds: The base 2 logarithm of `N`.
+        :param prefix: Must be `scrypt`.
+        '''
+        return self.format_salt(rounds, prefix, os.urandom(self.salt_size))
+
+    def format_salt(self, rounds: int, prefix: bytes, raw: bytes) -> bytes:
+        '''
+        Builds a scrypt setting string from the given random bytes.
+
+        :param rounds: The base 2 logarithm of `N`.
+        :param prefix: Must be `scrypt`.
+        :param raw: `salt_size` random bytes.
+        '''
+        if prefix != b'scrypt':
+            raise ValueError('Supported prefixes are scrypt.')
+
+        if not self.min_rounds <= rounds <= self.max_rounds:
+            raise ValueError('Invalid rounds')
+
+        return b'$scrypt$ln=%d,r=%d,p=%d$%s' % (
+            rounds, self.r, self.p, _b64encode(raw)
+            )
+
+    def hashpw(self, password: bytes, salt: bytes) -> bytes:
+        '''
+        Hashes a password with :func:`scrypt_hashpw`.
+
+        :param password: The prepared password.
+        :param salt: A setting string or a complete hash.
+        '''
+        return scrypt_hashpw(password, salt)
+
+    def parse(self, pw_hash: bytes) -> HashInfo:
+        '''
+        Parses a scrypt hash or setting string.
+
+        :param pw_hash: The encoded hash.
+        '''
+        match = _SCRYPT_HASH.match(pw_hash)
+        if match is None:
+            raise ValueError('Invalid scrypt hash.')
+
+        ln, _, _, salt, checksum = match.groups()
+        cost = int(ln)
+        if not self.min_rounds <= cost <= self.max_rounds:
+            raise ValueError('Invalid scrypt cost.')
+        return HashInfo(self.name, 'scrypt', cost, salt, checksum)
+
+
+#: The tag put in front of hashes of passwords pre-hashed with SHA-256.
+PREHASH_TAG = b'$sha256'
+#: The tag put in front of hashes of peppered passwords, followed by the
+#: key id, as in `$pepper$<key id>$2b$12$...`.
+PEPPER_TAG = b'$pepper'
+
+_KEY_ID = re.compile(rb'[A-Za-z0-9_-]{1,32}')
+
+BACKENDS: Dict[str, HashBackend] = {}
+_BY_IDENT: Dict[bytes, HashBackend] = {}
+
+
+def register_backend(backend: HashBackend) -> None:
+    '''
+    Registers a backend, so it may be selected by name with
+    `BCRYPT_BACKEND` and its hashes are recognized when checking passwords.
+
+    :param backend: The backend to register.
+    '''
+    BACKENDS[backend.name] = backend
+    for ident in backend.idents:
+        _BY_IDENT[ident.encode('ascii')] = backend
+
+
+def get_backend(backend: Union[str, HashBackend]) -> HashBackend:
+    '''
+    Returns a registered backend by name. A backend object is returned
+    as is.
+
+    :param backend: The name of a backend or a backend.
+    '''
+    if not isinstance(backend, str):
+        return backend
+
+    try:
+        return BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f'Unknown backend {backend!r}. Registered backends are '
+            f'{", ".join(BACKENDS)}.'
+            ) from None
+
+
+def identify(pw_hash: bytes) -> HashBackend:
+    '''
+    Returns the backend that made a hash from the identifier at its start,
+    without trying each backend in turn.
+
+    :param pw_hash: The encoded hash.
+    '''
+    parts = pw_hash.split(b'$', 2)
+    backend = _BY_IDENT.get(parts[1]) if len(parts) == 3 else None
+
+    if parts[0] or backend is None:
+        raise ValueError('Invalid salt')
+    return backend
+
+
+register_backend(BcryptBackend())
+register_backend(ScryptBackend())
+
+
+def split_tags(
+    pw_hash: bytes
+) -> Tuple[bytes, Optional[str], Optional[str]]:
+    '''
+    Splits the long password and pepper tags off a hash. A hash tagged
+    `$sha256$2b$12$...` was made from the hex SHA-256 digest of the
+    password, and one tagged `$pepper$<key id>$2b$12$...` from the hex
+    HMAC-SHA256 of the password under that pepper key, instead of the
+    password itself. Returns the hash without the tags, the name of the
+    pre-hash or None, and the pepper key id or None.
+
+    :param pw_hash: The encoded hash.
+    '''
+    pepper = None
+    if pw_hash.startswith(PEPPER_TAG + b'$'):
+        key_id, _, rest = pw_hash[len(PEPPER_TAG) + 1:].partition(b'$')
+        if _KEY_ID.fullmatch(key_id) and rest:
+            pw_hash = b'$' + rest
+            pepper = key_id.decode('ascii')
+
+    if pw_hash.startswith(PREHASH_TAG + b'$'):
+        return pw_hash[len(PREHASH_TAG):], 'sha256', pepper
+    return pw_hash, None, pepper
+
+
+def parse_hash(pw_hash: Union[str, bytes]) -> HashInfo:
+    '''
+    Parses a password hash into its backend, prefix, cost, salt, checksum
+    and tags without hashing anything, so it takes
+    microseconds. Raises `ValueError` if the hash is malformed or not made
+    by a registered backend::
+
+        info = parse_hash(user.pw_hash)
+        info.cost  # 12
+
+    :param pw_hash: The encoded hash.
+    '''
+    if isinstance(pw_hash, str):
+        pw_hash = pw_hash.encode('ascii', 'replace')
+
+    pw_hash, prehash, pepper = split_tags(pw_hash)
+    info = identify(pw_hash).parse(pw_hash)
+    if info.checksum is None:
+        raise ValueError('The hash has no checksum.')
+    info.prehash = prehash
+    info.pepper = pepper
+    return info
+
+
+def parse_hashes(
+    pw_hashes: Iterable[Union[str, bytes]]
+) -> Iterator[Optional[HashInfo]]:
+    '''
+    Parses a column of hashes, such as one read from a database export,
+    yielding a :class:`HashInfo` for each hash or None if it is malformed.
+    The hashes are read lazily, so the column does not need to fit in
+    memory.
+
+    :param pw_hashes: The encoded hashes.
+    '''
+    by_ident = _BY_IDENT
+    for pw_hash in pw_hashes:
+        if isinstance(pw_hash, str):
+            pw_hash = pw_hash.encode('ascii', 'replace')
+
+        pw_hash, prehash, pepper = split_tags(pw_hash)
+        parts = pw_hash.split(b'$', 2)
+        backend = by_ident.get(parts[1]) if len(parts) == 3 else None
+        if backend is None or parts[0]:
+            yield None
+            continue
+
+        try:
+            info = backend.parse(pw_hash)
+        except ValueError:
+            yield None
+            continue
+        info.prehash = prehash
+        info.pepper = pepper
+        yield info if info.checksum is not None else None
@@ -0,0 +1,269 @@
+"""
+quart_bcrypt.batch
+"""
+from __future__ import annotations
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union
+)
+import asyncio
+import hmac
+
+from .backends import HashBackend, identify
+from .executor import HashingExecutor
+
+
+def check_chunk(pairs: List[Tuple[bytes, bytes]]) -> List[bool]:
+    '''
+    Checks a chunk of `(pw_hash, password)` pairs in one job, each with
+    the backend that made its hash. This is a module level function working
+    on bytes only, so it may be sent to a process pool.
+
+    :param pairs: The encoded hashes and prepared passwords.
+    '''
+    return [
+        hmac.compare_digest(
+            identify(pw_hash).hashpw(password, pw_hash), pw_hash)
+        for pw_hash, password in pairs
+    ]
+
+
+def hash_chunk(
+    passwords: List[bytes],
+    backend: HashBackend,
+    rounds: int,
+    prefix: bytes,
+    tag: bytes = b''
+) -> List[bytes]:
+    '''
+    Hashes a chunk of passwords in one job, generating each salt in the
+    worker. This is a module level function working on bytes only, so it
+    may be sent to a process pool.
+
+    :param passwords: The prepared passwords.
+    :param backend: The backend to hash with.
+    :param rounds: The number of rounds.
+    :param prefix: The algorithm version to use.
+    :param tag: The long password tag to put in front of each hash.
+    '''
+    return [
+        tag + backend.hashpw(password, backend.gensalt(rounds, prefix))
+        for password in passwords
+    ]
+
+
+def iter_chunks(
+    source: Iterable[Any],
+    size: int,
+    prepare: Callable[[Any], Any]
+) -> Iterator[List[Any]]:
+    '''
+    Lazily splits an iterable into lists of `size` prepared items.
+
+    :param source: The items to split.
+    :param size: The number of items per chunk.
+    :param prepare: A callable applied to each item.
+    '''
+    if size < 1:
+        raise ValueError('chunk_size must be greater than 0.')
+
+    chunk: List[Any] = []
+    for item in source:
+        chunk.append(prepare(item))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+async def aiter_chunks(
+    source: Union[Iterable[Any], AsyncIterable[Any]],
+    size: int,
+    prepare: Callable[[Any], Any]
+) -> AsyncIterator[List[Any]]:
+    """
+    Lazily splits an iterable or async iterable into lists of `size`
+    prepared items.
+
+    :param source: The items to split.
+    :param size: The number of items per chunk.
+    :param prepare: A callable applied to each item.
+    """
+    if not isinstance(source, AsyncIterable):
+        for items in iter_chunks(source, size, prepare):
+            yield items
+        return
+
+    if size < 1:
+        raise ValueError('chunk_size must be greater than 0.')
+
+    chunk: List[Any] = []
+    async for item in source:
+        chunk.append(prepare(item))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def _flush(
+    ready: Dict[int, List[Any]],
+    offset: int
+) -> Tuple[List[Tuple[int, Any]], int]:
+    '''
+    Pops the finished chunks that continue the ordered output at `offset`.
+
+    :param ready: Finished chunk results keyed by their first index.
+    :param offset: The index of the next result to yield.
+    '''
+    results: List[Tuple[int, Any]] = []
+    while offset in ready:
+        chunk = ready.pop(offset)
+        results.extend(enumerate(chunk, offset))
+        offset += len(chunk)
+    return results, offset
+
+
+def stream_chunks(
+    executor: HashingExecutor,
+    func: Callable[[List[Any]], List[Any]],
+    chunks: Iterator[List[Any]],
+    window: int,
+    ordered: bool = True,
+    limit: Optional[int] = None
+) -> Iterator[Tuple[int, Any]]:
+    '''
+    Runs `func` on each chunk in the executor and yields `(index, result)`
+    for every item. At most `window` chunks are submitted or held back for
+    ordering at once, so memory stays bounded for any input size, and at
+    most `limit` of them are submitted at once, which leaves the rest of
+    the pool to other jobs.
+
+    :param executor: The executor to run the chunks in.
+    :param func: The job run on each chunk.
+    :param chunks: The chunks of prepared items.
+    :param window: The maximum number of chunks in flight.
+    :param ordered: Yield results in input order rather than as they finish.
+    :param limit: The maximum number of chunks submitted to the executor at
+        once. Defaults to `window`.
+    '''
+    if limit is None:
+        limit = window
+
+    pending: Dict[Future, int] = {}
+    ready: Dict[int, List[Any]] = {}
+    start = offset = 0
+    exhausted = False
+
+    try:
+        while True:
+            while (
+                not exhausted
+                and len(pending) < limit
+                and len(pending) + len(ready) < window
+            ):
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                pending[executor.submit(func, chunk)] = start
+                start += len(chunk)
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                first = pending.pop(future)
+                if ordered:
+                    ready[first] = future.result()
+                else:
+                    yield from enumerate(future.result(), first)
+
+            if ordered:
+                results, offset = _flush(ready, offset)
+                yield from results
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def astream_chunks(
+    run: Callable[..., Awaitable[Any]],
+    func: Callable[[List[Any]], List[Any]],
+    chunks: AsyncIterator[List[Any]],
+    window: int,
+    ordered: bool = True,
+    limit: Optional[int] = None
+) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    The async version of :func:`stream_chunks`. Each chunk is passed to
+    `run`, which is expected to apply admission control before running
+    `func` in the executor. Keeping `limit` to the slots the chunks may
+    hold means they never wait for admission behind each other.
+
+    :param run: The coroutine function running a job.
+    :param func: The job run on each chunk.
+    :param chunks: The chunks of prepared items.
+    :param window: The maximum number of chunks in flight.
+    :param ordered: Yield results in input order rather than as they finish.
+    :param limit: The maximum number of chunks passed to `run` at once.
+        Defaults to `window`.
+    """
+    if limit is None:
+        limit = window
+
+    pending: Dict[asyncio.Future, int] = {}
+    ready: Dict[int, List[Any]] = {}
+    start = offset = 0
+    exhausted = False
+
+    try:
+        while True:
+            while (
+                not exhausted
+                and len(pending) < limit
+                and len(pending) + len(ready) < window
+            ):
+                chunk = await anext(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                pending[asyncio.ensure_future(run(func, chunk))] = start
+                start += len(chunk)
+
+            if not pending:
+                break
+
+            done, _ = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                first = pending.pop(task)
+                if ordered:
+                    ready[first] = task.result()
+                else:
+                    for result in enumerate(task.result(), first):
+                        yield result
+
+            if ordered:
+                results, offset = _flush(ready, offset)
+                for result in results:
+                    yield result
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,335 @@
+"""
+quart_bcrypt.bench
+
+Measures the throughput and latency of the sync and async hashing paths
+for each combination of the given options and prints the results as JSON::
+
+    python -m quart_bcrypt.bench --rounds 10 12 --concurrency 1 8 \\
+        --executor thread process --workers 1 2 4 --long-passwords off on \\
+        --salt-pool off on
+
+Every result records its parameters along with `ops_per_sec` and the
+`p50`, `p95`, `p99` and mean latency in milliseconds. Pass `--format table`
+for a human readable summary instead.
+"""
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import version
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+from quart import Quart
+
+from .core import Bcrypt
+
+OPERATIONS = ('hash', 'check')
+MODES = ('sync', 'async')
+PASSWORD = 'correct horse battery staple'
+
+
+def percentile(values: List[float], pct: float) -> float:
+    '''
+    Returns the `pct` percentile of sorted `values` using the nearest rank
+    method.
+
+    :param values: The sorted values.
+    :param pct: The percentile, between 0 and 100.
+    '''
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, Any]:
+    '''
+    Summarizes the latencies of a run, in seconds, as throughput and
+    latency percentiles in milliseconds.
+
+    :param latencies: The latency of each operation.
+    :param elapsed: The wall clock time of the whole run.
+    '''
+    values = sorted(latency * 1000 for latency in latencies)
+    return {
+        'ops_per_sec': round(len(values) / elapsed, 2),
+        'latency_ms': {
+            'p50': round(percentile(values, 50), 3),
+            'p95': round(percentile(values, 95), 3),
+            'p99': round(percentile(values, 99), 3),
+            'mean': round(sum(values) / len(values), 3),
+        },
+    }
+
+
+def make_app(
+    rounds: int,
+    long_passwords: bool,
+    executor: str = 'thread',
+    workers: Optional[int] = None,
+    salt_pool: bool = False
+) -> Quart:
+    '''
+    Returns an app with an initialized extension for a benchmark case.
+    Coalescing is turned off, as the callers check the same pair and would
+    otherwise measure shared results rather than bcrypt.
+
+    :param rounds: The bcrypt cost factor.
+    :param long_passwords: Whether to enable `BCRYPT_HANDLE_LONG_PASSWORDS`.
+    :param executor: The executor kind, `'thread'` or `'process'`.
+    :param workers: The number of workers in the hashing pool.
+    :param salt_pool: Whether to enable a salt pool of 1024 salts.
+    '''
+    app = Quart(__name__)
+    app.config['BCRYPT_LOG_ROUNDS'] = rounds
+    app.config['BCRYPT_HANDLE_LONG_PASSWORDS'] = long_passwords
+    app.config['BCRYPT_EXECUTOR'] = executor
+    app.config['BCRYPT_MAX_WORKERS'] = workers
+    app.config['BCRYPT_SALT_POOL_SIZE'] = 1024 if salt_pool else None
+    app.config['BCRYPT_COALESCE_CHECKS'] = False
+    Bcrypt(app)
+    return app
+
+
+def run_sync_case(
+    bcrypt: Bcrypt,
+    operation: str,
+    concurrency: int,
+    jobs: int
+) -> Dict[str, Any]:
+    '''
+    Runs `jobs` sync operations from `concurrency` caller threads.
+
+    :param bcrypt: The extension to benchmark.
+    :param operation: Either `'hash'` or `'check'`.
+    :param concurrency: The number of concurrent callers.
+    :param jobs: The number of operations.
+    '''
+    pw_hash = bcrypt.generate_password_hash(PASSWORD)
+
+    def call() -> float:
+        start = time.perf_counter()
+        if operation == 'hash':
+            bcrypt.generate_password_hash(PASSWORD)
+        else:
+            bcrypt.check_password_hash(pw_hash, PASSWORD)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(concurrency) as callers:
+        start = time.perf_counter()
+        latencies = list(callers.map(lambda _: call(), range(jobs)))
+        elapsed = time.perf_counter() - start
+
+    return summarize(latencies, elapsed)
+
+
+async def run_async_case(
+    bcrypt: Bcrypt,
+    operation: str,
+    concurrency: int,
+    jobs: int
+) -> Dict[str, Any]:
+    """
+    Runs `jobs` async operations from `concurrency` concurrent tasks. The
+    latencies include the time spent waiting for admission and a worker.
+
+    :param bcrypt: The extension to benchmark.
+    :param operation: Either `'hash'` or `'check'`.
+    :param concurrency: The number of concurrent callers.
+    :param jobs: The number of operations.
+    """
+    pw_hash = await bcrypt.async_generate_password_hash(PASSWORD)
+    latencies: List[float] = []
+    remaining = iter(range(jobs))
+
+    async def caller() -> None:
+        for _ in remaining:
+            start = time.perf_counter()
+            if operation == 'hash':
+                await bcrypt.async_generate_password_hash(PASSWORD)
+            else:
+                await bcrypt.async_check_password_hash(pw_hash, PASSWORD)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return summarize(latencies, elapsed)
+
+
+async def _serve(
+    app: Quart,
+    case: Callable[..., Awaitable[Dict[str, Any]]],
+    *args: Any
+) -> Dict[str, Any]:
+    """
+    Runs an async case while the app is serving, so the workers are
+    spawned beforehand and shut down afterwards.
+    """
+    async with app.test_app():
+        return await case(app.extensions['bcrypt'], *args)
+
+
+def run_suite(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    '''
+    Runs every combination of the options and returns one result for each.
+
+    :param args: The parsed command line options.
+    '''
+    results = []
+    cases = itertools.product(
+        args.rounds, args.long_passwords, args.salt_pool, args.operation,
+        args.concurrency
+        )
+
+    for rounds, long_passwords, salt_pool, operation, concurrency in cases:
+        params = {
+            'operation': operation,
+            'rounds': rounds,
+            'long_passwords': long_passwords == 'on',
+            'salt_pool': salt_pool == 'on',
+            'concurrency': concurrency,
+            'jobs': args.jobs,
+        }
+
+        if 'sync' in args.mode:
+            app = make_app(
+                rounds, params['long_passwords'],
+                salt_pool=params['salt_pool']
+                )
+            result = run_sync_case(
+                app.extensions['bcrypt'], operation, concurrency, args.jobs
+                )
+            results.append({
+                'mode': 'sync', 'executor': None, 'workers': None,
+                **params, **result
+            })
+
+        if 'async' not in args.mode:
+            continue
+
+        for executor, workers in itertools.product(
+            args.executor, args.workers
+        ):
+            app = make_app(
+                rounds, params['long_passwords'], executor, workers,
+                params['salt_pool']
+                )
+            result = asyncio.run(_serve(
+                app, run_async_case, operation, concurrency, args.jobs
+                ))
+            results.append({
+                'mode': 'async', 'executor': executor, 'workers': workers,
+                **params, **result
+            })
+
+    return results
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    '''
+    Prints the results as a table.
+
+    :param results: The results returned by :func:`run_suite`.
+    '''
+    columns = (
+        'operation', 'mode', 'executor', 'workers', 'rounds',
+        'long_passwords', 'salt_pool', 'concurrency'
+    )
+    print(' '.join(f'{column:>14}' for column in columns)
+          + f'{"ops/s":>10}{"p50":>9}{"p95":>9}{"p99":>9}')
+    for result in results:
+        latency = result['latency_ms']
+        print(' '.join(f'{str(result[column]):>14}' for column in columns)
+              + f'{result["ops_per_sec"]:>10.1f}{latency["p50"]:>9.1f}'
+              f'{latency["p95"]:>9.1f}{latency["p99"]:>9.1f}')
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    '''
+    Runs the benchmark suite from the command line.
+
+    :param argv: The command line arguments. Defaults to `sys.argv`.
+    '''
+    parser = argparse.ArgumentParser(
+        prog='python -m quart_bcrypt.bench',
+        description='Benchmark Quart-Bcrypt throughput and latency.'
+        )
+    parser.add_argument(
+        '--operation', nargs='+', default=list(OPERATIONS),
+        choices=OPERATIONS, help='operations to measure'
+        )
+    parser.add_argument(
+        '--mode', nargs='+', default=list(MODES), choices=MODES,
+        help='API paths to measure'
+        )
+    parser.add_argument(
+        '--rounds', nargs='+', type=int, default=[10],
+        help='bcrypt cost factors'
+        )
+    parser.add_argument(
+        '--concurrency', nargs='+', type=int, default=[1, 4],
+        help='numbers of concurrent callers'
+        )
+    parser.add_argument(
+        '--executor', nargs='+', default=['thread'],
+        choices=['thread', 'process'], help='executor kinds for async'
+        )
+    parser.add_argument(
+        '--workers', nargs='+', type=int, default=[os.cpu_count() or 1],
+        help='hashing pool sizes for async'
+        )
+    parser.add_argument(
+        '--long-passwords', nargs='+', default=['off'],
+        choices=['off', 'on'], help='BCRYPT_HANDLE_LONG_PASSWORDS settings'
+        )
+    parser.add_argument(
+        '--salt-pool', nargs='+', default=['off'], choices=['off', 'on'],
+        help='whether new hashes take their salts from a salt pool'
+        )
+    parser.add_argument(
+        '--jobs', type=int, default=32, help='operations per measurement'
+        )
+    parser.add_argument(
+        '--format', default='json', choices=['json', 'table'],
+        help='output format'
+        )
+    parser.add_argument(
+        '--output', help='write the results to this file instead of stdout'
+        )
+    args = parser.parse_args(argv)
+
+    results = run_suite(args)
+
+    if args.format == 'table':
+        print_table(results)
+        return
+
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'bcrypt': version('bcrypt'),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+quart_bcrypt.cache
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Dict, Set, Tuple, Union
+import hashlib
+import hmac
+import os
+import threading
+import time
+
+
+class VerificationCache(object):
+    '''
+    A size bounded cache of successful password checks that expire after
+    `ttl` seconds. It saves a full bcrypt computation when the same
+    credentials are checked over and over, for example with HTTP Basic
+    auth.
+
+    Entries are keyed by an HMAC of the hash and the password under a
+    random key generated for each cache, so no plaintext password is kept
+    in memory. Failed checks are never cached. As the hash is part of the
+    key, a changed hash never matches the entries made for the old one, and
+    :meth:`invalidate` drops those entries straight away. When the cache is
+    full the least recently used entry is evicted::
+
+        cache = VerificationCache(max_size=1024, ttl=60)
+
+    :param max_size: The maximum number of entries.
+    :param ttl: The number of seconds an entry stays valid.
+    '''
+
+    def __init__(self, max_size: int, ttl: float = 60) -> None:
+        if max_size < 1:
+            raise ValueError('max_size must be greater than 0.')
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._key = os.urandom(32)
+        self._entries: OrderedDict[bytes, Tuple[float, bytes]] = (
+            OrderedDict()
+            )
+        self._by_hash: Dict[bytes, Set[bytes]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _hash_digest(self, pw_hash: bytes) -> bytes:
+        '''
+        Returns the digest indexing the entries made for a hash.
+
+        :param pw_hash: The encoded hash.
+        '''
+        return hashlib.sha256(pw_hash).digest()
+
+    def _digest(self, pw_hash: bytes, password: bytes) -> bytes:
+        '''
+        Returns the entry key for a hash and password.
+
+        :param pw_hash: The encoded hash.
+        :param password: The prepared password.
+        '''
+        message = self._hash_digest(pw_hash) + password
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def get(self, pw_hash: bytes, password: bytes) -> bool:
+        '''
+        Returns whether a successful check of this hash and password is
+        cached and has not expired, counting a hit or a miss.
+
+        :param pw_hash: The encoded hash.
+        :param password: The prepared password.
+        '''
+        digest = self._digest(pw_hash, password)
+
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return True
+
+            if entry is not None:
+                self._remove(digest)
+            self.misses += 1
+            return False
+
+    def add(self, pw_hash: bytes, password: bytes) -> None:
+        '''
+        Caches a successful check of this hash and password.
+
+        :param pw_hash: The encoded hash.
+        :param password: The prepared password.
+        '''
+        digest = self._digest(pw_hash, password)
+        hash_digest = self._hash_digest(pw_hash)
+
+        with self._lock:
+            self._entries[digest] = (time.monotonic() + self.ttl, hash_digest)
+            self._entries.move_to_end(digest)
+            self._by_hash.setdefault(hash_digest, set()).add(digest)
+
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, pw_hash: Union[str, bytes]) -> None:
+        '''
+        Drops every entry made for a hash, for example after the password
+        was changed.
+
+        :param pw_hash: The hash whose entries to drop.
+        '''
+        if isinstance(pw_hash, str):
+            pw_hash = pw_hash.encode()
+
+        with self._lock:
+            for digest in self._by_hash.pop(self._hash_digest(pw_hash), ()):
+                self._entries.pop(digest, None)
+
+    def clear(self) -> None:
+        '''
+        Drops every entry and resets the counters.
+        '''
+        with self._lock:
+            self._entries.clear()
+            self._by_hash.clear()
+            self.hits = self.misses = 0
+
+    def _remove(self, digest: bytes) -> None:
+        '''
+        Removes an entry and its index entry. The lock must be held.
+
+        :param digest: The entry key.
+        '''
+        _, hash_digest = self._entries.pop(digest)
+        digests = self._by_hash[hash_digest]
+        digests.discard(digest)
+        if not digests:
+            del self._by_hash[hash_digest]
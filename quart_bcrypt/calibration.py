@@ -0,0 +1,176 @@
+"""
+quart_bcrypt.calibration
+"""
+from __future__ import annotations
+from importlib.metadata import version
+from typing import Optional, Union
+import json
+import os
+import platform
+import stat
+import tempfile
+import time
+
+from .backends import HashBackend, get_backend
+
+DEFAULT_CACHE_NAME = 'bcrypt_calibration.json'
+
+
+def measure_hash_ms(
+    rounds: int,
+    prefix: bytes = b'2b',
+    samples: int = 3,
+    backend: Union[str, HashBackend] = 'bcrypt'
+) -> float:
+    '''
+    Returns the fastest of `samples` timings of hashing a password at the
+    given cost, in milliseconds. The fastest run is used as it is the least
+    affected by other work on the host.
+
+    :param rounds: The number of rounds.
+    :param prefix: The algorithm version to use.
+    :param samples: The number of hashes to time.
+    :param backend: The backend to measure.
+    '''
+    backend = get_backend(backend)
+    salt = backend.gensalt(rounds, prefix)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        backend.hashpw(b'calibration', salt)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def calibrate_rounds(
+    target_ms: float,
+    prefix: bytes = b'2b',
+    samples: int = 3,
+    backend: Union[str, HashBackend] = 'bcrypt'
+) -> int:
+    '''
+    Finds the highest cost whose hashing time fits within
+    `target_ms` on this host. Starting from the minimum cost, the next cost
+    is only measured while doubling the last timing still fits the target,
+    so the benchmark takes roughly twice the target at most. If even the
+    minimum cost is slower than the target, the minimum is returned.
+
+    :param target_ms: The target hashing time in milliseconds.
+    :param prefix: The algorithm version to use.
+    :param samples: The number of hashes to time for each cost.
+    :param backend: The backend to calibrate.
+    '''
+    backend = get_backend(backend)
+    rounds = backend.min_rounds
+    elapsed = measure_hash_ms(rounds, prefix, samples, backend)
+
+    while rounds < backend.max_rounds and elapsed * 2 <= target_ms:
+        candidate = measure_hash_ms(rounds + 1, prefix, samples, backend)
+        if candidate > target_ms:
+            break
+        rounds += 1
+        elapsed = candidate
+
+    return rounds
+
+
+def calibration_key(
+    target_ms: float,
+    prefix: bytes,
+    backend: Union[str, HashBackend] = 'bcrypt'
+) -> str:
+    '''
+    Returns the cache key for a calibration, which changes whenever the
+    result of the benchmark could.
+
+    :param target_ms: The target hashing time in milliseconds.
+    :param prefix: The algorithm version to use.
+    :param backend: The calibrated backend.
+    '''
+    return ':'.join((
+        get_backend(backend).name,
+        prefix.decode('ascii'),
+        str(target_ms),
+        platform.machine(),
+        str(os.cpu_count()),
+        version('bcrypt')
+    ))
+
+
+def _trusted(status: os.stat_result) -> bool:
+    '''
+    Tests whether a cache file belongs to the current user and cannot be
+    written by anyone else, so no other user can choose the cost.
+
+    :param status: The status of the open cache file.
+    '''
+    if hasattr(os, 'getuid') and status.st_uid != os.getuid():
+        return False
+    return not status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def load_calibration(
+    path: Union[str, os.PathLike],
+    key: str,
+    backend: Union[str, HashBackend] = 'bcrypt'
+) -> Optional[int]:
+    '''
+    Returns the cached cost for `key`, or None if the cache is missing,
+    cannot be read, is not owned by the current user or is writable by
+    others, or holds a cost outside the range of the backend.
+
+    :param path: The path of the cache file.
+    :param key: The key returned by :func:`calibration_key`.
+    :param backend: The calibrated backend.
+    '''
+    try:
+        with open(path, encoding='utf-8') as cache:
+            if not _trusted(os.fstat(cache.fileno())):
+                return None
+            rounds = json.load(cache).get(key)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+    backend = get_backend(backend)
+    if not isinstance(rounds, int) or isinstance(rounds, bool):
+        return None
+    if not backend.min_rounds <= rounds <= backend.max_rounds:
+        return None
+    return rounds
+
+
+def store_calibration(
+    path: Union[str, os.PathLike],
+    key: str,
+    rounds: int
+) -> None:
+    '''
+    Stores the cost for `key` in the cache file, keeping the entries for
+    other keys. The file is replaced atomically, so workers starting at the
+    same time never read a partial file, and is only accessible to the
+    current user. Its directory is created if needed.
+
+    :param path: The path of the cache file.
+    :param key: The key returned by :func:`calibration_key`.
+    :param rounds: The calibrated number of rounds.
+    '''
+    try:
+        with open(path, encoding='utf-8') as cache:
+            entries = json.load(cache)
+        if not isinstance(entries, dict):
+            entries = {}
+    except (OSError, ValueError):
+        entries = {}
+
+    entries[key] = rounds
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'w', encoding='utf-8') as cache:
+            json.dump(entries, cache)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
@@ -0,0 +1,375 @@
+"""
+quart_bcrypt.cli
+
+The `quart bcrypt` command group, registered by :meth:`Bcrypt.init_app`::
+
+    quart bcrypt audit hashes.csv --column pw_hash
+    quart bcrypt estimate hashes.jsonl --rounds 13 --hash-workers 8
+"""
+from __future__ import annotations
+from collections import Counter
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple
+)
+import csv
+import json
+import os
+
+import click
+from quart import current_app
+from quart.cli import AppGroup
+
+from .backends import HashSettings, get_backend, parse_hashes
+from .batch import iter_chunks, stream_chunks
+from .calibration import measure_hash_ms
+from .executor import HashingExecutor
+
+#: Costs above this are extrapolated rather than measured by `estimate`.
+MAX_MEASURED_COST = 12
+
+#: The number of malformed entries listed by `audit`.
+MAX_MALFORMED_ENTRIES = 100
+
+Group = Optional[HashSettings]
+
+bcrypt_cli = AppGroup('bcrypt', help='Audit and plan migrations of hashes.')
+
+
+def read_hashes(
+    stream: IO[str],
+    fmt: str,
+    column: str
+) -> Iterator[Optional[str]]:
+    '''
+    Lazily reads the hashes from a CSV file with a header row or from a
+    JSON Lines file, yielding None for rows without a readable hash.
+
+    :param stream: The open input file.
+    :param fmt: Either `'csv'` or `'jsonl'`.
+    :param column: The column or key holding the hashes.
+    '''
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        if reader.fieldnames is not None and column not in reader.fieldnames:
+            raise click.UsageError(f'The CSV has no {column!r} column.')
+        for row in reader:
+            yield row.get(column)
+        return
+
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            pw_hash = json.loads(line)[column]
+        except (ValueError, TypeError, KeyError):
+            yield None
+            continue
+        yield pw_hash if isinstance(pw_hash, str) else None
+
+
+def audit_chunk(pw_hashes: List[Optional[str]]) -> List[Group]:
+    '''
+    Returns the `(backend, prefix, cost, pepper, prehash)` of each hash in
+    a chunk, or None if it is malformed. This is a module level function,
+    so it may be sent to a process pool.
+
+    :param pw_hashes: The hashes of the chunk.
+    '''
+    return [
+        None if info is None else info.settings
+        for info in parse_hashes(pw_hash or '' for pw_hash in pw_hashes)
+    ]
+
+
+def audit_hashes(
+    pw_hashes: Iterator[Optional[str]],
+    workers: int = 1,
+    chunk_size: int = 10000,
+    max_entries: int = MAX_MALFORMED_ENTRIES
+) -> Dict[str, Any]:
+    '''
+    Counts the hashes of each backend, prefix, cost, pepper key and long
+    password tag, and the malformed ones, of which only the first line
+    numbers are kept. With more than one worker the hashes are parsed in a
+    process pool, holding a bounded number of chunks in memory at once.
+
+    :param pw_hashes: The hashes, with None for unreadable rows.
+    :param workers: The number of worker processes.
+    :param chunk_size: The number of hashes sent to a worker at once.
+    :param max_entries: The number of malformed line numbers to keep.
+    '''
+    groups: Counter = Counter()
+    malformed: List[int] = []
+    chunks = iter_chunks(pw_hashes, chunk_size, lambda pw_hash: pw_hash)
+
+    if workers > 1:
+        executor = HashingExecutor(workers, 'process')
+        results = stream_chunks(executor, audit_chunk, chunks, workers * 2)
+    else:
+        executor = None
+        results = (
+            (index, group)
+            for offset, chunk in _offsets(chunks)
+            for index, group in enumerate(audit_chunk(chunk), offset)
+        )
+
+    try:
+        for index, group in results:
+            groups[group] += 1
+            if group is None and len(malformed) < max_entries:
+                malformed.append(index + 1)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return {
+        'total': sum(groups.values()),
+        'groups': groups,
+        'malformed': groups[None],
+        'malformed_entries': malformed,
+    }
+
+
+def _offsets(
+    chunks: Iterator[List[Any]]
+) -> Iterator[Tuple[int, List[Any]]]:
+    '''
+    Pairs each chunk with the index of its first item.
+
+    :param chunks: The chunks.
+    '''
+    offset = 0
+    for chunk in chunks:
+        yield offset, chunk
+        offset += len(chunk)
+
+
+def _load(
+    source: IO[str],
+    fmt: Optional[str],
+    column: str,
+    workers: int
+) -> Dict[str, Any]:
+    '''
+    Audits the hashes of an input file.
+
+    :param source: The open input file.
+    :param fmt: The format, or None to guess it from the file name.
+    :param column: The column or key holding the hashes.
+    :param workers: The number of worker processes.
+    '''
+    if fmt is None:
+        name = getattr(source, 'name', '')
+        fmt = 'jsonl' if name.endswith(('.jsonl', '.ndjson')) else 'csv'
+    return audit_hashes(read_hashes(source, fmt, column), workers)
+
+
+def _group_name(group: Group) -> str:
+    '''
+    Returns a readable name for a group of hashes.
+
+    :param group: The `(backend, prefix, cost, pepper, prehash)` of the
+        hashes, or None.
+    '''
+    if group is None:
+        return 'malformed'
+    backend, prefix, cost, pepper, prehash = group
+    name = f'{backend} ${prefix}$ cost {cost}'
+    if prehash is not None:
+        name = f'{name} {prehash}'
+    return name if pepper is None else f'{name} pepper {pepper}'
+
+
+def _input_options(func: Any) -> Any:
+    '''
+    Adds the options describing the input file to a command.
+    '''
+    func = click.argument('source', type=click.File('r'))(func)
+    func = click.option(
+        '--format', 'fmt', type=click.Choice(['csv', 'jsonl']),
+        help='Input format. Guessed from the file name by default.'
+        )(func)
+    func = click.option(
+        '--column', default='pw_hash', show_default=True,
+        help='CSV column or JSON key holding the hashes.'
+        )(func)
+    func = click.option(
+        '--workers', type=int, default=os.cpu_count() or 1,
+        show_default='CPU count', help='Processes parsing the hashes.'
+        )(func)
+    return func
+
+
+@bcrypt_cli.command('audit', with_appcontext=True)
+@_input_options
+@click.option('--json', 'as_json', is_flag=True, help='Print JSON.')
+def audit(
+    source: IO[str],
+    fmt: Optional[str],
+    column: str,
+    workers: int,
+    as_json: bool
+) -> None:
+    '''
+    Count the hashes in SOURCE by backend, prefix, cost, pepper key and
+    long password tag, and list the malformed ones. Use - to read from
+    stdin.
+    '''
+    bcrypt = current_app.extensions['bcrypt']
+    result = _load(source, fmt, column, workers)
+    target = bcrypt.hash_settings
+    outdated = sum(
+        count for group, count in result['groups'].items()
+        if bcrypt.is_outdated(group)
+    )
+
+    if as_json:
+        click.echo(json.dumps({
+            'total': result['total'],
+            'outdated': outdated,
+            'malformed': result['malformed'],
+            'malformed_entries': result['malformed_entries'],
+            'groups': [
+                {
+                    'backend': group[0],
+                    'prefix': group[1],
+                    'cost': group[2],
+                    'pepper': group[3],
+                    'prehash': group[4],
+                    'count': count,
+                }
+                for group, count in sorted(result['groups'].items(), key=str)
+                if group is not None
+            ],
+        }, indent=2))
+        return
+
+    click.echo(f'Hashes:    {result["total"]}')
+    click.echo(f'Outdated:  {outdated} (target {_group_name(target)})')
+    click.echo(f'Malformed: {result["malformed"]}')
+    if result['malformed']:
+        entries = ', '.join(map(str, result['malformed_entries'][:10]))
+        click.echo(f'  entries {entries}')
+    for group, count in sorted(result['groups'].items(), key=str):
+        if group is not None:
+            click.echo(f'  {_group_name(group)}: {count}')
+
+
+def hash_seconds(
+    backend: str,
+    prefix: str,
+    cost: int,
+    samples: int = 3
+) -> float:
+    '''
+    Returns the seconds a hash with the given settings takes on this host.
+    Costs above :data:`MAX_MEASURED_COST` are extrapolated, as each step
+    doubles the work.
+
+    :param backend: The name of the backend.
+    :param prefix: The algorithm version.
+    :param cost: The cost factor.
+    :param samples: The number of hashes to time.
+    '''
+    hash_backend = get_backend(backend)
+    if prefix not in ('2a', '2b', 'scrypt'):
+        prefix = hash_backend.default_prefix
+
+    measured = max(hash_backend.min_rounds, min(cost, MAX_MEASURED_COST))
+    milliseconds = measure_hash_ms(
+        measured, prefix.encode('ascii'), samples, hash_backend
+        )
+    return milliseconds / 1000 * 2 ** (cost - measured)
+
+
+@bcrypt_cli.command('estimate', with_appcontext=True)
+@_input_options
+@click.option(
+    '--rounds', type=int,
+    help='Target cost. Defaults to BCRYPT_LOG_ROUNDS.'
+    )
+@click.option(
+    '--all', 'everything', is_flag=True,
+    help='Count every hash as migrating.'
+    )
+@click.option(
+    '--hash-workers', type=int,
+    help='Workers hashing the migration. Defaults to BCRYPT_MAX_WORKERS.'
+    )
+@click.option('--json', 'as_json', is_flag=True, help='Print JSON.')
+def estimate(
+    source: IO[str],
+    fmt: Optional[str],
+    column: str,
+    workers: int,
+    rounds: Optional[int],
+    everything: bool,
+    hash_workers: Optional[int],
+    as_json: bool
+) -> None:
+    '''
+    Estimate the CPU time of moving the hashes in SOURCE to the configured
+    settings as users log in: one check at the old cost and one new hash
+    for every outdated hash. Use - to read from stdin.
+    '''
+    bcrypt = current_app.extensions['bcrypt']
+    result = _load(source, fmt, column, workers)
+    backend, prefix, target_rounds, pepper, prehash = bcrypt.hash_settings
+    if rounds is not None:
+        target_rounds = rounds
+    target = (backend, prefix, target_rounds, pepper, prehash)
+    if hash_workers is None:
+        hash_workers = bcrypt.executor.max_workers
+
+    # Groups differing only in pepper or long password tag cost the same,
+    # so each setting is timed once.
+    timings: Dict[Tuple[str, str, int], float] = {}
+
+    def seconds(settings: Tuple[str, str, int]) -> float:
+        if settings not in timings:
+            timings[settings] = hash_seconds(*settings)
+        return timings[settings]
+
+    new_seconds = seconds((backend, prefix, target_rounds))
+    migrating = cpu_seconds = 0.0
+    for group, count in result['groups'].items():
+        if group is None or not (
+            everything or bcrypt.is_outdated(group, target_rounds)
+        ):
+            continue
+        migrating += count
+        cpu_seconds += count * (seconds(group[:3]) + new_seconds)
+
+    report = {
+        'total': result['total'],
+        'migrating': int(migrating),
+        'malformed': result['malformed'],
+        'target': {
+            'backend': backend,
+            'prefix': prefix,
+            'cost': target_rounds,
+            'pepper': pepper,
+            'prehash': prehash,
+        },
+        'cpu_seconds': round(cpu_seconds, 3),
+        'wall_seconds': round(cpu_seconds / hash_workers, 3),
+        'hash_workers': hash_workers,
+    }
+
+    if as_json:
+        click.echo(json.dumps(report, indent=2))
+        return
+
+    click.echo(f'Hashes:    {report["total"]}')
+    click.echo(f'Migrating: {report["migrating"]} to '
+               f'{_group_name(target)}')
+    click.echo(f'Malformed: {report["malformed"]} (need a password reset)')
+    click.echo(f'CPU time:  {report["cpu_seconds"]:.1f} s, '
+               f'{report["wall_seconds"]:.1f} s on {hash_workers} '
+               f'hashing workers')
@@ -0,0 +1,117 @@
+"""
+quart_bcrypt.coalesce
+"""
+from __future__ import annotations
+from functools import partial
+from typing import Awaitable, Callable, Dict, Hashable, Tuple
+import asyncio
+import hashlib
+import hmac
+import os
+
+
+class _Flight(object):
+    '''
+    A check in flight and the number of callers awaiting it.
+
+    :param task: The task running the check.
+    '''
+
+    __slots__ = ('task', 'callers')
+
+    def __init__(self, task: asyncio.Task[bool]) -> None:
+        self.task = task
+        self.callers = 0
+
+
+class CheckCoalescer(object):
+    '''
+    Lets concurrent checks of the same hash and password share a single
+    computation. The first call starts the check, and calls for the same
+    pair arriving while it runs await its result instead of hashing again,
+    which absorbs client retries and double submitted forms::
+
+        coalescer = CheckCoalescer()
+        result = await coalescer.run(pw_hash, password, check)
+
+    Checks in flight are keyed by an HMAC of the hash and password under a
+    random key, so no plaintext password is kept, and by a `scope` of other
+    values the callers must agree on to share a check, such as the priority
+    and timeout the check runs with. A caller cancelled while
+    waiting does not cancel the check for the others, and the check is only
+    cancelled once every caller has gone. `flights` counts the checks run
+    and `coalesced` the calls that joined one.
+    '''
+
+    def __init__(self) -> None:
+        self.flights = 0
+        self.coalesced = 0
+        self._key = os.urandom(32)
+        self._in_flight: Dict[Tuple[bytes, Hashable], _Flight] = {}
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    def _digest(self, pw_hash: bytes, password: bytes) -> bytes:
+        '''
+        Returns the key of a check of a hash and password.
+
+        :param pw_hash: The encoded hash.
+        :param password: The prepared password.
+        '''
+        message = hashlib.sha256(pw_hash).digest() + password
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    async def run(
+        self,
+        pw_hash: bytes,
+        password: bytes,
+        check: Callable[[], Awaitable[bool]],
+        scope: Hashable = None
+    ) -> bool:
+        """
+        Returns the result of the check in flight for this hash, password and
+        scope, starting it with `check` if there is none.
+
+        :param pw_hash: The encoded hash.
+        :param password: The prepared password.
+        :param check: The coroutine function running the check.
+        :param scope: The values a check must have been started with to be
+            shared, as `check` runs with those of the first caller.
+        """
+        digest = (self._digest(pw_hash, password), scope)
+        flight = self._in_flight.get(digest)
+
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(check()))
+            self._in_flight[digest] = flight
+            flight.task.add_done_callback(
+                partial(self._finish, digest, flight))
+            self.flights += 1
+        else:
+            self.coalesced += 1
+
+        task = flight.task
+        flight.callers += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            flight.callers -= 1
+            if not flight.callers and not task.done():
+                task.cancel()
+
+    def _finish(
+        self,
+        digest: Tuple[bytes, Hashable],
+        flight: _Flight,
+        _: asyncio.Task[bool]
+    ) -> None:
+        '''
+        Forgets a finished check, so later calls start a new one.
+
+        :param digest: The key of the check.
+        :param flight: The task and the number of its callers.
+        :param _: The finished task.
+        '''
+        if self._in_flight.get(digest) is flight:
+            del self._in_flight[digest]
@@ -2,13 +2,67 @@
 quart_bcrypt.core
 """
 from __future__ import annotations
-from typing import Optional, Union
+from concurrent.futures import Future
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    Union
+)
+import asyncio
 import hmac
 import hashlib
+import logging
+import os
+import time
 
-import bcrypt
-from quart import Quart
-from quart.utils import run_sync
+from quart import Quart, current_app
+
+from .adaptive import AdaptiveLimiter
+from .backends import (
+    PREHASH_TAG,
+    HashBackend,
+    HashSettings,
+    get_backend,
+    identify,
+    parse_hash,
+    split_tags
+)
+from .batch import (
+    aiter_chunks,
+    astream_chunks,
+    check_chunk,
+    hash_chunk,
+    iter_chunks,
+    stream_chunks
+)
+from .cache import VerificationCache
+from .cli import bcrypt_cli
+from .coalesce import CheckCoalescer
+from .calibration import (
+    DEFAULT_CACHE_NAME,
+    calibrate_rounds,
+    calibration_key,
+    load_calibration,
+    store_calibration
+)
+from .exceptions import BcryptTimeout
+from .executor import HashingExecutor
+from .instrumentation import HashEvent, HashObserver, timed_call
+from .limits import BACKGROUND, INTERACTIVE, AdmissionController
+from .pepper import PepperKeyring
+from .ratelimit import RateLimiter
+from .salts import SaltPool
+from .sidecar import SidecarClient
+
+logger = logging.getLogger('quart_bcrypt')
 
 
 class Bcrypt(object):
@@ -66,25 +120,151 @@ class Bcrypt(object):
     the configuration of the Quart app. If not set, this will default to `2b`.
     (See bcrypt for more details)
 
+    The hashing algorithm is chosen with `BCRYPT_BACKEND`, either `'bcrypt'`
+    (the default), `'scrypt'` or the name of a backend registered with
+    :func:`register_backend`. The defaults of `BCRYPT_LOG_ROUNDS` and
+    `BCRYPT_HASH_PREFIX` follow the backend. Checking a password always uses
+    the backend that made the hash, found from its prefix, so a store may
+    hold hashes of several algorithms while migrating between them.
+
     By default, the bcrypt algorithm has a maximum password length of 72 bytes
     and ignores any bytes beyond that. A common workaround is to hash the
     given password using a cryptographic hash (such as `sha256`), take its
     hexdigest to prevent NULL byte problems, and hash the result with bcrypt.
     If the `BCRYPT_HANDLE_LONG_PASSWORDS` configuration value is set to `True`,
-    the workaround described above will be enabled.
-    **Warning: do not enable this option on a project that is already using
-    Quart-Bcrypt, or you will break password checking.**
-    **Warning: if this option is enabled on an existing project, disabling it
-    will break password checking.**
+    the workaround described above will be enabled for new hashes, which are
+    tagged with a `$sha256` prefix, such as `$sha256$2b$12$...`. Tagged
+    hashes are always checked with the workaround, so the option may be
+    toggled on a live project and every check still runs bcrypt once.
+    Hashes without the tag are checked with the workaround only if
+    `BCRYPT_LEGACY_LONG_PASSWORDS` is set, which defaults to
+    `BCRYPT_HANDLE_LONG_PASSWORDS` so that untagged hashes made by earlier
+    versions with the option enabled keep working.
+    **Warning: when enabling the option on a project that has stored hashes
+    without it, set `BCRYPT_LEGACY_LONG_PASSWORDS` to `False`.**
+
+    Setting `BCRYPT_PEPPERS` to a mapping of key ids to secrets combines
+    each new password with the secret of `BCRYPT_PEPPER_KEY`, the last key
+    by default, before hashing, and tags the hash with the key id. Checks
+    use the key named by the hash, so old keys can be kept for rotation
+    without extra hashing, and :meth:`needs_rehash` reports hashes made with
+    another key. See :class:`PepperKeyring`.
+
+    The async methods run bcrypt in a pool of worker threads owned by the
+    extension instead of the event loop's default executor, so hashing cannot
+    starve other `run_sync` work. The size of the pool may be set with the
+    `BCRYPT_MAX_WORKERS` configuration value and defaults to the number of
+    CPUs. Setting `BCRYPT_EXECUTOR` to `'process'` runs the jobs in a pool of
+    worker processes instead. The pool is started by `init_app` and shut
+    down once the app stops serving. Its load is available from
+    :attr:`executor`.
+
+    Before the app starts serving, the workers are spawned and the dummy
+    hash is checked once in the pool, so the first logins after a deploy do
+    not pay for starting the pool, loading the backend or opening the
+    connection to a sidecar daemon. The time taken is logged and kept in
+    :attr:`warmup_time`. Set `BCRYPT_WARMUP` to False to skip it, for
+    example in tests, and let the workers start on demand.
+
+    The number of async calls hashing at once is limited by
+    `BCRYPT_MAX_CONCURRENCY`, which defaults to the size of the pool, and at
+    most `BCRYPT_MAX_QUEUE` further calls may wait for their turn. Once the
+    queue is full the async methods raise :class:`BcryptOverloaded`, which
+    becomes a 503 response with a `Retry-After` header of
+    `BCRYPT_RETRY_AFTER` seconds. The limits apply to each app separately.
+
+    Setting `BCRYPT_ADAPTIVE_CONCURRENCY` to True lets an
+    :class:`AdaptiveLimiter` move the limit between one more than the
+    reserved slots and the larger of `BCRYPT_MAX_CONCURRENCY` and the size
+    of the pool, following the compute time of the async hashes: it is
+    raised while they take as long as on an idle host, and cut once they
+    slow down from CPU contention. Each change is logged with its reason.
+
+    The async methods take a `priority`. Single hashes and checks default to
+    `'interactive'` and the batch methods to `'background'`. Interactive
+    calls are admitted before any waiting background call, and
+    `BCRYPT_INTERACTIVE_RESERVED` slots, a quarter of
+    `BCRYPT_MAX_CONCURRENCY` by default, are never used by background calls,
+    so logins stay fast while a bulk job runs.
+
+    A call whose task is cancelled, for example because the client went
+    away, leaves the queue straight away, and a job not yet started in the
+    pool is dropped. A job already running cannot be interrupted, so its
+    slot is only freed once the worker is done. Single hashes and checks
+    also take a `timeout` in seconds, and raise :class:`BcryptTimeout`
+    rather than start a hash that could not finish in time.
+
+    Instead of a fixed `BCRYPT_LOG_ROUNDS`, a target hashing time in
+    milliseconds may be set with `BCRYPT_TARGET_MS`. Before the app starts
+    serving, a short benchmark picks the highest cost that hashes within the
+    target on the current host and logs the choice. The result is cached in
+    the file at `BCRYPT_CALIBRATION_CACHE`, in the instance folder by
+    default, so restarts on the same hardware skip the benchmark. A cache
+    file owned by another user, writable by others or holding a cost out
+    of range is ignored. Set it to None to disable the cache.
+
+    Setting `BCRYPT_CACHE_SIZE` enables a cache of that many successful
+    checks, each valid for `BCRYPT_CACHE_TTL` seconds, which spares the
+    bcrypt work when the same credentials are checked repeatedly, such as
+    with HTTP Basic auth. See :class:`VerificationCache`.
+
+    Concurrent async checks of the same hash and password, with the same
+    priority and timeout, share a single computation, unless
+    `BCRYPT_COALESCE_CHECKS` is set to False. See :class:`CheckCoalescer`.
+
+    Setting `BCRYPT_RATE_LIMIT` allows each key passed to the async check
+    methods, such as a username or IP address, that many attempts, regained
+    over `BCRYPT_RATE_LIMIT_PERIOD` seconds. Further attempts raise
+    :class:`BcryptRateLimited` before any hashing is queued. The buckets are
+    kept in memory unless a store is given with `BCRYPT_RATE_LIMIT_STORE`.
+    See :class:`RateLimiter`.
+
+    Setting `BCRYPT_SIDECAR_SOCKET` to the socket of a daemon started with
+    `python -m quart_bcrypt.worker` sends the hashes of the async single
+    hash and check methods to it, over up to `BCRYPT_SIDECAR_CONNECTIONS`
+    connections, so every worker process of a server shares one hashing
+    pool. Admission control still applies in each process, and hashes run
+    in the extension's own pool whenever the daemon is gone. See
+    :class:`SidecarClient`.
+
+    Setting `BCRYPT_SALT_POOL_SIZE` keeps that many salts for the configured
+    cost and prefix generated ahead of time, so new hashes do not read from
+    `os.urandom` on the request path. See :class:`SaltPool`.
+
+    Observers registered with :meth:`add_observer` receive a
+    :class:`HashEvent` for every hash and check, with the time spent waiting
+    and the time spent in bcrypt. :class:`InMemoryMetrics` is an observer
+    keeping histograms of those times.
 
     :param app: The Quart application object. Defaults to None.
     '''
 
+    _backend: HashBackend = get_backend('bcrypt')
     _log_rounds: int = 12
     _prefix: Union[str, bytes] = '2b'
     _handle_long_passwords: bool = False
+    _legacy_long_passwords: bool = False
+    _pepper: Optional[PepperKeyring] = None
+    _sidecar: Optional[SidecarClient] = None
+    _limiter: Optional[AdaptiveLimiter] = None
+    _executor: Optional[HashingExecutor] = None
+    _admission: Optional[AdmissionController] = None
+    _target_ms: Optional[float] = None
+    _warmup: bool = True
+    _warmup_time: Optional[float] = None
+    _calibration_cache: Optional[str] = None
+    _cache: Optional[VerificationCache] = None
+    _salt_pool_size: Optional[int] = None
+    _salt_pool: Optional[SaltPool] = None
+    _dummy: Optional[Tuple[Tuple[str, int, bytes], bytes]] = None
+    _rate_limiter: Optional[RateLimiter] = None
+    _coalescer: Optional[CheckCoalescer] = None
+    _observers: Tuple[HashObserver, ...] = ()
 
     def __init__(self, app: Optional[Quart] = None) -> None:
+        self._compute_times: Dict[
+            Tuple[Optional[str], Optional[int]], float
+        ] = {}
 
         if app is not None:
             self.init_app(app)
@@ -97,17 +277,610 @@ class Bcrypt(object):
         '''
         app.extensions['bcrypt'] = self
 
+        self._backend = get_backend(
+            app.config.setdefault('BCRYPT_BACKEND', 'bcrypt')
+            )
         self._log_rounds = app.config.setdefault(
-            'BCRYPT_LOG_ROUNDS', 12
+            'BCRYPT_LOG_ROUNDS', self._backend.default_rounds
             )
         self._prefix = app.config.setdefault(
-            'BCRYPT_HASH_PREFIX', '2b'
+            'BCRYPT_HASH_PREFIX', self._backend.default_prefix
             )
         self._handle_long_passwords = (
             app.config.setdefault(
                 'BCRYPT_HANDLE_LONG_PASSWORDS', False
                 )
             )
+        self._legacy_long_passwords = app.config.setdefault(
+            'BCRYPT_LEGACY_LONG_PASSWORDS', self._handle_long_passwords
+            )
+        peppers = app.config.setdefault('BCRYPT_PEPPERS', None)
+        pepper_key = app.config.setdefault('BCRYPT_PEPPER_KEY', None)
+        self._pepper = PepperKeyring(peppers, pepper_key) if peppers else None
+        self._target_ms = app.config.setdefault('BCRYPT_TARGET_MS', None)
+        self._warmup = app.config.setdefault('BCRYPT_WARMUP', True)
+        self._warmup_time = None
+        self._calibration_cache = app.config.setdefault(
+            'BCRYPT_CALIBRATION_CACHE',
+            os.path.join(app.instance_path, DEFAULT_CACHE_NAME)
+            )
+
+        cache_size = app.config.setdefault('BCRYPT_CACHE_SIZE', None)
+        cache_ttl = app.config.setdefault('BCRYPT_CACHE_TTL', 60)
+        self._cache = (
+            VerificationCache(cache_size, cache_ttl) if cache_size else None
+            )
+
+        self._coalescer = (
+            CheckCoalescer()
+            if app.config.setdefault('BCRYPT_COALESCE_CHECKS', True)
+            else None
+            )
+
+        rate_limit = app.config.setdefault('BCRYPT_RATE_LIMIT', None)
+        self._rate_limiter = RateLimiter(
+            rate_limit,
+            app.config.setdefault('BCRYPT_RATE_LIMIT_PERIOD', 60),
+            app.config.setdefault('BCRYPT_RATE_LIMIT_STORE', None)
+            ) if rate_limit else None
+
+        sidecar_socket = app.config.setdefault('BCRYPT_SIDECAR_SOCKET', None)
+        self._sidecar = SidecarClient(
+            sidecar_socket,
+            app.config.setdefault('BCRYPT_SIDECAR_CONNECTIONS', 4)
+            ) if sidecar_socket else None
+
+        self._salt_pool_size = app.config.setdefault(
+            'BCRYPT_SALT_POOL_SIZE', None
+            )
+        self._reset_salt_pool()
+        self._reset_dummy_hash()
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+        self._executor = HashingExecutor(
+            app.config.setdefault('BCRYPT_MAX_WORKERS', None),
+            app.config.setdefault('BCRYPT_EXECUTOR', 'thread')
+            )
+        self._executor.start()
+
+        max_concurrency = (
+            app.config.setdefault('BCRYPT_MAX_CONCURRENCY', None)
+            or self._executor.max_workers
+            )
+        reserved = app.config.setdefault('BCRYPT_INTERACTIVE_RESERVED', None)
+        self._admission = AdmissionController(
+            max_concurrency,
+            app.config.setdefault('BCRYPT_MAX_QUEUE', None),
+            app.config.setdefault('BCRYPT_RETRY_AFTER', 1),
+            max_concurrency // 4 if reserved is None else reserved
+            )
+        adaptive = app.config.setdefault('BCRYPT_ADAPTIVE_CONCURRENCY', False)
+        self._limiter = AdaptiveLimiter(
+            self._admission,
+            max_limit=max(max_concurrency, self._executor.max_workers)
+            ) if adaptive else None
+
+        app.before_serving(self._before_serving)
+        # The sidecar is closed first, so requests still in flight fall back
+        # to the pool before it is shut down rather than starting it again.
+        app.after_serving(self._close_sidecar)
+        app.after_serving(self._shutdown_executor)
+        app.cli.add_command(bcrypt_cli)
+
+    @property
+    def executor(self) -> HashingExecutor:
+        '''
+        The :class:`HashingExecutor` used by the async methods. Its
+        `queue_depth` and `active_workers` report the current hashing load.
+        If the extension was not initialized with an app, a pool with the
+        default size is created on first use.
+        '''
+        if self._executor is None:
+            self._executor = HashingExecutor()
+        return self._executor
+
+    @property
+    def cache(self) -> Optional[VerificationCache]:
+        '''
+        The :class:`VerificationCache` of successful checks, or None if
+        `BCRYPT_CACHE_SIZE` is not set. Its `hits` and `misses` count how
+        often a check was answered from the cache.
+        '''
+        return self._cache
+
+    @property
+    def coalescer(self) -> Optional[CheckCoalescer]:
+        '''
+        The :class:`CheckCoalescer` sharing concurrent async checks, or None
+        if `BCRYPT_COALESCE_CHECKS` is False. Its `coalesced` counts the
+        calls that joined a check already in flight.
+        '''
+        return self._coalescer
+
+    @property
+    def rate_limiter(self) -> Optional[RateLimiter]:
+        '''
+        The :class:`RateLimiter` of attempts per key, or None if
+        `BCRYPT_RATE_LIMIT` is not set.
+        '''
+        return self._rate_limiter
+
+    @property
+    def pepper(self) -> Optional[PepperKeyring]:
+        '''
+        The :class:`PepperKeyring` of `BCRYPT_PEPPERS`, or None if no pepper
+        is set. Its :meth:`~PepperKeyring.audit` counts the hashes each key
+        still covers.
+        '''
+        return self._pepper
+
+    @property
+    def limiter(self) -> Optional[AdaptiveLimiter]:
+        '''
+        The :class:`AdaptiveLimiter` adjusting the concurrency limit, or None
+        if `BCRYPT_ADAPTIVE_CONCURRENCY` is False. Its `limit` is the current
+        limit and `changes` lists the recent changes with their reasons.
+        '''
+        return self._limiter
+
+    @property
+    def sidecar(self) -> Optional[SidecarClient]:
+        '''
+        The :class:`SidecarClient` of `BCRYPT_SIDECAR_SOCKET`, or None if no
+        daemon is set. Its `fallbacks` counts the hashes run in process
+        because the daemon was gone.
+        '''
+        return self._sidecar
+
+    @property
+    def warmup_time(self) -> Optional[float]:
+        '''
+        The seconds the warm-up before serving took, or None if it has not
+        run.
+        '''
+        return self._warmup_time
+
+    @property
+    def salt_pool(self) -> Optional[SaltPool]:
+        '''
+        The :class:`SaltPool` of salts for the configured cost and prefix, or
+        None if `BCRYPT_SALT_POOL_SIZE` is not set.
+        '''
+        return self._salt_pool
+
+    def _reset_salt_pool(self) -> None:
+        '''
+        Replaces the salt pool with a filled one for the configured cost and
+        prefix, as the salts of the previous one no longer match them.
+        '''
+        self._salt_pool = None
+        if self._salt_pool_size:
+            self._salt_pool = SaltPool(
+                self._backend, self._log_rounds,
+                self._unicode_to_bytes(self._prefix), self._salt_pool_size
+                )
+            self._salt_pool.fill()
+
+    @property
+    def dummy_hash(self) -> bytes:
+        '''
+        The hash checked by :meth:`check_password_hash_or_dummy` when there
+        is no user. It is a hash of a random password with the configured
+        backend, cost and prefix, and is rebuilt if they have changed.
+        '''
+        settings = (
+            self._backend.name, self._log_rounds,
+            self._unicode_to_bytes(self._prefix)
+        )
+        if self._dummy is None or self._dummy[0] != settings:
+            self._reset_dummy_hash()
+        return self._dummy[1]
+
+    def _reset_dummy_hash(self) -> None:
+        '''
+        Builds the dummy hash for the configured backend, cost and prefix.
+        '''
+        rounds = self._log_rounds
+        prefix = self._unicode_to_bytes(self._prefix)
+        password = os.urandom(16).hex().encode('ascii')
+        self._dummy = (
+            (self._backend.name, rounds, prefix),
+            self._tag_hash(self._backend.hashpw(
+                password, self._backend.gensalt(rounds, prefix)
+                ))
+        )
+
+    @property
+    def admission(self) -> AdmissionController:
+        '''
+        The :class:`AdmissionController` limiting the async methods. Its
+        `in_flight` and `queued` report how many calls are hashing and how
+        many are waiting.
+        '''
+        if self._admission is None:
+            self._admission = AdmissionController(self.executor.max_workers)
+        return self._admission
+
+    def add_observer(self, observer: HashObserver) -> None:
+        '''
+        Registers an observer receiving a :class:`HashEvent` for every hash
+        and check made through this extension.
+
+        :param observer: An object with an `observe(event)` method.
+        '''
+        self._observers = self._observers + (observer,)
+
+    def remove_observer(self, observer: HashObserver) -> None:
+        '''
+        Unregisters an observer.
+
+        :param observer: The observer to remove.
+        '''
+        self._observers = tuple(
+            registered for registered in self._observers
+            if registered is not observer
+            )
+
+    def _hash_header(
+        self,
+        pw_hash: bytes
+    ) -> Tuple[Optional[str], Optional[int]]:
+        '''
+        Reads the prefix and cost from the header of a hash or salt, or
+        returns None for both if it is malformed.
+
+        :param pw_hash: The encoded hash or salt.
+        '''
+        try:
+            info = identify(pw_hash).parse(pw_hash)
+        except ValueError:
+            return None, None
+        return info.prefix, info.cost
+
+    def _notify(
+        self,
+        operation: str,
+        mode: str,
+        pw_hash: bytes,
+        queue_wait: float,
+        compute_time: float,
+        result: Optional[bool] = None,
+        error: Optional[BaseException] = None
+    ) -> None:
+        '''
+        Sends a :class:`HashEvent` to the observers. An observer raising an
+        error is logged and does not affect the call being reported.
+
+        :param operation: Either `'hash'` or `'check'`.
+        :param mode: Either `'sync'` or `'async'`.
+        :param pw_hash: The salt or hash the password was hashed with,
+            with its tags for a check.
+        :param queue_wait: Seconds spent waiting for admission and a worker.
+        :param compute_time: Seconds spent in bcrypt.
+        :param result: The result of a check.
+        :param error: The error raised by bcrypt.
+        '''
+        if not self._observers:
+            return
+
+        untagged, prehash, pepper = split_tags(pw_hash)
+        if prehash is not None or pepper is not None:
+            long_passwords = prehash is not None
+        elif operation == 'hash':
+            long_passwords = (
+                self._handle_long_passwords and self._pepper is None
+                )
+        else:
+            long_passwords = self._legacy_long_passwords
+
+        prefix, rounds = self._hash_header(untagged)
+        event = HashEvent(
+            operation, mode, rounds, prefix, long_passwords,
+            queue_wait, compute_time, result,
+            type(error).__name__ if error is not None else None
+            )
+
+        for observer in self._observers:
+            try:
+                observer.observe(event)
+            except Exception:
+                logger.exception('Quart-Bcrypt observer %r failed.', observer)
+
+    def _hashpw(
+        self,
+        operation: str,
+        password: bytes,
+        salt: bytes
+    ) -> Tuple[bytes, float]:
+        '''
+        Hashes with the backend that made `salt` on the calling thread and
+        returns the result with the time it took. Errors are reported to the
+        observers.
+
+        :param operation: Either `'hash'` or `'check'`.
+        :param password: The prepared password.
+        :param salt: The salt or hash to hash with.
+        '''
+        start = time.perf_counter()
+        try:
+            return timed_call(identify(salt).hashpw, password, salt)
+        except (TypeError, ValueError) as error:
+            self._notify(
+                operation, 'sync', salt, 0.0, time.perf_counter() - start,
+                error=error
+                )
+            raise
+
+    async def _run_timed(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        priority: str = INTERACTIVE,
+        deadline: Optional[float] = None,
+        expected: float = 0.0,
+        sidecar: bool = False
+    ) -> Tuple[Any, float, float]:
+        """
+        Runs a hashing job in the executor once admission control lets it
+        through, and returns its result with the seconds spent waiting and
+        the seconds spent running in the worker.
+
+        The slot is held until the job has left the worker, so a cancelled
+        call does not free capacity that is still in use. A job that has not
+        started yet is dropped from the pool instead.
+
+        :param func: The blocking callable to run.
+        :param args: The positional arguments for `func`.
+        :param priority: Either `'interactive'` or `'background'`.
+        :param deadline: The :func:`time.perf_counter` time by which the job
+            must be done, if any.
+        :param expected: The seconds the job is expected to take. It is not
+            started if less time than that is left before `deadline`.
+        :param sidecar: Whether the job is a `hashpw(password, salt)` call
+            that may be sent to the sidecar daemon.
+        :raises BcryptTimeout: If the job cannot finish by `deadline`.
+        """
+        start = time.perf_counter()
+        admission = self.admission
+        await admission.acquire(
+            priority, None if deadline is None else deadline - start
+            )
+
+        if deadline is not None and deadline - time.perf_counter() < expected:
+            admission.release(priority)
+            raise BcryptTimeout(admission.retry_after)
+
+        try:
+            future = await self._submit(func, args, sidecar)
+        except BaseException:
+            admission.release(priority)
+            raise
+
+        try:
+            result, compute = await asyncio.wait_for(
+                asyncio.wrap_future(future),
+                None if deadline is None else deadline - time.perf_counter()
+                )
+        except asyncio.TimeoutError:
+            self._release_when_done(future, priority)
+            raise BcryptTimeout(admission.retry_after) from None
+        except BaseException:
+            self._release_when_done(future, priority)
+            raise
+
+        admission.release(priority)
+        return result, max(0.0, time.perf_counter() - start - compute), compute
+
+    async def _submit(
+        self,
+        func: Callable[..., Any],
+        args: Tuple[Any, ...],
+        sidecar: bool = False
+    ) -> Future:
+        """
+        Submits a job to the executor, or a hash to the sidecar daemon if
+        one is set, which falls back to the executor when it is gone.
+
+        :param func: The blocking callable to run.
+        :param args: The positional arguments for `func`.
+        :param sidecar: Whether the job may be sent to the sidecar daemon.
+        """
+        submit = partial(self.executor.submit, timed_call, func, *args)
+        if not sidecar or self._sidecar is None:
+            return submit()
+        password, salt = args
+        return await self._sidecar.submit(password, salt, submit)
+
+    def _release_when_done(self, future: Future, priority: str) -> None:
+        '''
+        Frees the admission slot of an abandoned job once it has left the
+        worker, or straight away if it never started.
+
+        :param future: The future of the job.
+        :param priority: The priority the slot was acquired with.
+        '''
+        admission = self.admission
+        if future.cancel() or future.done():
+            admission.release(priority)
+            return
+
+        loop = asyncio.get_running_loop()
+
+        def release(_: Future) -> None:
+            try:
+                loop.call_soon_threadsafe(admission.release, priority)
+            except RuntimeError:
+                # The loop is closed, so nothing waits for the slot.
+                pass
+
+        future.add_done_callback(release)
+
+    async def _run_job(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        priority: str = INTERACTIVE
+    ) -> Any:
+        """
+        Runs a hashing job in the executor once admission control lets it
+        through.
+
+        :param func: The blocking callable to run.
+        :param args: The positional arguments for `func`.
+        :param priority: Either `'interactive'` or `'background'`.
+        """
+        result, _, _ = await self._run_timed(func, *args, priority=priority)
+        return result
+
+    async def _async_hashpw(
+        self,
+        operation: str,
+        password: bytes,
+        salt: bytes,
+        priority: str = INTERACTIVE,
+        timeout: Optional[float] = None
+    ) -> Tuple[bytes, float, float]:
+        """
+        Hashes with the backend that made `salt` in the executor and returns
+        the result with the seconds spent waiting and hashing. Errors are
+        reported to the observers.
+
+        With a `timeout`, the hash is not started unless the recent hashes
+        with the same header suggest it can finish in time.
+
+        :param operation: Either `'hash'` or `'check'`.
+        :param password: The prepared password.
+        :param salt: The salt or hash to hash with.
+        :param priority: Either `'interactive'` or `'background'`.
+        :param timeout: The seconds the call may take at most.
+        """
+        start = time.perf_counter()
+        header = self._hash_header(salt)
+        try:
+            result = await self._run_timed(
+                identify(salt).hashpw, password, salt, priority=priority,
+                deadline=None if timeout is None else start + timeout,
+                expected=self._compute_times.get(header, 0.0), sidecar=True
+                )
+        except (TypeError, ValueError) as error:
+            self._notify(
+                operation, 'async', salt, time.perf_counter() - start, 0.0,
+                error=error
+                )
+            raise
+
+        # A moving average, so the estimate follows changes in load.
+        previous = self._compute_times.get(header, result[2])
+        self._compute_times[header] = previous * 0.8 + result[2] * 0.2
+
+        if self._limiter is not None:
+            change = self._limiter.observe(header, result[2])
+            if change is not None:
+                logger.info(
+                    'Quart-Bcrypt changed the concurrency limit from %d to '
+                    '%d: %s.', change.old, change.new, change.reason
+                    )
+        return result
+
+    async def _before_serving(self) -> None:
+        """
+        Spawns the hashing workers, calibrates the cost, if a target is set,
+        and runs a first hash before the app starts serving. With a sidecar
+        daemon the workers are left to start on demand, as they only run
+        fallbacks.
+        """
+        start = time.perf_counter()
+        if self._warmup and self._sidecar is None:
+            await self.executor.prefork()
+        spawned = time.perf_counter()
+
+        if self._target_ms is not None:
+            await self._calibrate()
+
+        if self._warmup:
+            await self._warm_up(start, spawned)
+
+    async def _warm_up(self, start: float, spawned: float) -> None:
+        """
+        Checks a random password against the dummy hash in the pool, which
+        loads the backend, opens the connection to the sidecar daemon and
+        seeds the estimate used by timeouts for the configured cost and
+        prefix, then logs the time of the warm-up.
+
+        :param start: The :func:`time.perf_counter` time the warm-up began.
+        :param spawned: The :func:`time.perf_counter` time the workers were
+            spawned.
+        """
+        pw_hash, password = self._prepare_check(
+            self.dummy_hash, os.urandom(16).hex()
+            )
+        hash_start = time.perf_counter()
+        await self._async_hashpw(
+            'check', password, split_tags(pw_hash)[0], BACKGROUND
+            )
+
+        # The calibration in between is logged on its own.
+        spawn_time = spawned - start
+        hash_time = time.perf_counter() - hash_start
+        self._warmup_time = spawn_time + hash_time
+        current_app.logger.info(
+            'Quart-Bcrypt warmed up in %.0f ms (workers %.0f ms, first hash '
+            '%.0f ms).', self._warmup_time * 1000, spawn_time * 1000,
+            hash_time * 1000
+            )
+
+    async def _calibrate(self) -> None:
+        """
+        Sets the default cost to the highest one that fits within
+        `BCRYPT_TARGET_MS`, reading it from the cache when possible.
+        """
+        prefix = self._unicode_to_bytes(self._prefix)
+        key = calibration_key(self._target_ms, prefix, self._backend)
+        source = 'cache'
+
+        rounds = None
+        if self._calibration_cache is not None:
+            rounds = load_calibration(
+                self._calibration_cache, key, self._backend)
+
+        if rounds is None:
+            source = 'benchmark'
+            rounds = await self.executor.run(
+                calibrate_rounds, self._target_ms, prefix, 3, self._backend)
+
+            if self._calibration_cache is not None:
+                try:
+                    store_calibration(self._calibration_cache, key, rounds)
+                except OSError as error:
+                    current_app.logger.warning(
+                        'Quart-Bcrypt could not cache the calibration: %s',
+                        error
+                        )
+
+        self._log_rounds = rounds
+        self._reset_salt_pool()
+        self._reset_dummy_hash()
+        current_app.logger.info(
+            'Quart-Bcrypt set the bcrypt cost to %d for a %s ms target '
+            '(from %s).', rounds, self._target_ms, source
+            )
+
+    def _shutdown_executor(self) -> None:
+        '''
+        Shuts down the hashing pool once the app stops serving.
+        '''
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    async def _close_sidecar(self) -> None:
+        """
+        Closes the connections to the sidecar daemon once the app stops
+        serving.
+        """
+        if self._sidecar is not None:
+            await self._sidecar.close()
 
     def _unicode_to_bytes(
         self,
@@ -126,6 +899,98 @@ class Bcrypt(object):
 
         return unicode_string
 
+    def _prepare_password(
+        self,
+        password: Union[str, bytes],
+        prehash: Optional[bool] = None,
+        pepper: Optional[str] = None
+    ) -> bytes:
+        '''
+        Encodes a password to bytes and combines it with the given pepper
+        key, or applies the long password workaround if `prehash` is set.
+        If `prehash` is None the password is prepared for a new hash, with
+        the current pepper key or as set by `BCRYPT_HANDLE_LONG_PASSWORDS`.
+
+        :param password: The password to prepare.
+        :param prehash: Whether to apply the long password workaround.
+        :param pepper: The id of the pepper key to apply.
+        '''
+        # Python 3 unicode strings must be encoded as bytes before hashing.
+        password = self._unicode_to_bytes(password)
+
+        if prehash is None:
+            prehash = self._handle_long_passwords
+            if self._pepper is not None:
+                pepper = self._pepper.current
+
+        if pepper is not None:
+            if self._pepper is None:
+                raise ValueError(f'Unknown pepper key {pepper!r}.')
+            return self._pepper.apply(password, pepper)
+        if prehash:
+            password = hashlib.sha256(password).hexdigest()
+            password = self._unicode_to_bytes(password)
+
+        return password
+
+    def _prepare_check(
+        self,
+        pw_hash: Union[str, bytes],
+        password: Union[str, bytes]
+    ) -> Tuple[bytes, bytes]:
+        '''
+        Encodes a hash and prepares a candidate password the way the hash
+        was made, as told by its tags: with the pepper key it names, with
+        the long password workaround, or as set by
+        `BCRYPT_LEGACY_LONG_PASSWORDS` for untagged hashes.
+
+        :param pw_hash: The hash to be compared against.
+        :param password: The password to compare.
+        '''
+        pw_hash = self._unicode_to_bytes(pw_hash)
+        _, prehash, pepper = split_tags(pw_hash)
+        return pw_hash, self._prepare_password(
+            password, prehash is not None or self._legacy_long_passwords,
+            pepper
+            )
+
+    def _tag_hash(self, pw_hash: bytes) -> bytes:
+        '''
+        Tags a new hash with the current pepper key, or as made with the
+        long password workaround when `BCRYPT_HANDLE_LONG_PASSWORDS` is
+        enabled.
+
+        :param pw_hash: The new hash.
+        '''
+        if self._pepper is not None:
+            return self._pepper.tag() + pw_hash
+        if self._handle_long_passwords:
+            return PREHASH_TAG + pw_hash
+        return pw_hash
+
+    def _gensalt(
+        self,
+        rounds: Optional[int] = None,
+        prefix: Optional[Union[str, bytes]] = None
+    ) -> bytes:
+        '''
+        Generates a salt, falling back to the configured rounds and prefix.
+        Salts for the configured ones come from the salt pool, if enabled.
+
+        :param rounds: The optional number of rounds.
+        :param prefix: The algorithm version to use.
+        '''
+        if rounds is None:
+            rounds = self._log_rounds
+        if prefix is None:
+            prefix = self._prefix
+
+        prefix = self._unicode_to_bytes(prefix)
+        pool = self._salt_pool
+        if pool is not None and (rounds, prefix) == (pool.rounds, pool.prefix):
+            return pool.take()
+        return self._backend.gensalt(rounds, prefix)
+
     def generate_password_hash(
         self,
         password: Union[str, bytes],
@@ -152,21 +1017,12 @@ class Bcrypt(object):
         if not password:
             raise ValueError('Password cannot be none.')
 
-        if rounds is None:
-            rounds = self._log_rounds
-        if prefix is None:
-            prefix = self._prefix
+        salt = self._gensalt(rounds, prefix)
+        pw_hash, compute = self._hashpw(
+            'hash', self._prepare_password(password), salt)
 
-        # Python 3 unicode strings must be encoded as bytes before hashing.
-        password = self._unicode_to_bytes(password)
-        prefix = self._unicode_to_bytes(prefix)
-
-        if self._handle_long_passwords:
-            password = hashlib.sha256(password).hexdigest()
-            password = self._unicode_to_bytes(password)
-
-        salt = bcrypt.gensalt(rounds=rounds, prefix=prefix)
-        return bcrypt.hashpw(password, salt)
+        self._notify('hash', 'sync', salt, 0.0, compute)
+        return self._tag_hash(pw_hash)
 
     def check_password_hash(
             self, pw_hash: Union[str, bytes],
@@ -187,25 +1043,63 @@ class Bcrypt(object):
         :param password: The password to compare.
         '''
 
-        # Python 3 unicode strings must be encoded as bytes before hashing.
-        pw_hash = self._unicode_to_bytes(pw_hash)
-        password = self._unicode_to_bytes(password)
+        pw_hash, password = self._prepare_check(pw_hash, password)
 
-        if self._handle_long_passwords:
-            password = hashlib.sha256(password).hexdigest()
-            password = self._unicode_to_bytes(password)
+        if self._cache is not None and self._cache.get(pw_hash, password):
+            return True
+
+        untagged = split_tags(pw_hash)[0]
+        candidate, compute = self._hashpw('check', password, untagged)
+        result = hmac.compare_digest(candidate, untagged)
+
+        self._notify('check', 'sync', pw_hash, 0.0, compute, result)
+        if result and self._cache is not None:
+            self._cache.add(pw_hash, password)
+        return result
+
+    def check_password_hash_or_dummy(
+        self,
+        pw_hash: Optional[Union[str, bytes]],
+        password: Union[str, bytes]
+    ) -> bool:
+        '''
+        Tests a password like :meth:`check_password_hash`, but also accepts
+        None for the hash of a user that does not exist. The password is then
+        checked against :attr:`dummy_hash` and `False` is returned, so the
+        call takes as long as a real check and does not reveal whether the
+        user exists. Either way the same work is done, and it is reported to
+        the observers as a check.
+
+        Example usage of :class:`check_password_hash_or_dummy` would look
+        something like this::
 
-        return hmac.compare_digest(bcrypt.hashpw(password, pw_hash), pw_hash)
+            user = await find_user(username)
+            valid = bcrypt.check_password_hash_or_dummy(
+                user.pw_hash if user else None, password
+                )
+
+        :param pw_hash: The hash to be compared against, or None.
+        :param password: The password to compare.
+        '''
+        if pw_hash is not None:
+            return self.check_password_hash(pw_hash, password)
+
+        self.check_password_hash(self.dummy_hash, password)
+        return False
 
     async def async_generate_password_hash(
         self,
         password: Union[str, bytes],
         rounds: Optional[int] = None,
-        prefix: Optional[Union[str, bytes]] = None
+        prefix: Optional[Union[str, bytes]] = None,
+        priority: str = INTERACTIVE,
+        timeout: Optional[float] = None
     ) -> bytes:
         """
-        Wraps the generate_password_hash function in Quarts run_sync function
-        to ensure the sync function is run within the event loop.
+        The async version of generate_password_hash. The salt is generated
+        on the event loop and only the bcrypt computation is run in the
+        extension's hashing pool, so the event loop is not blocked while
+        bcrypt works.
 
         Example usage of :class:`async_generate_password_hash` might look
         something like this::
@@ -215,19 +1109,38 @@ class Bcrypt(object):
         :param password: The password to be hashed.
         :param rounds: The optional number of rounds.
         :param prefix: The algorithm version to use.
+        :param priority: Either `'interactive'` or `'background'`.
+        :param timeout: The seconds the call may take at most.
+        :raises BcryptTimeout: If the hash cannot finish within `timeout`.
         """
 
-        return await run_sync(
-            self.generate_password_hash)(password, rounds, prefix)
+        if not password:
+            raise ValueError('Password cannot be none.')
+
+        salt = self._gensalt(rounds, prefix)
+        pw_hash, wait, compute = await self._async_hashpw(
+            'hash', self._prepare_password(password), salt, priority,
+            timeout)
+
+        self._notify('hash', 'async', salt, wait, compute)
+        return self._tag_hash(pw_hash)
 
     async def async_check_password_hash(
             self,
             pw_hash: Union[str, bytes],
-            password: Union[str, bytes]
+            password: Union[str, bytes],
+            key: Optional[str] = None,
+            priority: str = INTERACTIVE,
+            timeout: Optional[float] = None
     ) -> bool:
         """
-        Wraps the check_password_hash function in Quarts run_sync function to
-        ensure the sync function is run within the event loop.
+        The async version of check_password_hash. Only the bcrypt
+        computation is run in the extension's hashing pool, so the event loop
+        is not blocked while bcrypt works.
+
+        If `key` is given and `BCRYPT_RATE_LIMIT` is set, the call uses an
+        attempt of `key` first, and raises :class:`BcryptRateLimited` without
+        hashing if it has none left.
 
         Example usage of :class:`async_check_password_hash` would look
         something like this::
@@ -237,6 +1150,454 @@ class Bcrypt(object):
 
         :param pw_hash: The hash to be compared against.
         :param password: The password to compare.
+        :param key: The optional key to rate limit the attempt by.
+        :param priority: Either `'interactive'` or `'background'`.
+        :param timeout: The seconds the call may take at most.
+        :raises BcryptTimeout: If the check cannot finish within `timeout`.
+        """
+        if key is not None and self._rate_limiter is not None:
+            await self._rate_limiter.hit(key)
+
+        pw_hash, password = self._prepare_check(pw_hash, password)
+
+        if self._cache is not None and self._cache.get(pw_hash, password):
+            return True
+
+        if self._coalescer is None:
+            return await self._async_check(
+                pw_hash, password, priority, timeout)
+
+        # Calls only share a check that runs in their lane and with their
+        # time limit.
+        return await self._coalescer.run(
+            pw_hash, password,
+            partial(self._async_check, pw_hash, password, priority, timeout),
+            (priority, timeout)
+            )
+
+    async def _async_check(
+        self,
+        pw_hash: bytes,
+        password: bytes,
+        priority: str,
+        timeout: Optional[float]
+    ) -> bool:
+        """
+        Checks a prepared password against a hash in the hashing pool, and
+        reports and caches the result.
+
+        :param pw_hash: The hash to be compared against.
+        :param password: The prepared password.
+        :param priority: Either `'interactive'` or `'background'`.
+        :param timeout: The seconds the check may take at most.
+        """
+        untagged = split_tags(pw_hash)[0]
+        candidate, wait, compute = await self._async_hashpw(
+            'check', password, untagged, priority, timeout)
+        result = hmac.compare_digest(candidate, untagged)
+
+        self._notify('check', 'async', pw_hash, wait, compute, result)
+        if result and self._cache is not None:
+            self._cache.add(pw_hash, password)
+        return result
+
+    async def async_check_password_hash_or_dummy(
+        self,
+        pw_hash: Optional[Union[str, bytes]],
+        password: Union[str, bytes],
+        key: Optional[str] = None,
+        priority: str = INTERACTIVE,
+        timeout: Optional[float] = None
+    ) -> bool:
+        """
+        The async version of check_password_hash_or_dummy. Checks against the
+        dummy hash go through the same admission control and hashing pool as
+        real checks, so they are throttled and queued the same way. They are
+        never coalesced, since a missing user whose check returns early by
+        sharing another would be told apart by its timing.
+
+        :param pw_hash: The hash to be compared against, or None.
+        :param password: The password to compare.
+        :param key: The optional key to rate limit the attempt by.
+        :param priority: Either `'interactive'` or `'background'`.
+        :param timeout: The seconds the call may take at most.
+        """
+        if pw_hash is not None:
+            return await self.async_check_password_hash(
+                pw_hash, password, key, priority, timeout)
+
+        if key is not None and self._rate_limiter is not None:
+            await self._rate_limiter.hit(key)
+
+        pw_hash, password = self._prepare_check(self.dummy_hash, password)
+        await self._async_check(pw_hash, password, priority, timeout)
+        return False
+
+    def needs_rehash(self, pw_hash: Union[str, bytes]) -> bool:
+        '''
+        Tests whether a hash was made by another backend, or uses another
+        prefix, a lower cost, another long password setting or another
+        pepper key than the current configuration. The hash is
+        only parsed with :func:`parse_hash`, so this takes microseconds.
+        Hashes are never downgraded to a lower cost, and malformed hashes
+        always need a new one.
+
+        Example usage of :class:`needs_rehash` might look something like
+        this::
+
+            stale = [
+                user for user in users if bcrypt.needs_rehash(user.pw_hash)
+            ]
+
+        :param pw_hash: The encoded hash to inspect.
+        '''
+        try:
+            info = parse_hash(pw_hash)
+        except ValueError:
+            return True
+        return self.is_outdated(info.settings)
+
+    @property
+    def hash_settings(self) -> HashSettings:
+        '''
+        The `(backend, prefix, cost, pepper, prehash)` new hashes are made
+        with, in the form of :attr:`HashInfo.settings`.
+        '''
+        prefix = self._unicode_to_bytes(self._prefix).decode('ascii')
+        pepper = self._pepper.current if self._pepper is not None else None
+        # Peppered hashes never carry the long password tag, as the HMAC
+        # digest already fits within bcrypt's limit.
+        prehash = None
+        if self._handle_long_passwords and pepper is None:
+            prehash = 'sha256'
+        return self._backend.name, prefix, self._log_rounds, pepper, prehash
+
+    def is_outdated(
+        self,
+        settings: Optional[HashSettings],
+        rounds: Optional[int] = None
+    ) -> bool:
+        '''
+        Tests whether hashes with the given :attr:`HashInfo.settings` need a
+        new hash. This is the policy of :meth:`needs_rehash`, for hashes
+        that are already parsed, such as the groups counted by
+        `quart bcrypt audit`.
+
+        :param settings: The settings of the hashes, or None if they are
+            malformed.
+        :param rounds: The cost to compare against. Defaults to
+            `BCRYPT_LOG_ROUNDS`.
+        '''
+        if settings is None:
+            return True
+
+        backend, prefix, cost, pepper, prehash = self.hash_settings
+        if rounds is not None:
+            cost = rounds
+        return (
+            settings[:2] != (backend, prefix)
+            or settings[2] < cost
+            or settings[3] != pepper
+            or (settings[4] is None) != (prehash is None)
+        )
+
+    def verify_and_update(
+        self,
+        pw_hash: Union[str, bytes],
+        password: Union[str, bytes]
+    ) -> Tuple[bool, Optional[bytes]]:
+        '''
+        Tests a password hash against a candidate password like
+        :meth:`check_password_hash`, and when the password matches and the
+        hash was made with an older prefix or a lower cost than currently
+        configured, also generates a new hash to store in its place. This
+        allows raising `BCRYPT_LOG_ROUNDS` and migrating users gradually as
+        they log in. No extra hashing is done when no upgrade is needed.
+
+        Returns a tuple of whether the password matched and the new hash, or
+        None if the stored hash is up to date or the password did not match.
+
+        Example usage of :class:`verify_and_update` might look something
+        like this::
+
+            valid, new_hash = bcrypt.verify_and_update(user.pw_hash, password)
+            if valid and new_hash:
+                user.pw_hash = new_hash
+
+        :param pw_hash: The hash to be compared against.
+        :param password: The password to compare.
+        '''
+        if not self.check_password_hash(pw_hash, password):
+            return False, None
+
+        if not self.needs_rehash(pw_hash):
+            return True, None
+
+        if self._cache is not None:
+            self._cache.invalidate(pw_hash)
+        return True, self.generate_password_hash(password)
+
+    async def async_verify_and_update(
+        self,
+        pw_hash: Union[str, bytes],
+        password: Union[str, bytes],
+        key: Optional[str] = None,
+        priority: str = INTERACTIVE,
+        timeout: Optional[float] = None
+    ) -> Tuple[bool, Optional[bytes]]:
+        """
+        The async version of verify_and_update.
+
+        Example usage of :class:`async_verify_and_update` might look
+        something like this::
+
+            valid, new_hash = await bcrypt.async_verify_and_update(
+                user.pw_hash, password)
+
+        :param pw_hash: The hash to be compared against.
+        :param password: The password to compare.
+        :param key: The optional key to rate limit the attempt by.
+        :param priority: Either `'interactive'` or `'background'`.
+        :param timeout: The seconds the check may take at most. The new hash
+            is not limited, as the password was already accepted.
         """
+        if not await self.async_check_password_hash(
+            pw_hash, password, key, priority, timeout
+        ):
+            return False, None
 
-        return await run_sync(self.check_password_hash)(pw_hash, password)
+        if not self.needs_rehash(pw_hash):
+            return True, None
+
+        if self._cache is not None:
+            self._cache.invalidate(pw_hash)
+        return True, await self.async_generate_password_hash(
+            password, priority=priority)
+
+    def _batch_limit(self, priority: str) -> int:
+        '''
+        Returns how many chunks of an async batch may wait for or hold a
+        slot at once: the slots admission control lets `priority` use. The
+        chunks of a batch so never queue behind each other, and a batch
+        alone never fills `BCRYPT_MAX_QUEUE`.
+
+        :param priority: Either `'interactive'` or `'background'`.
+        '''
+        admission = self.admission
+        if priority == BACKGROUND:
+            return admission.max_concurrency - admission.reserved
+        return admission.max_concurrency
+
+    def _background_limit(self) -> int:
+        '''
+        Returns how many chunks of a sync batch may be in the pool at once.
+        Sync batches bypass the admission controller and go straight to the
+        pool, so they are kept to the workers left once the reserved slots
+        are taken out, and never fewer than one.
+        '''
+        admission = self.admission
+        workers = min(admission.max_concurrency, self.executor.max_workers)
+        return max(1, workers - admission.reserved)
+
+    def _prepare_pair(
+        self,
+        pair: Tuple[Union[str, bytes], Union[str, bytes]]
+    ) -> Tuple[bytes, bytes]:
+        '''
+        Encodes a `(pw_hash, password)` pair for a batch check, with the
+        long password tag split off the hash.
+
+        :param pair: The hash and candidate password.
+        '''
+        pw_hash, password = self._prepare_check(*pair)
+        return split_tags(pw_hash)[0], password
+
+    def check_password_hashes_many(
+        self,
+        pairs: Iterable[Tuple[Union[str, bytes], Union[str, bytes]]],
+        chunk_size: int = 16,
+        ordered: bool = True
+    ) -> Iterator[Tuple[int, bool]]:
+        '''
+        Tests many `(pw_hash, password)` pairs at once. The pairs are read
+        lazily, grouped into chunks of `chunk_size` and spread over the
+        extension's hashing pool, which saves a round trip to the pool for
+        every check. For each pair `(index, result)` is yielded, where
+        `index` is the position of the pair in `pairs`. The chunks leave
+        `BCRYPT_INTERACTIVE_RESERVED` workers of the pool free for logins.
+
+        Example usage of :class:`check_password_hashes_many` might look
+        something like this::
+
+            pairs = ((user.pw_hash, user.candidate) for user in users)
+            for index, result in bcrypt.check_password_hashes_many(pairs):
+                ...
+
+        :param pairs: The hashes and candidate passwords to compare.
+        :param chunk_size: The number of pairs checked in a single job.
+        :param ordered: Yield results in the order of `pairs`. If `False`,
+            results are yielded as soon as their chunk is done.
+        '''
+        chunks = iter_chunks(pairs, chunk_size, self._prepare_pair)
+        return stream_chunks(
+            self.executor, check_chunk, chunks,
+            self.executor.max_workers * 2, ordered, self._background_limit()
+            )
+
+    async def async_check_password_hashes_many(
+        self,
+        pairs: Union[
+            Iterable[Tuple[Union[str, bytes], Union[str, bytes]]],
+            AsyncIterable[Tuple[Union[str, bytes], Union[str, bytes]]]
+        ],
+        chunk_size: int = 16,
+        ordered: bool = True,
+        priority: str = BACKGROUND
+    ) -> AsyncIterator[Tuple[int, bool]]:
+        """
+        The async version of check_password_hashes_many. Each chunk goes
+        through admission control like a single call, so a batch never runs
+        more jobs at once than `BCRYPT_MAX_CONCURRENCY` allows. `pairs` may
+        also be an async iterable. Batches run as background work by
+        default, so interactive calls go ahead of their chunks.
+
+        Example usage of :class:`async_check_password_hashes_many` might
+        look something like this::
+
+            async for index, result in bcrypt.async_check_password_hashes_many(
+                pairs, ordered=False
+            ):
+                ...
+
+        :param pairs: The hashes and candidate passwords to compare.
+        :param chunk_size: The number of pairs checked in a single job.
+        :param ordered: Yield results in the order of `pairs`. If `False`,
+            results are yielded as soon as their chunk is done.
+        :param priority: Either `'interactive'` or `'background'`.
+        """
+        chunks = aiter_chunks(pairs, chunk_size, self._prepare_pair)
+        async for result in astream_chunks(
+            partial(self._run_job, priority=priority), check_chunk, chunks,
+            self.admission.max_concurrency * 2, ordered,
+            self._batch_limit(priority)
+        ):
+            yield result
+
+    def _prepare_new_password(self, password: Union[str, bytes]) -> bytes:
+        '''
+        Validates and prepares a password for a batch of new hashes.
+
+        :param password: The password to be hashed.
+        '''
+        if not password:
+            raise ValueError('Password cannot be none.')
+
+        return self._prepare_password(password)
+
+    def _hash_chunk_job(
+        self,
+        rounds: Optional[int],
+        prefix: Optional[Union[str, bytes]]
+    ) -> Callable[[list], list]:
+        '''
+        Returns the chunk job for a batch of new hashes, falling back to the
+        configured rounds and prefix.
+
+        :param rounds: The optional number of rounds.
+        :param prefix: The algorithm version to use.
+        '''
+        if rounds is None:
+            rounds = self._log_rounds
+        if prefix is None:
+            prefix = self._prefix
+
+        return partial(
+            hash_chunk, backend=self._backend, rounds=rounds,
+            prefix=self._unicode_to_bytes(prefix),
+            tag=self._tag_hash(b'')
+            )
+
+    def generate_password_hashes_many(
+        self,
+        passwords: Iterable[Union[str, bytes]],
+        rounds: Optional[int] = None,
+        prefix: Optional[Union[str, bytes]] = None,
+        chunk_size: int = 16,
+        ordered: bool = True
+    ) -> Iterator[Tuple[int, bytes]]:
+        '''
+        Generates password hashes for many passwords at once, for example
+        when provisioning accounts in bulk. The passwords are read lazily,
+        grouped into chunks of `chunk_size` and spread over the extension's
+        hashing pool, where each chunk generates its own salts. For each
+        password `(index, pw_hash)` is yielded, where `index` is the position
+        of the password in `passwords`. Only a bounded number of chunks is
+        held in memory, whatever the size of the input, and like
+        :meth:`check_password_hashes_many` it leaves the reserved slots free.
+
+        Example usage of :class:`generate_password_hashes_many` might look
+        something like this::
+
+            passwords = (user.password for user in new_users)
+            for index, pw_hash in bcrypt.generate_password_hashes_many(
+                passwords, rounds=10
+            ):
+                ...
+
+        :param passwords: The passwords to be hashed.
+        :param rounds: The optional number of rounds.
+        :param prefix: The algorithm version to use.
+        :param chunk_size: The number of passwords hashed in a single job.
+        :param ordered: Yield hashes in the order of `passwords`. If `False`,
+            hashes are yielded as soon as their chunk is done.
+        '''
+        job = self._hash_chunk_job(rounds, prefix)
+        chunks = iter_chunks(passwords, chunk_size, self._prepare_new_password)
+        return stream_chunks(
+            self.executor, job, chunks, self.executor.max_workers * 2, ordered,
+            self._background_limit()
+            )
+
+    async def async_generate_password_hashes_many(
+        self,
+        passwords: Union[
+            Iterable[Union[str, bytes]],
+            AsyncIterable[Union[str, bytes]]
+        ],
+        rounds: Optional[int] = None,
+        prefix: Optional[Union[str, bytes]] = None,
+        chunk_size: int = 16,
+        ordered: bool = True,
+        priority: str = BACKGROUND
+    ) -> AsyncIterator[Tuple[int, bytes]]:
+        """
+        The async version of generate_password_hashes_many. Each chunk goes
+        through admission control like a single call, as background work by
+        default. `passwords` may also be an async iterable, such as rows
+        streamed from a database.
+
+        Example usage of :class:`async_generate_password_hashes_many` might
+        look something like this::
+
+            async for index, pw_hash in (
+                bcrypt.async_generate_password_hashes_many(passwords)
+            ):
+                ...
+
+        :param passwords: The passwords to be hashed.
+        :param rounds: The optional number of rounds.
+        :param prefix: The algorithm version to use.
+        :param chunk_size: The number of passwords hashed in a single job.
+        :param ordered: Yield hashes in the order of `passwords`. If `False`,
+            hashes are yielded as soon as their chunk is done.
+        :param priority: Either `'interactive'` or `'background'`.
+        """
+        job = self._hash_chunk_job(rounds, prefix)
+        chunks = aiter_chunks(
+            passwords, chunk_size, self._prepare_new_password)
+        async for result in astream_chunks(
+            partial(self._run_job, priority=priority), job, chunks,
+            self.admission.max_concurrency * 2, ordered,
+            self._batch_limit(priority)
+        ):
+            yield result
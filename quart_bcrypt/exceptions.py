@@ -0,0 +1,68 @@
+"""
+quart_bcrypt.exceptions
+"""
+from __future__ import annotations
+from typing import Optional
+
+from werkzeug.exceptions import ServiceUnavailable, TooManyRequests
+
+
+class BcryptOverloaded(ServiceUnavailable):
+    '''
+    Raised by the async methods of :class:`Bcrypt` when the hashing queue
+    is full, so the call fails fast instead of waiting behind every other
+    job.
+
+    As a :class:`werkzeug.exceptions.ServiceUnavailable` it is turned into
+    a 503 response with a `Retry-After` header if it is not handled. A
+    custom error handler may be registered for it like any other error::
+
+        @app.errorhandler(BcryptOverloaded)
+        async def overloaded(error):
+            return 'Try again later.', 503, {
+                'Retry-After': str(error.retry_after)
+            }
+
+    :param retry_after: The number of seconds after which the client may
+        retry.
+    '''
+
+    description = 'Too many password hashing requests are waiting.'
+
+    def __init__(self, retry_after: Optional[int] = None) -> None:
+        super().__init__(retry_after=retry_after)
+
+
+class BcryptRateLimited(TooManyRequests):
+    '''
+    Raised by the async methods of :class:`Bcrypt` when the key given with
+    the call has used up its attempts, before any hashing is queued.
+
+    As a :class:`werkzeug.exceptions.TooManyRequests` it is turned into a
+    429 response with a `Retry-After` header if it is not handled.
+
+    :param key: The rate limited key.
+    :param retry_after: The number of seconds after which the key has an
+        attempt again.
+    '''
+
+    description = 'Too many password attempts. Try again later.'
+
+    def __init__(self, key: str, retry_after: Optional[int] = None) -> None:
+        super().__init__(retry_after=retry_after)
+        self.key = key
+
+
+class BcryptTimeout(BcryptOverloaded):
+    '''
+    Raised by the async methods of :class:`Bcrypt` when a call given a
+    `timeout` cannot finish in time, either because it waited too long for
+    a slot or because too little time is left for the hash. As a subclass
+    of :class:`BcryptOverloaded` it becomes a 503 response as well, and
+    error handlers for overload also handle it.
+
+    :param retry_after: The number of seconds after which the client may
+        retry.
+    '''
+
+    description = 'The password could not be hashed in time.'
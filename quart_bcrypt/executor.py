@@ -0,0 +1,200 @@
+"""
+quart_bcrypt.executor
+"""
+from __future__ import annotations
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor
+)
+from functools import partial
+from typing import Any, Callable, Optional
+import asyncio
+import os
+import threading
+
+EXECUTOR_KINDS = ('thread', 'process')
+
+
+def _wait_for_all(barrier: threading.Barrier) -> None:
+    '''
+    Blocks a worker thread until as many threads as `barrier` expects wait
+    on it, or for a second at most.
+
+    :param barrier: The barrier shared by the workers.
+    '''
+    try:
+        barrier.wait(1.0)
+    except threading.BrokenBarrierError:
+        pass
+
+
+class HashingExecutor(object):
+    '''
+    A bounded pool of workers owned by the extension that runs the blocking
+    bcrypt calls for the async API. Keeping bcrypt off the event loop's
+    default executor means slow hashing jobs cannot starve unrelated
+    `run_sync` work.
+
+    The pool is created lazily by :meth:`start` and may be started again
+    after :meth:`shutdown`, so an app can be served more than once::
+
+        executor = HashingExecutor(max_workers=4)
+        pw_hash = await executor.run(bcrypt.hashpw, password, salt)
+
+    With `kind='process'` the jobs are run in a
+    :class:`concurrent.futures.ProcessPoolExecutor` instead, which lets
+    hashing scale past a single process. Jobs sent to a process pool must be
+    picklable, so only module level functions and plain bytes should be
+    passed to :meth:`run`.
+
+    :param max_workers: The number of workers. Defaults to the number of CPUs
+        available.
+    :param kind: Either `'thread'` or `'process'`. Defaults to `'thread'`.
+    '''
+
+    thread_name_prefix: str = 'quart-bcrypt'
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        kind: str = 'thread'
+    ) -> None:
+        if max_workers is not None and max_workers < 1:
+            raise ValueError('max_workers must be greater than 0.')
+
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(
+                f'kind must be one of {", ".join(EXECUTOR_KINDS)}.'
+                )
+
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.kind = kind
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+
+    @property
+    def queue_depth(self) -> int:
+        '''
+        The number of jobs submitted to the pool that are still waiting for
+        a worker. For a process pool this is estimated from the number of
+        unfinished jobs, as the workers cannot report back when they start.
+        '''
+        return max(0, self._pending - self.active_workers)
+
+    @property
+    def active_workers(self) -> int:
+        '''
+        The number of workers currently running a job.
+        '''
+        if self.kind == 'process':
+            return min(self._pending, self.max_workers)
+        return self._active
+
+    @property
+    def running(self) -> bool:
+        '''
+        Whether the pool has been started and not yet shut down.
+        '''
+        return self._pool is not None
+
+    def start(self) -> None:
+        '''
+        Creates the worker pool if it is not already running.
+        '''
+        with self._lock:
+            if self._pool is None:
+                if self.kind == 'process':
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers
+                        )
+                else:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix=self.thread_name_prefix
+                        )
+
+    async def prefork(self) -> None:
+        '''
+        Starts the pool and runs a no-op job on each worker, so the cost of
+        spawning the workers is paid before the first request rather than
+        during it. A thread pool only adds a thread when no idle one is
+        left, so the jobs wait for each other until every thread is up.
+        '''
+        job: Callable[[], Any] = os.getpid
+        if self.kind == 'thread':
+            job = partial(_wait_for_all, threading.Barrier(self.max_workers))
+
+        await asyncio.gather(*(self.run(job) for _ in range(self.max_workers)))
+
+    def shutdown(self, wait: bool = True) -> None:
+        '''
+        Shuts down the worker pool. Jobs that have not started yet are
+        cancelled.
+
+        :param wait: Whether to block until the running jobs have finished.
+        '''
+        with self._lock:
+            pool, self._pool = self._pool, None
+
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> Future:
+        '''
+        Submits a job to the pool, starting it first if needed, and returns
+        a :class:`concurrent.futures.Future` for the result.
+
+        :param func: The blocking callable to run.
+        :param args: The positional arguments for `func`.
+        '''
+        self.start()
+
+        state = {'started': False}
+
+        def call() -> Any:
+            with self._lock:
+                state['started'] = True
+                self._active += 1
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._pending -= 1
+
+        def done(future: Future) -> None:
+            # Process jobs, and thread jobs cancelled while still queued,
+            # never run `call` in this process.
+            with self._lock:
+                if not state['started']:
+                    self._pending -= 1
+
+        with self._lock:
+            self._pending += 1
+
+        try:
+            if self.kind == 'process':
+                future = self._pool.submit(func, *args)
+            else:
+                future = self._pool.submit(call)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+        future.add_done_callback(done)
+        return future
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        '''
+        Runs a blocking callable in the pool and awaits its result.
+        Cancelling the awaiting task drops the job if it has not started.
+
+        :param func: The blocking callable to run.
+        :param args: The positional arguments for `func`.
+        '''
+        return await asyncio.wrap_future(self.submit(func, *args))
@@ -3,9 +3,37 @@ quart_bcrypt.helpers
 """
 from __future__ import annotations
 from typing import Optional, Union
+import threading
+
+from quart import current_app, has_app_context
 
 from .core import Bcrypt
 
+_shared: Optional[Bcrypt] = None
+_shared_lock = threading.Lock()
+
+
+def _get_bcrypt() -> Bcrypt:
+    '''
+    Returns the extension of the current app when there is an app context
+    and the extension was initialized with it. Otherwise a single
+    :class:`Bcrypt` shared by the whole process is returned, which is
+    created on first use. Either way the helpers reuse the same executor,
+    cache and observers rather than creating a new object for every call.
+    '''
+    global _shared
+
+    if has_app_context():
+        extension = current_app.extensions.get('bcrypt')
+        if extension is not None:
+            return extension
+
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = Bcrypt()
+    return _shared
+
 
 def generate_password_hash(
         password: Union[str, bytes],
@@ -13,9 +41,9 @@ def generate_password_hash(
 ) -> bytes:
     '''
     This helper function wraps the eponymous method of :class:`Bcrypt`. It
-    is intended to be used as a helper function at the expense of the
-    configuration variable provided when passing back the app object. In other
-    words this shortcut does not make use of the app object at all.
+    is intended to be used as a helper function. Inside an app context the
+    extension initialized with the app is used, along with its configuration.
+    Otherwise a default :class:`Bcrypt` shared by the process is used.
 
     To use this function, simply import it from the module and use it in a
     similar fashion as the original method would be used. Here is a quick
@@ -27,7 +55,7 @@ def generate_password_hash(
     :param password: The password to be hashed.
     :param rounds: The optional number of rounds.
     '''
-    return Bcrypt().generate_password_hash(password, rounds)
+    return _get_bcrypt().generate_password_hash(password, rounds)
 
 
 def check_password_hash(
@@ -36,9 +64,9 @@ def check_password_hash(
 ) -> bool:
     '''
     This helper function wraps the eponymous method of :class:`Bcrypt.` It
-    is intended to be used as a helper function at the expense of the
-    configuration variable provided when passing back the app object. In other
-    words this shortcut does not make use of the app object at all.
+    is intended to be used as a helper function. Inside an app context the
+    extension initialized with the app is used, along with its configuration.
+    Otherwise a default :class:`Bcrypt` shared by the process is used.
 
     To use this function, simply import it from the module and use it in a
     similar fashion as the original method would be used. Here is a quick
@@ -50,7 +78,7 @@ def check_password_hash(
     :param pw_hash: The hash to be compared against.
     :param password: The password to compare.
     '''
-    return Bcrypt().check_password_hash(pw_hash, password)
+    return _get_bcrypt().check_password_hash(pw_hash, password)
 
 
 async def async_generate_password_hash(
@@ -58,9 +86,9 @@ async def async_generate_password_hash(
 ) -> bytes:
     """
     This async helper function wraps the eponymous method of :class:`Bcrypt`.
-    It is intended to be used as a helper function at the expense of the
-    configuration variable provided when passing back the app object. In other
-    words this shortcut does not make use of the app object at all.
+    It is intended to be used as a helper function. Inside an app context the
+    extension initialized with the app is used, along with its configuration.
+    Otherwise a default :class:`Bcrypt` shared by the process is used.
 
     To use this function, simply import it from the module and use it in a
     similar fashion as the original method would be used. Here is a quick
@@ -72,17 +100,17 @@ async def async_generate_password_hash(
     :param password: The password to be hashed.
     :param rounds: The optional number of rounds.
     """
-    return await Bcrypt().async_generate_password_hash(password, rounds)
+    return await _get_bcrypt().async_generate_password_hash(password, rounds)
 
 
 async def async_check_password_hash(
         pw_hash: Union[str, bytes], password: str
 ) -> bool:
     """This async helper function wraps the eponymous method of
-    :class:`Bcrypt.` It is intended to be used as a helper function at the
-    expense of the configuration variable provided when passing back the app
-    object. In other words this shortcut does not make use of the app object
-    at all.
+    :class:`Bcrypt.` It is intended to be used as a helper function. Inside an
+    app context the extension initialized with the app is used, along with
+    its configuration. Otherwise a default :class:`Bcrypt` shared by the
+    process is used.
 
     To use this function, simply import it from the module and use it in a
     similar fashion as the original method would be used. Here is a quick
@@ -94,4 +122,4 @@ async def async_check_password_hash(
     :param pw_hash: The hash to be compared against.
     :param password: The password to compare.
     """
-    return await Bcrypt().async_check_password_hash(pw_hash, password)
+    return await _get_bcrypt().async_check_password_hash(pw_hash, password)
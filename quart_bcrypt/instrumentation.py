@@ -0,0 +1,209 @@
+"""
+quart_bcrypt.instrumentation
+"""
+from __future__ import annotations
+from bisect import bisect_left
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple
+)
+import threading
+import time
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+
+def timed_call(func: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    '''
+    Calls `func` and returns its result with the time it took in seconds.
+    This runs inside the worker, so the time does not include waiting for
+    it. It is a module level function, so it may be sent to a process pool.
+
+    :param func: The callable to time.
+    :param args: The positional arguments for `func`.
+    '''
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class HashEvent(NamedTuple):
+    '''
+    Describes a single call of :meth:`Bcrypt.generate_password_hash`,
+    :meth:`Bcrypt.check_password_hash` or their async versions.
+
+    :param operation: Either `'hash'` or `'check'`.
+    :param mode: Either `'sync'` or `'async'`.
+    :param rounds: The cost factor of the hash, or None if it is malformed.
+    :param prefix: The algorithm version of the hash, or None if it is
+        malformed.
+    :param long_passwords: Whether the long password workaround was used.
+    :param queue_wait: Seconds spent waiting for admission and a worker.
+        Always 0 for sync calls.
+    :param compute_time: Seconds spent in bcrypt.
+    :param result: The result of a check, or None for a hash.
+    :param error: The name of the exception raised by bcrypt, if any.
+    '''
+
+    operation: str
+    mode: str
+    rounds: Optional[int]
+    prefix: Optional[str]
+    long_passwords: bool
+    queue_wait: float
+    compute_time: float
+    result: Optional[bool] = None
+    error: Optional[str] = None
+
+
+class HashObserver(Protocol):
+    '''
+    The interface of objects receiving a :class:`HashEvent` for each call,
+    registered with :meth:`Bcrypt.add_observer`. Observers are called on the
+    thread that made the call, so they should return quickly.
+    '''
+
+    def observe(self, event: HashEvent) -> None:
+        ...
+
+
+class Histogram(object):
+    '''
+    A cumulative histogram with fixed bucket boundaries, in the layout used
+    by Prometheus, so it may be exported without further work.
+
+    :param buckets: The upper bounds of the buckets, in ascending order.
+    '''
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.bounds = tuple(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self._counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        '''
+        Records a value.
+
+        :param value: The value to record.
+        '''
+        self._counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def buckets(self) -> List[Tuple[float, int]]:
+        '''
+        The `(upper bound, cumulative count)` of every bucket, ending with
+        the `+Inf` bucket.
+        '''
+        total = 0
+        buckets = []
+        for bound, count in zip(self.bounds + (float('inf'),), self._counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+    def quantile(self, q: float) -> float:
+        '''
+        Estimates a quantile as the upper bound of the bucket it falls in.
+
+        :param q: The quantile, between 0 and 1.
+        '''
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, total in self.buckets:
+            if total >= rank:
+                return bound
+        return float('inf')
+
+
+class InMemoryMetrics(object):
+    '''
+    A :class:`HashObserver` keeping histograms of the queue wait and compute
+    time, and counters of the results, for each operation and mode. It has
+    no dependencies; :meth:`snapshot` returns plain data to export to a
+    metrics system such as Prometheus::
+
+        metrics = InMemoryMetrics()
+        bcrypt.add_observer(metrics)
+
+        metrics.compute_time[('check', 'async')].quantile(0.99)
+
+    :param buckets: The bucket bounds of the histograms in seconds.
+    '''
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.queue_wait: Dict[Tuple[str, str], Histogram] = {}
+        self.compute_time: Dict[Tuple[str, str], Histogram] = {}
+        self.results: Dict[Tuple[str, str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, event: HashEvent) -> None:
+        '''
+        Records an event.
+
+        :param event: The event to record.
+        '''
+        key = (event.operation, event.mode)
+        if event.error is not None:
+            outcome = 'error'
+        elif event.result is None:
+            outcome = 'ok'
+        else:
+            outcome = 'match' if event.result else 'mismatch'
+
+        with self._lock:
+            if key not in self.compute_time:
+                self.queue_wait[key] = Histogram(self.buckets)
+                self.compute_time[key] = Histogram(self.buckets)
+            self.queue_wait[key].observe(event.queue_wait)
+            self.compute_time[key].observe(event.compute_time)
+            self.results[key + (outcome,)] = (
+                self.results.get(key + (outcome,), 0) + 1
+                )
+
+    def snapshot(self) -> Dict[str, Any]:
+        '''
+        Returns the recorded metrics as plain data.
+        '''
+        def histograms(
+            source: Dict[Tuple[str, str], Histogram]
+        ) -> List[Dict[str, Any]]:
+            return [
+                {
+                    'operation': operation,
+                    'mode': mode,
+                    'count': histogram.count,
+                    'sum': histogram.sum,
+                    'buckets': histogram.buckets,
+                }
+                for (operation, mode), histogram in source.items()
+            ]
+
+        with self._lock:
+            return {
+                'queue_wait_seconds': histograms(self.queue_wait),
+                'compute_seconds': histograms(self.compute_time),
+                'results': [
+                    {
+                        'operation': operation,
+                        'mode': mode,
+                        'outcome': outcome,
+                        'count': count,
+                    }
+                    for (operation, mode, outcome), count
+                    in self.results.items()
+                ],
+            }
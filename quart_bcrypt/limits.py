@@ -0,0 +1,243 @@
+"""
+quart_bcrypt.limits
+"""
+from __future__ import annotations
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+import asyncio
+
+from .exceptions import BcryptOverloaded, BcryptTimeout
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+
+
+class AdmissionController(object):
+    '''
+    Limits how many hashing jobs may run at once and how many may wait for
+    a free slot. Calls beyond the queue limit are rejected straight away
+    with :class:`BcryptOverloaded`, which keeps the latency of the admitted
+    calls bounded during a burst::
+
+        admission = AdmissionController(max_concurrency=4, max_queue=64)
+
+        async with admission.slot():
+            pw_hash = await executor.run(bcrypt.hashpw, password, salt)
+
+    Calls have a priority, either `'interactive'`, such as logins, or
+    `'background'`, such as bulk rehashing. Each priority waits in its own
+    queue, and a free slot goes to the longest waiting interactive call
+    before any background call. Background calls may also never hold the
+    `reserved` slots, so interactive calls find a free slot straight away
+    even while a bulk job keeps the others busy::
+
+        async with admission.slot('background'):
+            ...
+
+    Within a priority, waiting calls are admitted in the order they arrived.
+    A call cancelled while waiting, or waiting longer than its `timeout`,
+    gives up its place in the queue.
+
+    :param max_concurrency: The number of jobs that may run at once.
+    :param max_queue: The number of calls of each priority that may wait for
+        a slot. Defaults to None, which means the queues are unbounded.
+    :param retry_after: The `Retry-After` hint in seconds given to rejected
+        calls.
+    :param reserved: The number of slots kept for interactive calls. Must be
+        lower than `max_concurrency`.
+    '''
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: Optional[int] = None,
+        retry_after: int = 1,
+        reserved: int = 0
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be greater than 0.')
+
+        if max_queue is not None and max_queue < 0:
+            raise ValueError('max_queue cannot be negative.')
+
+        if not 0 <= reserved < max_concurrency:
+            raise ValueError(
+                'reserved must be at least 0 and lower than max_concurrency.'
+                )
+
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.reserved = reserved
+        self._running: Dict[str, int] = dict.fromkeys(PRIORITIES, 0)
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {
+            priority: deque() for priority in PRIORITIES
+        }
+
+    @property
+    def in_flight(self) -> int:
+        '''
+        The number of admitted calls that have not released their slot.
+        '''
+        return sum(self._running.values())
+
+    @property
+    def queued(self) -> int:
+        '''
+        The number of calls waiting for a slot.
+        '''
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def running(self, priority: str) -> int:
+        '''
+        Returns the number of admitted calls of a priority.
+
+        :param priority: Either `'interactive'` or `'background'`.
+        '''
+        return self._running[priority]
+
+    def waiting(self, priority: str) -> int:
+        '''
+        Returns the number of calls of a priority waiting for a slot.
+
+        :param priority: Either `'interactive'` or `'background'`.
+        '''
+        return len(self._waiters[priority])
+
+    def resize(self, max_concurrency: int) -> None:
+        '''
+        Changes the number of jobs that may run at once. Raising it hands
+        the new slots to waiting calls straight away. Lowering it below the
+        number of running jobs lets them finish, and no call is admitted
+        until they have dropped below the new limit.
+
+        :param max_concurrency: The new number of jobs that may run at once.
+            Must be greater than `reserved`.
+        '''
+        if not self.reserved < max_concurrency:
+            raise ValueError('max_concurrency must be greater than reserved.')
+
+        self.max_concurrency = max_concurrency
+        self._wake()
+
+    def _can_start(self, priority: str) -> bool:
+        '''
+        Tests whether a call of `priority` may take a slot now.
+
+        :param priority: Either `'interactive'` or `'background'`.
+        '''
+        if self.in_flight >= self.max_concurrency:
+            return False
+        if priority == BACKGROUND:
+            return (
+                self._running[BACKGROUND]
+                < self.max_concurrency - self.reserved
+                )
+        return True
+
+    async def acquire(
+        self,
+        priority: str = INTERACTIVE,
+        timeout: Optional[float] = None
+    ) -> None:
+        """
+        Waits for a free slot.
+
+        :param priority: Either `'interactive'` or `'background'`.
+        :param timeout: The seconds to wait at most. Defaults to None, which
+            waits as long as it takes.
+        :raises BcryptOverloaded: If the queue is full.
+        :raises BcryptTimeout: If no slot was free within `timeout`.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(
+                f'priority must be one of {", ".join(PRIORITIES)}.'
+                )
+
+        ahead = [self._waiters[INTERACTIVE]]
+        if priority == BACKGROUND:
+            ahead.append(self._waiters[BACKGROUND])
+
+        if self._can_start(priority) and not any(ahead):
+            self._running[priority] += 1
+            return
+
+        waiters = self._waiters[priority]
+        if self.max_queue is not None and len(waiters) >= self.max_queue:
+            raise BcryptOverloaded(self.retry_after)
+
+        if timeout is not None and timeout <= 0:
+            raise BcryptTimeout(self.retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            if waiter.cancelled():
+                try:
+                    waiters.remove(waiter)
+                except ValueError:
+                    pass
+            else:
+                # The slot was handed over just as the time ran out.
+                self.release(priority)
+            raise BcryptTimeout(self.retry_after) from None
+        except asyncio.CancelledError:
+            if waiter.cancelled():
+                # `release` may already have skipped over it.
+                try:
+                    waiters.remove(waiter)
+                except ValueError:
+                    pass
+            else:
+                # The slot was handed over just before the cancellation.
+                self.release(priority)
+            raise
+
+    def release(self, priority: str = INTERACTIVE) -> None:
+        '''
+        Frees a slot, handing free slots to the longest waiting interactive
+        calls first and then to background calls, as far as the reserved
+        slots allow.
+
+        :param priority: The priority the slot was acquired with.
+        '''
+        self._running[priority] -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        '''
+        Hands free slots to waiting calls.
+        '''
+        for priority in PRIORITIES:
+            waiters = self._waiters[priority]
+            while waiters and self._can_start(priority):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self._running[priority] += 1
+                    waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: str = INTERACTIVE,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[None]:
+        """
+        An async context manager holding a slot for the duration of the
+        block.
+
+        :param priority: Either `'interactive'` or `'background'`.
+        :param timeout: The seconds to wait for a slot at most.
+        :raises BcryptOverloaded: If the queue is full.
+        :raises BcryptTimeout: If no slot was free within `timeout`.
+        """
+        await self.acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release(priority)
@@ -0,0 +1,105 @@
+"""
+quart_bcrypt.pepper
+"""
+from __future__ import annotations
+from collections import Counter
+from typing import Iterable, Mapping, Optional, Union
+import hashlib
+import hmac
+
+from .backends import _KEY_ID, PEPPER_TAG, parse_hashes
+
+
+class PepperKeyring(object):
+    '''
+    Server side secrets combined with passwords before they are hashed, so
+    a leaked database alone is not enough to guess passwords. A password is
+    replaced by the hex HMAC-SHA256 of it under a key, and the hash is
+    tagged with the id of that key, as in `$pepper$<key id>$2b$12$...`::
+
+        keyring = PepperKeyring({'2024': old_secret, '2025': new_secret})
+
+    New hashes use the `current` key, the last one by default. A check reads
+    the key id from the hash and uses that key only, so keeping old keys
+    around for rotation costs a single bcrypt run per check. The HMAC digest
+    is 64 bytes, so peppered passwords are never cut short by bcrypt.
+
+    :param keys: The secrets by key id. Ids are up to 32 letters, digits,
+        `_` or `-`.
+    :param current: The id of the key for new hashes.
+    '''
+
+    def __init__(
+        self,
+        keys: Mapping[str, Union[str, bytes]],
+        current: Optional[str] = None
+    ) -> None:
+        if not keys:
+            raise ValueError('A pepper keyring needs at least one key.')
+
+        self._keys = {}
+        for key_id, secret in keys.items():
+            if not _KEY_ID.fullmatch(key_id.encode('ascii', 'replace')):
+                raise ValueError(f'Invalid pepper key id {key_id!r}.')
+            if isinstance(secret, str):
+                secret = secret.encode('utf-8')
+            self._keys[key_id] = secret
+
+        if current is None:
+            current = key_id
+        if current not in self._keys:
+            raise ValueError(f'Unknown pepper key {current!r}.')
+        self.current = current
+
+    def __contains__(self, key_id: object) -> bool:
+        return key_id in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def apply(self, password: bytes, key_id: Optional[str] = None) -> bytes:
+        '''
+        Returns the hex HMAC-SHA256 of a password under a key.
+
+        :param password: The encoded password.
+        :param key_id: The id of the key. Defaults to the current key.
+        '''
+        if key_id is None:
+            key_id = self.current
+        try:
+            secret = self._keys[key_id]
+        except KeyError:
+            raise ValueError(f'Unknown pepper key {key_id!r}.') from None
+
+        digest = hmac.new(secret, password, hashlib.sha256).hexdigest()
+        return digest.encode('ascii')
+
+    def tag(self, key_id: Optional[str] = None) -> bytes:
+        '''
+        Returns the tag put in front of hashes made with a key.
+
+        :param key_id: The id of the key. Defaults to the current key.
+        '''
+        if key_id is None:
+            key_id = self.current
+        return PEPPER_TAG + b'$' + key_id.encode('ascii')
+
+    def audit(
+        self,
+        pw_hashes: Iterable[Union[str, bytes]]
+    ) -> Counter:
+        '''
+        Counts the hashes made with each key, to tell when an old key no
+        longer covers any hash and may be dropped. Hashes without a pepper
+        are counted under None and malformed hashes are skipped. The hashes
+        are read lazily, so the column does not need to fit in memory::
+
+            counts = keyring.audit(user.pw_hash for user in users)
+            counts['2024']  # 1520
+
+        :param pw_hashes: The encoded hashes.
+        '''
+        return Counter(
+            info.pepper for info in parse_hashes(pw_hashes)
+            if info is not None
+        )
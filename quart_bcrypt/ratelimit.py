@@ -0,0 +1,129 @@
+"""
+quart_bcrypt.ratelimit
+"""
+from __future__ import annotations
+from typing import Dict, Optional, Protocol, Tuple
+import math
+import time
+
+from .exceptions import BcryptRateLimited
+
+
+class RateLimitStore(Protocol):
+    '''
+    The interface of the storage behind a :class:`RateLimiter`. The default
+    :class:`MemoryRateLimitStore` keeps the buckets of one process; a store
+    backed by Redis or a database shares them between processes and hosts.
+    '''
+
+    async def consume(self, key: str, rate: float, burst: int) -> float:
+        """
+        Takes a token from the bucket of `key`, which holds at most `burst`
+        tokens and gains `rate` tokens per second. Returns 0 if a token was
+        taken, or else the seconds until the bucket has one again.
+
+        :param key: The key of the bucket.
+        :param rate: The tokens added per second.
+        :param burst: The capacity of the bucket.
+        """
+        ...
+
+
+class MemoryRateLimitStore(object):
+    '''
+    Keeps token buckets in a dictionary. Each attempt updates a single
+    entry, which records when the bucket will be full again, and every
+    `evict_interval` seconds the buckets that have filled up again are
+    dropped, as they are the same as a missing bucket.
+
+    :param evict_interval: The seconds between evictions of full buckets.
+    '''
+
+    def __init__(self, evict_interval: float = 60) -> None:
+        self.evict_interval = evict_interval
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._next_eviction = time.monotonic() + evict_interval
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def consume(self, key: str, rate: float, burst: int) -> float:
+        """
+        Takes a token from the bucket of `key`.
+
+        :param key: The key of the bucket.
+        :param rate: The tokens added per second.
+        :param burst: The capacity of the bucket.
+        """
+        now = time.monotonic()
+        if now >= self._next_eviction:
+            self._evict(now)
+
+        tokens, updated, _ = self._buckets.get(key, (burst, now, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+
+        wait = 0.0
+        if tokens < 1:
+            wait = (1 - tokens) / rate
+        else:
+            tokens -= 1
+
+        self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+        return wait
+
+    def _evict(self, now: float) -> None:
+        '''
+        Drops the buckets that are full again.
+
+        :param now: The current time.
+        '''
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items()
+            if bucket[2] > now
+        }
+        self._next_eviction = now + self.evict_interval
+
+
+class RateLimiter(object):
+    '''
+    Limits password attempts per key, such as a username or IP address,
+    with a token bucket: each key may make `attempts` attempts at once, and
+    regains them at an even pace over `period` seconds::
+
+        limiter = RateLimiter(attempts=5, period=60)
+        await limiter.hit(username)
+
+    :param attempts: The number of attempts in a burst.
+    :param period: The seconds over which used attempts are regained.
+    :param store: The store of the buckets. Defaults to a
+        :class:`MemoryRateLimitStore`.
+    '''
+
+    def __init__(
+        self,
+        attempts: int,
+        period: float = 60,
+        store: Optional[RateLimitStore] = None
+    ) -> None:
+        if attempts < 1:
+            raise ValueError('attempts must be greater than 0.')
+
+        if period <= 0:
+            raise ValueError('period must be greater than 0.')
+
+        self.attempts = attempts
+        self.period = period
+        self.store = MemoryRateLimitStore() if store is None else store
+
+    async def hit(self, key: str) -> None:
+        """
+        Uses an attempt of `key`, or raises :class:`BcryptRateLimited` if it
+        has none left.
+
+        :param key: The key making the attempt.
+        """
+        wait = await self.store.consume(
+            key, self.attempts / self.period, self.attempts
+            )
+        if wait > 0:
+            raise BcryptRateLimited(key, math.ceil(wait))
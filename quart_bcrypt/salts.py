@@ -0,0 +1,115 @@
+"""
+quart_bcrypt.salts
+"""
+from __future__ import annotations
+from collections import deque
+from typing import Deque, Optional
+import os
+import threading
+
+from .backends import HashBackend
+
+
+class SaltPool(object):
+    '''
+    A pool of salts generated ahead of time for one cost and prefix, so new
+    hashes do not read from `os.urandom` on the request path. The pool is
+    filled with a single `os.urandom` read for all of its salts, and once
+    fewer than `low_water` remain, it is refilled on a background thread.
+    Should it run dry regardless, :meth:`take` fills it on the spot.
+
+    Each salt is given out once. After a fork the child discards the salts
+    it inherited, as the parent may give out the same ones.
+
+    :param backend: The backend formatting the salts.
+    :param rounds: The number of rounds of the salts.
+    :param prefix: The algorithm version of the salts.
+    :param size: The number of salts to hold.
+    :param low_water: The number of salts below which the pool is refilled.
+        Defaults to a quarter of `size`.
+    '''
+
+    def __init__(
+        self,
+        backend: HashBackend,
+        rounds: int,
+        prefix: bytes,
+        size: int = 256,
+        low_water: Optional[int] = None
+    ) -> None:
+        if size < 1:
+            raise ValueError('The salt pool size must be at least 1.')
+
+        # Fails early on an invalid cost or prefix.
+        backend.format_salt(rounds, prefix, bytes(backend.salt_size))
+
+        self.backend = backend
+        self.rounds = rounds
+        self.prefix = prefix
+        self.size = size
+        self.low_water = size // 4 if low_water is None else low_water
+        self.refills = 0
+        self._salts: Deque[bytes] = deque()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._refilling = False
+
+    def __len__(self) -> int:
+        return len(self._salts)
+
+    def take(self) -> bytes:
+        '''
+        Returns an unused salt, refilling the pool in the background when it
+        runs low.
+        '''
+        if self._pid != os.getpid():
+            self._after_fork()
+
+        while True:
+            try:
+                salt = self._salts.popleft()
+                break
+            except IndexError:
+                self.fill()
+
+        if len(self._salts) < self.low_water and not self._refilling:
+            self._refilling = True
+            threading.Thread(
+                target=self._background_fill, name='quart-bcrypt-salts',
+                daemon=True
+                ).start()
+        return salt
+
+    def fill(self) -> None:
+        '''
+        Tops the pool up to `size` salts with one `os.urandom` read.
+        '''
+        with self._lock:
+            missing = self.size - len(self._salts)
+            if missing <= 0:
+                return
+
+            step = self.backend.salt_size
+            raw = os.urandom(missing * step)
+            self._salts.extend(
+                self.backend.format_salt(
+                    self.rounds, self.prefix, raw[offset:offset + step]
+                    )
+                for offset in range(0, len(raw), step)
+            )
+            self.refills += 1
+
+    def _background_fill(self) -> None:
+        try:
+            self.fill()
+        finally:
+            self._refilling = False
+
+    def _after_fork(self) -> None:
+        '''
+        Drops the salts and lock inherited from the parent process.
+        '''
+        self._salts = deque()
+        self._lock = threading.Lock()
+        self._refilling = False
+        self._pid = os.getpid()
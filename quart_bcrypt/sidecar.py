@@ -0,0 +1,444 @@
+"""
+quart_bcrypt.sidecar
+"""
+from __future__ import annotations
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import itertools
+import json
+import logging
+import os
+import socket
+import stat
+import struct
+import time
+
+#: The largest frame either side accepts, in bytes.
+MAX_FRAME = 65536
+
+OP_HASH = b'h'
+OP_STATS = b's'
+STATUS_OK = b'0'
+STATUS_ERROR = b'e'
+
+# A frame is its length followed by a request or response header and body.
+_LENGTH = struct.Struct('!I')
+# The request id, the operation and the length of the salt, followed by the
+# salt and the password.
+_REQUEST = struct.Struct('!IcH')
+# The request id, the status and the seconds spent hashing, followed by the
+# hash, the stats or an error message.
+_RESPONSE = struct.Struct('!Icd')
+# The pid, uid and gid of the peer of a Unix socket on Linux.
+_PEERCRED = struct.Struct('3i')
+
+logger = logging.getLogger('quart_bcrypt')
+
+
+class SidecarUnavailable(ConnectionError):
+    '''
+    Raised when the hashing daemon cannot be reached.
+    '''
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    """
+    Reads one frame, raising `ConnectionError` if it is too large.
+
+    :param reader: The stream to read from.
+    """
+    length, = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    if length > MAX_FRAME:
+        raise ConnectionError('The frame is too large.')
+    return await reader.readexactly(length)
+
+
+def peer_uid(sock: Any) -> Optional[int]:
+    '''
+    Returns the user id of the process at the other end of a Unix socket,
+    or None if the platform does not tell.
+
+    :param sock: The connected socket.
+    '''
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return None
+    credentials = sock.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, _PEERCRED.size)
+    return _PEERCRED.unpack(credentials)[1]
+
+
+def frame(payload: bytes) -> bytes:
+    '''
+    Prefixes a payload with its length.
+
+    :param payload: The header and body of a request or response.
+    '''
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def pack_request(
+    request_id: int,
+    op: bytes,
+    salt: bytes = b'',
+    password: bytes = b''
+) -> bytes:
+    '''
+    Encodes a request as a frame.
+
+    :param request_id: The id the response will carry.
+    :param op: The operation, `OP_HASH` or `OP_STATS`.
+    :param salt: The salt or hash to hash with.
+    :param password: The prepared password.
+    '''
+    header = _REQUEST.pack(request_id, op, len(salt))
+    return frame(header + salt + password)
+
+
+def unpack_request(payload: bytes) -> Tuple[int, bytes, bytes, bytes]:
+    '''
+    Decodes a request into its id, operation, salt and password.
+
+    :param payload: The frame without its length.
+    '''
+    request_id, op, salt_size = _REQUEST.unpack_from(payload)
+    body = payload[_REQUEST.size:]
+    return request_id, op, body[:salt_size], body[salt_size:]
+
+
+def pack_response(
+    request_id: int,
+    status: bytes,
+    compute: float,
+    body: bytes
+) -> bytes:
+    '''
+    Encodes a response as a frame.
+
+    :param request_id: The id of the request.
+    :param status: `STATUS_OK` or `STATUS_ERROR`.
+    :param compute: The seconds spent hashing.
+    :param body: The hash, the stats or an error message.
+    '''
+    return frame(_RESPONSE.pack(request_id, status, compute) + body)
+
+
+def unpack_response(payload: bytes) -> Tuple[int, bytes, float, bytes]:
+    '''
+    Decodes a response into its id, status, compute time and body.
+
+    :param payload: The frame without its length.
+    '''
+    request_id, status, compute = _RESPONSE.unpack_from(payload)
+    return request_id, status, compute, payload[_RESPONSE.size:]
+
+
+def _copy_result(target: Future, source: Future) -> None:
+    '''
+    Completes `target` with the outcome of `source`.
+
+    :param target: A running future.
+    :param source: A finished future.
+    '''
+    if source.cancelled():
+        target.set_exception(asyncio.CancelledError())
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+class _Connection(object):
+    '''
+    One connection to the daemon, with the requests sent on it that are
+    waiting for their response.
+    '''
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        on_lost: Callable[[_Connection], None]
+    ) -> None:
+        self.writer = writer
+        self.pending: Dict[
+            int, Tuple[Future, Optional[Callable[[], Future]]]
+        ] = {}
+        self.closed = False
+        self._on_lost = on_lost
+        self._task = asyncio.ensure_future(self._read(reader))
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        """
+        Completes the pending requests as their responses arrive, in any
+        order.
+
+        :param reader: The stream of responses.
+        """
+        try:
+            while True:
+                payload = await read_frame(reader)
+                request_id, status, compute, body = unpack_response(payload)
+                entry = self.pending.pop(request_id, None)
+                if entry is None:
+                    continue
+
+                future = entry[0]
+                if status == STATUS_OK:
+                    future.set_result((body, compute))
+                else:
+                    future.set_exception(ValueError(body.decode('utf-8')))
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            pass
+        finally:
+            self.lost()
+
+    def lost(self) -> None:
+        '''
+        Closes the connection and runs its pending requests through their
+        fallbacks.
+        '''
+        if self.closed:
+            return
+
+        self.closed = True
+        self.writer.close()
+        pending, self.pending = self.pending, {}
+        for future, fallback in pending.values():
+            if fallback is None:
+                future.set_exception(SidecarUnavailable('The daemon left.'))
+                continue
+            try:
+                retry = fallback()
+            except Exception as error:
+                future.set_exception(error)
+            else:
+                retry.add_done_callback(partial(_copy_result, future))
+        self._on_lost(self)
+
+    async def close(self) -> None:
+        """
+        Closes the connection and waits for its reader to stop.
+        """
+        self.lost()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+class SidecarClient(object):
+    '''
+    A client of the shared hashing daemon started with
+    `python -m quart_bcrypt.worker`, which lets the worker processes of a
+    server share one pool of hashing threads instead of each running their
+    own::
+
+        client = SidecarClient('/run/myapp/bcrypt.sock')
+        future = await client.submit(password, salt, fallback)
+
+    Up to `connections` connections are opened lazily and reused, and each
+    carries many requests at once, which the daemon answers as they finish.
+    If the daemon cannot be reached, or goes away with requests in flight,
+    those requests run through their `fallback` instead, and no connection
+    is tried again for `retry_interval` seconds.
+
+    Passwords are only sent to a daemon running as the current user: the
+    socket must be owned by the current user, and on Linux the uid of the
+    process listening on it is checked too. Otherwise the daemon is treated
+    as down and a warning is logged.
+
+    :param path: The path of the daemon's Unix socket.
+    :param connections: The number of connections to keep.
+    :param retry_interval: The seconds to wait before trying to connect
+        again after a failure.
+    '''
+
+    def __init__(
+        self,
+        path: str,
+        connections: int = 4,
+        retry_interval: float = 1.0
+    ) -> None:
+        if connections < 1:
+            raise ValueError('connections must be greater than 0.')
+
+        self.path = path
+        self.connections = connections
+        self.retry_interval = retry_interval
+        self.sent = 0
+        self.fallbacks = 0
+        self._pool: List[Optional[_Connection]] = [None] * connections
+        self._locks = [asyncio.Lock() for _ in range(connections)]
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ids = itertools.count()
+        self._turn = itertools.count()
+        self._down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        '''
+        Whether the daemon is not known to be down.
+        '''
+        return time.monotonic() >= self._down_until
+
+    def _lost(self, connection: _Connection) -> None:
+        '''
+        Forgets a lost connection and marks the daemon as down, unless the
+        connection was closed by :meth:`close`.
+
+        :param connection: The lost connection.
+        '''
+        for index, pooled in enumerate(self._pool):
+            if pooled is connection:
+                self._pool[index] = None
+                self._down_until = time.monotonic() + self.retry_interval
+
+    async def _connection(self) -> _Connection:
+        """
+        Returns the next connection in turn, opening it if needed. Calls
+        taking the same turn while it is being opened wait for it, so each
+        turn holds a single connection.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Connections belong to the loop that opened them.
+            self._pool = [None] * self.connections
+            self._locks = [asyncio.Lock() for _ in range(self.connections)]
+            self._loop = loop
+
+        index = next(self._turn) % self.connections
+        async with self._locks[index]:
+            connection = self._pool[index]
+            if connection is None or connection.closed:
+                connection = await self._open()
+                self._pool[index] = connection
+        return connection
+
+    async def _open(self) -> _Connection:
+        """
+        Opens a connection to the daemon, after checking that it runs as the
+        current user.
+        """
+        if not self.available:
+            raise SidecarUnavailable('The daemon is down.')
+        try:
+            status = os.stat(self.path)
+        except OSError as error:
+            self._down_until = time.monotonic() + self.retry_interval
+            raise SidecarUnavailable(str(error)) from error
+
+        if not stat.S_ISSOCK(status.st_mode):
+            raise self._refuse(f'{self.path} is not a socket.')
+        if status.st_uid != os.getuid():
+            raise self._refuse(f'{self.path} is owned by another user.')
+
+        try:
+            reader, writer = await asyncio.open_unix_connection(
+                self.path, limit=MAX_FRAME + _LENGTH.size)
+        except OSError as error:
+            self._down_until = time.monotonic() + self.retry_interval
+            raise SidecarUnavailable(str(error)) from error
+
+        uid = peer_uid(writer.get_extra_info('socket'))
+        if uid is not None and uid != os.getuid():
+            writer.close()
+            raise self._refuse(f'The daemon on {self.path} runs as uid {uid}.')
+        return _Connection(reader, writer, self._lost)
+
+    def _refuse(self, reason: str) -> SidecarUnavailable:
+        '''
+        Marks the daemon as down for a reason not to trust it, logs it and
+        returns the error to raise.
+
+        :param reason: Why the daemon is not trusted.
+        '''
+        self._down_until = time.monotonic() + self.retry_interval
+        logger.warning('Quart-Bcrypt refused the hashing daemon: %s', reason)
+        return SidecarUnavailable(reason)
+
+    async def _send(
+        self,
+        op: bytes,
+        salt: bytes,
+        password: bytes,
+        fallback: Optional[Callable[[], Future]]
+    ) -> Future:
+        """
+        Sends a request and returns a future for its response.
+
+        :param op: The operation.
+        :param salt: The salt or hash to hash with.
+        :param password: The prepared password.
+        :param fallback: Runs the request elsewhere if the daemon is gone.
+        """
+        request_id = next(self._ids) % 2 ** 32
+        request = pack_request(request_id, op, salt, password)
+        if len(request) > MAX_FRAME + _LENGTH.size:
+            raise SidecarUnavailable('The request is too large.')
+
+        connection = await self._connection()
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+        connection.pending[request_id] = (future, fallback)
+        try:
+            connection.writer.write(request)
+            await connection.writer.drain()
+        except (ConnectionError, OSError):
+            connection.lost()
+        return future
+
+    async def submit(
+        self,
+        password: bytes,
+        salt: bytes,
+        fallback: Callable[[], Future]
+    ) -> Future:
+        """
+        Sends a hash to the daemon and returns a
+        :class:`concurrent.futures.Future` of the hash and the seconds it
+        took. The future is already running, so like a job running in a
+        pool it cannot be cancelled. Without a daemon, the future returned
+        by `fallback` is used instead.
+
+        :param password: The prepared password.
+        :param salt: The salt or hash to hash with.
+        :param fallback: Submits the hash elsewhere, such as to a
+            :class:`HashingExecutor`.
+        """
+        if self.available:
+            try:
+                future = await self._send(OP_HASH, salt, password, fallback)
+            except SidecarUnavailable:
+                pass
+            else:
+                self.sent += 1
+                return future
+
+        self.fallbacks += 1
+        return fallback()
+
+    async def stats(self) -> Dict[str, Any]:
+        """
+        Returns the load of the daemon, shared by every client: its number
+        of `workers`, the jobs `active` and `queued` in its pool, and the
+        number of hashes it has `served`. Raises
+        :class:`SidecarUnavailable` if it cannot be reached.
+        """
+        future = await self._send(OP_STATS, b'', b'', None)
+        body, _ = await asyncio.wrap_future(future)
+        return json.loads(body)
+
+    async def close(self) -> None:
+        """
+        Closes the connections. Requests still in flight run through their
+        fallbacks.
+        """
+        pool, self._pool = self._pool, [None] * self.connections
+        if self._loop is not asyncio.get_running_loop():
+            return
+        for connection in pool:
+            if connection is not None:
+                await connection.close()
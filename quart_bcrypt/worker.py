@@ -0,0 +1,266 @@
+"""
+quart_bcrypt.worker
+
+A hashing daemon shared by the worker processes of a server, listening on a
+Unix socket::
+
+    python -m quart_bcrypt.worker --socket /run/myapp/bcrypt.sock --workers 8
+
+Apps send their async hashes to it when `BCRYPT_SIDECAR_SOCKET` is set, so
+the whole host hashes in one bounded pool rather than in a pool for each
+server process. See :class:`SidecarClient`.
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Set
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import stat
+
+from .backends import identify
+from .executor import EXECUTOR_KINDS, HashingExecutor
+from .instrumentation import timed_call
+from .sidecar import (
+    OP_HASH,
+    OP_STATS,
+    STATUS_ERROR,
+    STATUS_OK,
+    pack_response,
+    read_frame,
+    unpack_request
+)
+
+logger = logging.getLogger('quart_bcrypt')
+
+
+class HashingDaemon(object):
+    '''
+    Serves hashes to :class:`SidecarClient` connections on a Unix socket,
+    running them in a :class:`HashingExecutor`. Requests on one connection
+    are run concurrently and answered as they finish::
+
+        daemon = HashingDaemon('/run/myapp/bcrypt.sock', HashingExecutor(8))
+        await daemon.start()
+
+    The socket must be in a directory owned by the user running the daemon
+    and writable by no one else, so no other user can replace it, and is
+    only accessible to that user.
+
+    :param path: The path of the Unix socket.
+    :param executor: The pool to hash in.
+    '''
+
+    def __init__(self, path: str, executor: HashingExecutor) -> None:
+        self.path = path
+        self.executor = executor
+        self.served = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    def stats(self) -> Dict[str, Any]:
+        '''
+        Returns the load of the daemon.
+        '''
+        return {
+            'workers': self.executor.max_workers,
+            'active': self.executor.active_workers,
+            'queued': self.executor.queue_depth,
+            'served': self.served,
+        }
+
+    async def start(self) -> None:
+        """
+        Starts the pool and listens on the socket, replacing a socket left
+        behind by an earlier daemon.
+
+        :raises PermissionError: If the directory of the socket is not
+            private to the current user.
+        :raises FileExistsError: If something other than a socket is at the
+            path.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        status = os.stat(directory)
+        if (status.st_uid != os.getuid()
+                or status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)):
+            raise PermissionError(
+                f'{directory} must be owned by the current user and not '
+                f'writable by others.'
+                )
+        self._remove_socket()
+
+        await self.executor.prefork()
+        # The socket is created without permissions for anyone else, rather
+        # than restricted once it is already listening.
+        mask = os.umask(0o177)
+        try:
+            self._server = await asyncio.start_unix_server(
+                self._handle, self.path)
+        finally:
+            os.umask(mask)
+
+    def _remove_socket(self) -> None:
+        '''
+        Removes the socket at the path, refusing to remove anything else.
+
+        :raises FileExistsError: If something other than a socket is at the
+            path.
+        '''
+        try:
+            status = os.lstat(self.path)
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(status.st_mode):
+            raise FileExistsError(f'{self.path} exists and is not a socket.')
+        os.unlink(self.path)
+
+    async def close(self) -> None:
+        """
+        Stops listening, waits for the hashes in progress, closes the
+        connections and shuts down the pool.
+        """
+        if self._server is not None:
+            self._server.close()
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        # Connections waiting for their next request are closed here rather
+        # than cancelled along with the loop.
+        connections = list(self._connections.items())
+        for task, writer in connections:
+            writer.close()
+            task.cancel()
+        if connections:
+            await asyncio.gather(
+                *(task for task, _ in connections), return_exceptions=True)
+
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+        self.executor.shutdown()
+        self._remove_socket()
+
+    async def _handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Reads the requests of a connection and answers each once it is done.
+
+        :param reader: The stream of requests.
+        :param writer: The stream of responses.
+        """
+        connection = asyncio.current_task()
+        if connection is not None:
+            self._connections[connection] = writer
+        try:
+            while True:
+                payload = await read_frame(reader)
+                task = asyncio.ensure_future(self._answer(payload, writer))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            pass
+        finally:
+            self._connections.pop(connection, None)
+            writer.close()
+
+    async def _answer(
+        self,
+        payload: bytes,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Runs one request and writes its response.
+
+        :param payload: The request frame without its length.
+        :param writer: The stream of responses.
+        """
+        request_id, op, salt, password = unpack_request(payload)
+        status, compute = STATUS_OK, 0.0
+
+        if op == OP_STATS:
+            body = json.dumps(self.stats()).encode('utf-8')
+        elif op == OP_HASH:
+            try:
+                body, compute = await self.executor.run(
+                    timed_call, identify(salt).hashpw, password, salt)
+                self.served += 1
+            except (TypeError, ValueError) as error:
+                status, body = STATUS_ERROR, str(error).encode('utf-8')
+            except Exception:
+                # Dropping the connection makes the client hash in process.
+                writer.close()
+                return
+        else:
+            status, body = STATUS_ERROR, b'Unknown operation.'
+
+        if not writer.is_closing():
+            writer.write(pack_response(request_id, status, compute, body))
+
+
+async def serve(
+    path: str,
+    workers: Optional[int] = None,
+    kind: str = 'thread'
+) -> None:
+    """
+    Runs a :class:`HashingDaemon` until it receives SIGINT or SIGTERM.
+
+    :param path: The path of the Unix socket.
+    :param workers: The size of the pool. Defaults to the CPU count.
+    :param kind: Either `'thread'` or `'process'`.
+    """
+    daemon = HashingDaemon(path, HashingExecutor(workers, kind))
+    await daemon.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    logger.info(
+        'Quart-Bcrypt worker hashing on %s with %d %s workers.',
+        path, daemon.executor.max_workers, kind
+        )
+    try:
+        await stop.wait()
+    finally:
+        await daemon.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    '''
+    Runs the hashing daemon from the command line.
+
+    :param argv: The command line arguments. Defaults to `sys.argv`.
+    '''
+    parser = argparse.ArgumentParser(
+        prog='python -m quart_bcrypt.worker',
+        description='Serve Quart-Bcrypt hashes over a Unix socket.'
+        )
+    parser.add_argument(
+        '--socket', required=True,
+        help='path of the Unix socket, in a directory private to this user'
+        )
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help='size of the hashing pool, the CPU count by default'
+        )
+    parser.add_argument(
+        '--executor', default='thread', choices=EXECUTOR_KINDS,
+        help='kind of hashing pool'
+        )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    asyncio.run(serve(args.socket, args.workers, args.executor))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Tests the adaptive concurrency limit of Quart Bcrypt.
+"""
+import asyncio
+
+import pytest
+import quart
+
+from quart_bcrypt import AdaptiveLimiter, AdmissionController, Bcrypt
+
+
+def saturate(admission: AdmissionController) -> None:
+    """
+    Marks every slot as taken.
+    """
+    while admission._can_start('interactive'):
+        admission._running['interactive'] += 1
+
+
+def test_raise_while_flat() -> None:
+    """
+    Tests the limit rises by one per window while
+    compute time is flat and every slot is used.
+    """
+    admission = AdmissionController(2)
+    limiter = AdaptiveLimiter(admission, max_limit=4, window=5)
+
+    for _ in range(5):
+        limiter.observe('2b$12', 0.1)
+    assert limiter.limit == 2
+
+    saturate(admission)
+    changes = [limiter.observe('2b$12', 0.1) for _ in range(5)]
+    assert limiter.limit == 3
+    assert changes[-1].old == 2 and changes[-1].new == 3
+    assert 'every slot in use' in limiter.reason
+
+    for _ in range(20):
+        saturate(admission)
+        limiter.observe('2b$12', 0.1)
+    assert limiter.limit == 4
+
+
+def test_cut_on_contention() -> None:
+    """
+    Tests the limit is cut when compute time rises,
+    but never below the reserved slots.
+    """
+    admission = AdmissionController(8, reserved=2)
+    limiter = AdaptiveLimiter(admission, window=4)
+
+    for _ in range(4):
+        limiter.observe('2b$12', 0.1)
+    for _ in range(4):
+        limiter.observe('2b$12', 0.3)
+    assert limiter.limit == 6
+    assert limiter.reason.startswith('compute time rose to 2.')
+
+    for _ in range(40):
+        limiter.observe('2b$12', 0.5)
+    assert limiter.limit == 3
+    assert limiter.stats()['min_limit'] == 3
+
+
+def test_kinds_compared_separately() -> None:
+    """
+    Tests slower kinds of job are not mistaken for
+    contention.
+    """
+    admission = AdmissionController(4)
+    limiter = AdaptiveLimiter(admission, window=4)
+
+    for _ in range(4):
+        limiter.observe('2b$10', 0.05)
+        limiter.observe('2b$14', 0.8)
+
+    assert limiter.limit == 4
+    assert not limiter.changes
+
+
+@pytest.mark.asyncio
+async def test_resize_wakes_waiters() -> None:
+    """
+    Tests raising the limit admits waiting calls
+    at once.
+    """
+    admission = AdmissionController(1)
+    await admission.acquire()
+    waiter = asyncio.ensure_future(admission.acquire())
+    await asyncio.sleep(0)
+    assert admission.queued == 1
+
+    admission.resize(2)
+    await waiter
+    assert admission.in_flight == 2
+
+    with pytest.raises(ValueError):
+        AdmissionController(4, reserved=2).resize(2)
+
+
+@pytest.mark.asyncio
+async def test_wired_to_extension(app: quart.Quart, extension: Bcrypt) -> None:
+    """
+    Tests the extension feeds the limiter with the
+    compute time of async hashes.
+    """
+    app.config['BCRYPT_MAX_WORKERS'] = 4
+    app.config['BCRYPT_MAX_CONCURRENCY'] = 2
+    app.config['BCRYPT_ADAPTIVE_CONCURRENCY'] = True
+    extension.init_app(app)
+    extension.limiter.window = 1
+    extension.limiter.tolerance = 0.5
+
+    await extension.async_generate_password_hash('secret')
+
+    assert extension.limiter.max_limit == 4
+    assert extension.limiter.limit == 1
+    assert extension.admission.max_concurrency == 1
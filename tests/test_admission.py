@@ -0,0 +1,201 @@
+"""
+Tests the admission control of Quart Bcrypt.
+"""
+import asyncio
+
+import pytest
+import quart
+
+from quart_bcrypt import AdmissionController, Bcrypt, BcryptOverloaded
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    app.config['BCRYPT_MAX_WORKERS'] = 2
+    app.config['BCRYPT_MAX_CONCURRENCY'] = 1
+    app.config['BCRYPT_MAX_QUEUE'] = 1
+    app.config['BCRYPT_RETRY_AFTER'] = 5
+
+    extension.init_app(app)
+
+    return extension
+
+
+def test_limits_set(bcrypt: Bcrypt) -> None:
+    """
+    Tests the limits are read from the app config.
+    """
+    assert bcrypt.admission.max_concurrency == 1
+    assert bcrypt.admission.max_queue == 1
+    assert bcrypt.admission.retry_after == 5
+
+
+def test_default_concurrency(app: quart.Quart, extension: Bcrypt) -> None:
+    """
+    Tests the concurrency defaults to the pool size.
+    """
+    app.config['BCRYPT_MAX_WORKERS'] = 3
+    extension.init_app(app)
+
+    assert extension.admission.max_concurrency == 3
+    assert extension.admission.max_queue is None
+
+
+@pytest.mark.asyncio
+async def test_overloaded(bcrypt: Bcrypt) -> None:
+    """
+    Tests calls beyond the queue limit fail fast.
+    """
+    tasks = [
+        asyncio.ensure_future(bcrypt.async_generate_password_hash('secret'))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+
+    assert bcrypt.admission.in_flight == 1
+    assert bcrypt.admission.queued == 1
+
+    with pytest.raises(BcryptOverloaded) as error:
+        await bcrypt.async_generate_password_hash('secret')
+    assert error.value.retry_after == 5
+
+    for pw_hash in await asyncio.gather(*tasks):
+        assert await bcrypt.async_check_password_hash(pw_hash, 'secret')
+
+    assert bcrypt.admission.in_flight == 0
+    assert bcrypt.admission.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter() -> None:
+    """
+    Tests a cancelled call gives up its place
+    in the queue.
+    """
+    admission = AdmissionController(1)
+    await admission.acquire()
+
+    waiter = asyncio.ensure_future(admission.acquire())
+    await asyncio.sleep(0)
+    assert admission.queued == 1
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert admission.queued == 0
+
+    admission.release()
+    assert admission.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_service_unavailable(app: quart.Quart, bcrypt: Bcrypt) -> None:
+    """
+    Tests an unhandled overload becomes a 503
+    response with a Retry-After header.
+    """
+    @app.route('/')
+    async def index() -> str:
+        raise BcryptOverloaded(bcrypt.admission.retry_after)
+
+    response = await app.test_client().get('/')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '5'
+
+
+@pytest.mark.asyncio
+async def test_interactive_first() -> None:
+    """
+    Tests waiting interactive calls are admitted
+    before background calls.
+    """
+    admission = AdmissionController(1)
+    await admission.acquire('background')
+    order = []
+
+    async def call(priority: str) -> None:
+        async with admission.slot(priority):
+            order.append(priority)
+
+    tasks = [
+        asyncio.ensure_future(call('background')),
+        asyncio.ensure_future(call('interactive')),
+    ]
+    await asyncio.sleep(0)
+    assert admission.waiting('background') == 1
+    assert admission.waiting('interactive') == 1
+
+    admission.release('background')
+    await asyncio.gather(*tasks)
+
+    assert order == ['interactive', 'background']
+
+
+@pytest.mark.asyncio
+async def test_reserved_slots() -> None:
+    """
+    Tests background calls never hold the slots
+    reserved for interactive calls.
+    """
+    admission = AdmissionController(3, reserved=1)
+    await admission.acquire('background')
+    await admission.acquire('background')
+
+    waiter = asyncio.ensure_future(admission.acquire('background'))
+    await asyncio.sleep(0)
+    assert admission.running('background') == 2
+    assert admission.waiting('background') == 1
+
+    await admission.acquire('interactive')
+    assert admission.in_flight == 3
+
+    admission.release('interactive')
+    assert not waiter.done()
+
+    admission.release('background')
+    await waiter
+    assert admission.running('background') == 2
+
+
+def test_invalid_reserved() -> None:
+    """
+    Tests the reserved slots must leave room for
+    background calls.
+    """
+    with pytest.raises(ValueError):
+        AdmissionController(2, reserved=2)
+
+
+@pytest.mark.asyncio
+async def test_batch_is_background(
+    app: quart.Quart,
+    extension: Bcrypt
+) -> None:
+    """
+    Tests a login is not queued behind a batch.
+    """
+    app.config['BCRYPT_MAX_WORKERS'] = 2
+    app.config['BCRYPT_MAX_CONCURRENCY'] = 2
+    app.config['BCRYPT_INTERACTIVE_RESERVED'] = 1
+    extension.init_app(app)
+    pw_hash = await extension.async_generate_password_hash('secret')
+
+    async def batch() -> list:
+        return [
+            result async for result in
+            extension.async_generate_password_hashes_many(
+                ['secret'] * 32, chunk_size=1)
+        ]
+
+    task = asyncio.ensure_future(batch())
+    await asyncio.sleep(0.01)
+    assert extension.admission.running('background') == 1
+    assert extension.admission.waiting('background') == 0
+
+    assert await extension.async_check_password_hash(pw_hash, 'secret')
+    assert not task.done()
+    assert len(await task) == 32
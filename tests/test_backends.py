@@ -0,0 +1,99 @@
+"""
+Tests the hashing backends of Quart Bcrypt.
+"""
+import pytest
+import quart
+
+from quart_bcrypt import Bcrypt
+from quart_bcrypt.backends import get_backend, identify
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    app.config['BCRYPT_BACKEND'] = 'scrypt'
+    app.config['BCRYPT_LOG_ROUNDS'] = 4
+    del app.config['BCRYPT_HASH_PREFIX']
+    extension.init_app(app)
+
+    return extension
+
+
+def test_scrypt_hash(bcrypt: Bcrypt) -> None:
+    """
+    Tests hashing and checking with scrypt.
+    """
+    pw_hash = bcrypt.generate_password_hash('secret')
+
+    assert pw_hash.startswith(b'$scrypt$ln=4,r=8,p=1$')
+    assert bcrypt.check_password_hash(pw_hash, 'secret') is True
+    assert bcrypt.check_password_hash(pw_hash, 'hunter2') is False
+
+
+@pytest.mark.asyncio
+async def test_async_scrypt_hash(bcrypt: Bcrypt) -> None:
+    """
+    Tests hashing and checking with scrypt
+    asynchronously.
+    """
+    pw_hash = await bcrypt.async_generate_password_hash('secret')
+
+    assert await bcrypt.async_check_password_hash(pw_hash, 'secret') is True
+    assert await bcrypt.async_check_password_hash(pw_hash, 'nope') is False
+
+
+def test_mixed_hashes(bcrypt: Bcrypt) -> None:
+    """
+    Tests hashes of another backend are checked
+    with the backend that made them.
+    """
+    bcrypt_hash = get_backend('bcrypt').hashpw(
+        b'secret', get_backend('bcrypt').gensalt(4, b'2b')
+        )
+
+    assert bcrypt.check_password_hash(bcrypt_hash, 'secret') is True
+    assert bcrypt.check_password_hash(bcrypt_hash, 'hunter2') is False
+    assert list(bcrypt.check_password_hashes_many([
+        (bcrypt_hash, 'secret'),
+        (bcrypt.generate_password_hash('secret'), 'secret'),
+    ])) == [(0, True), (1, True)]
+
+
+def test_upgrade_backend(bcrypt: Bcrypt) -> None:
+    """
+    Tests a hash of another backend is replaced
+    on a successful check.
+    """
+    bcrypt_hash = get_backend('bcrypt').hashpw(
+        b'secret', get_backend('bcrypt').gensalt(4, b'2b')
+        )
+
+    valid, new_hash = bcrypt.verify_and_update(bcrypt_hash, 'secret')
+    assert valid is True
+    assert new_hash.startswith(b'$scrypt$ln=4,')
+    assert bcrypt.verify_and_update(new_hash, 'secret') == (True, None)
+
+
+def test_unknown_backend(app: quart.Quart, extension: Bcrypt) -> None:
+    """
+    Tests an unknown backend is rejected.
+    """
+    app.config['BCRYPT_BACKEND'] = 'md5'
+
+    with pytest.raises(ValueError):
+        extension.init_app(app)
+
+
+def test_malformed_hash(bcrypt: Bcrypt) -> None:
+    """
+    Tests malformed hashes are rejected.
+    """
+    for pw_hash in (b'secret', b'$md5$abc', b'$scrypt$ln=x$abc'):
+        with pytest.raises(ValueError):
+            bcrypt.check_password_hash(pw_hash, 'secret')
+
+    with pytest.raises(ValueError):
+        identify(b'x$2b$12$abc')
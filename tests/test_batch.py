@@ -0,0 +1,234 @@
+"""
+Tests the batch functions of Quart Bcrypt.
+"""
+import pytest
+import quart
+
+from quart_bcrypt import Bcrypt
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    app.config['BCRYPT_LOG_ROUNDS'] = 4
+    app.config['BCRYPT_MAX_WORKERS'] = 2
+
+    extension.init_app(app)
+
+    return extension
+
+
+@pytest.fixture
+def pairs(bcrypt: Bcrypt) -> list:
+    """
+    Returns hash and candidate pairs, where every
+    third candidate is wrong.
+    """
+    pairs = []
+    for i in range(10):
+        pw_hash = bcrypt.generate_password_hash(f'secret{i}')
+        candidate = 'wrong' if i % 3 == 0 else f'secret{i}'
+        pairs.append((pw_hash, candidate))
+    return pairs
+
+
+def test_check_many_ordered(bcrypt: Bcrypt, pairs: list) -> None:
+    """
+    Tests results are yielded in input order.
+    """
+    results = list(bcrypt.check_password_hashes_many(iter(pairs), 3))
+
+    assert [index for index, _ in results] == list(range(10))
+    assert [res for _, res in results] == [i % 3 != 0 for i in range(10)]
+
+
+def test_check_many_unordered(bcrypt: Bcrypt, pairs: list) -> None:
+    """
+    Tests every result is yielded with its index
+    when unordered.
+    """
+    results = dict(
+        bcrypt.check_password_hashes_many(pairs, 4, ordered=False))
+
+    assert results == {i: i % 3 != 0 for i in range(10)}
+
+
+def test_invalid_chunk_size(bcrypt: Bcrypt, pairs: list) -> None:
+    """
+    Tests an empty chunk size is rejected.
+    """
+    with pytest.raises(ValueError):
+        list(bcrypt.check_password_hashes_many(pairs, 0))
+
+
+@pytest.mark.asyncio
+async def test_async_check_many(bcrypt: Bcrypt, pairs: list) -> None:
+    """
+    Tests the async batch check with an iterable
+    and an async iterable.
+    """
+    results = [
+        result async for result in
+        bcrypt.async_check_password_hashes_many(pairs, 3)
+    ]
+    assert results == [(i, i % 3 != 0) for i in range(10)]
+
+    async def source():
+        for pair in pairs:
+            yield pair
+
+    results = {
+        index: result async for index, result in
+        bcrypt.async_check_password_hashes_many(source(), 4, ordered=False)
+    }
+    assert results == {i: i % 3 != 0 for i in range(10)}
+    assert bcrypt.admission.in_flight == 0
+
+
+def test_generate_many(bcrypt: Bcrypt) -> None:
+    """
+    Tests batch hashing uses the configured rounds
+    and yields hashes in input order.
+    """
+    passwords = (f'secret{i}' for i in range(7))
+    results = list(
+        bcrypt.generate_password_hashes_many(passwords, chunk_size=3))
+
+    assert [index for index, _ in results] == list(range(7))
+    for index, pw_hash in results:
+        assert pw_hash.startswith(b'$2b$04$')
+        assert bcrypt.check_password_hash(pw_hash, f'secret{index}')
+
+
+def test_generate_many_empty_password(bcrypt: Bcrypt) -> None:
+    """
+    Tests an empty password in a batch is rejected.
+    """
+    with pytest.raises(ValueError):
+        list(bcrypt.generate_password_hashes_many(['secret', '']))
+
+
+@pytest.mark.asyncio
+async def test_async_generate_many(bcrypt: Bcrypt) -> None:
+    """
+    Tests async batch hashing from an async iterable
+    with per-call rounds and prefix.
+    """
+    async def source():
+        for i in range(5):
+            yield f'secret{i}'
+
+    results = {
+        index: pw_hash async for index, pw_hash in
+        bcrypt.async_generate_password_hashes_many(
+            source(), rounds=5, prefix='2a', chunk_size=2, ordered=False)
+    }
+
+    assert sorted(results) == list(range(5))
+    for index, pw_hash in results.items():
+        assert pw_hash.startswith(b'$2a$05$')
+        assert bcrypt.check_password_hash(pw_hash, f'secret{index}')
+
+
+def test_sync_many_leaves_reserved_slots(
+    app: quart.Quart, extension: Bcrypt
+) -> None:
+    """
+    Tests sync batches never hold the slots reserved
+    for interactive calls.
+    """
+    app.config['BCRYPT_LOG_ROUNDS'] = 4
+    app.config['BCRYPT_MAX_WORKERS'] = 4
+    extension.init_app(app)
+
+    submit = extension.executor.submit
+    futures, busy = [], []
+
+    def tracked(*args):
+        futures.append(submit(*args))
+        busy.append(sum(not future.done() for future in futures))
+        return futures[-1]
+
+    extension.executor.submit = tracked
+    passwords = [f'secret{i}' for i in range(12)]
+    hashes = dict(
+        extension.generate_password_hashes_many(passwords, chunk_size=1))
+
+    assert len(hashes) == 12
+    assert max(busy) <= 3
+
+
+@pytest.mark.asyncio
+async def test_async_check_many_short_queue(
+    app: quart.Quart, extension: Bcrypt
+) -> None:
+    """
+    Tests a batch never overflows the admission
+    queue with its own chunks.
+    """
+    app.config['BCRYPT_LOG_ROUNDS'] = 4
+    app.config['BCRYPT_MAX_WORKERS'] = 4
+    app.config['BCRYPT_MAX_QUEUE'] = 0
+    extension.init_app(app)
+    pw_hash = extension.generate_password_hash('secret')
+
+    for priority in ('background', 'interactive'):
+        results = [
+            result async for _, result in
+            extension.async_check_password_hashes_many(
+                [(pw_hash, 'secret')] * 40, 2, priority=priority)
+        ]
+        assert results == [True] * 40
+
+
+@pytest.mark.asyncio
+async def test_async_generate_many_short_queue(
+    app: quart.Quart, extension: Bcrypt
+) -> None:
+    """
+    Tests batch hashing never overflows the admission
+    queue with its own chunks.
+    """
+    app.config['BCRYPT_LOG_ROUNDS'] = 4
+    app.config['BCRYPT_MAX_WORKERS'] = 4
+    app.config['BCRYPT_MAX_QUEUE'] = 0
+    extension.init_app(app)
+
+    hashes = [
+        pw_hash async for _, pw_hash in
+        extension.async_generate_password_hashes_many(
+            ['secret'] * 40, chunk_size=2)
+    ]
+
+    assert len(hashes) == 40
+
+
+def test_sync_many_bounded_by_pool(
+    app: quart.Quart, extension: Bcrypt
+) -> None:
+    """
+    Tests sync batches leave a worker free when the
+    concurrency is larger than the pool.
+    """
+    app.config['BCRYPT_LOG_ROUNDS'] = 4
+    app.config['BCRYPT_MAX_WORKERS'] = 2
+    app.config['BCRYPT_MAX_CONCURRENCY'] = 4
+    extension.init_app(app)
+
+    submit = extension.executor.submit
+    futures, busy = [], []
+
+    def tracked(*args):
+        futures.append(submit(*args))
+        busy.append(sum(not future.done() for future in futures))
+        return futures[-1]
+
+    extension.executor.submit = tracked
+    pairs = [(extension.generate_password_hash('secret'), 'secret')] * 8
+    results = dict(extension.check_password_hashes_many(pairs, chunk_size=1))
+
+    assert all(results.values())
+    assert max(busy) == 1
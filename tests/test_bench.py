@@ -0,0 +1,65 @@
+"""
+Tests the benchmark suite of Quart Bcrypt.
+"""
+import json
+
+from quart_bcrypt.bench import main, make_app, percentile, summarize
+
+
+def test_percentile() -> None:
+    """
+    Tests the nearest rank percentiles.
+    """
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([], 50) == 0
+
+
+def test_summarize() -> None:
+    """
+    Tests a run is summarized in milliseconds.
+    """
+    summary = summarize([0.001, 0.002, 0.003, 0.004], 0.5)
+
+    assert summary['ops_per_sec'] == 8
+    assert summary['latency_ms']['p50'] == 2
+    assert summary['latency_ms']['p99'] == 4
+
+
+def test_json_report(tmp_path) -> None:
+    """
+    Tests the suite writes a result for every case
+    as JSON.
+    """
+    output = tmp_path / 'bench.json'
+    main([
+        '--rounds', '4', '--jobs', '2', '--concurrency', '2',
+        '--workers', '1', '--output', str(output)
+    ])
+
+    report = json.loads(output.read_text())
+    cases = {
+        (result['operation'], result['mode'])
+        for result in report['results']
+    }
+
+    assert 'bcrypt' in report['environment']
+    assert cases == {
+        ('hash', 'sync'), ('hash', 'async'),
+        ('check', 'sync'), ('check', 'async')
+    }
+    for result in report['results']:
+        assert result['ops_per_sec'] > 0
+        assert set(result['latency_ms']) == {'p50', 'p95', 'p99', 'mean'}
+
+
+def test_checks_not_coalesced() -> None:
+    """
+    Tests the benchmark app hashes every check.
+    """
+    app = make_app(4, False, 'thread', 2)
+
+    assert app.extensions['bcrypt'].coalescer is None
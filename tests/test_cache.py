@@ -0,0 +1,115 @@
+"""
+Tests the verification cache of Quart Bcrypt.
+"""
+import time
+
+import pytest
+import quart
+
+from quart_bcrypt import Bcrypt, VerificationCache
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    app.config['BCRYPT_CACHE_SIZE'] = 2
+    app.config['BCRYPT_CACHE_TTL'] = 60
+
+    extension.init_app(app)
+
+    return extension
+
+
+def test_disabled_by_default(app: quart.Quart, extension: Bcrypt) -> None:
+    """
+    Tests the cache is opt-in.
+    """
+    extension.init_app(app)
+    assert extension.cache is None
+
+
+def test_hits_and_misses(bcrypt: Bcrypt) -> None:
+    """
+    Tests only successful checks are cached.
+    """
+    pw_hash = bcrypt.generate_password_hash('secret')
+
+    assert bcrypt.check_password_hash(pw_hash, 'hunter2') is False
+    assert bcrypt.check_password_hash(pw_hash, 'hunter2') is False
+    assert bcrypt.check_password_hash(pw_hash, 'secret') is True
+    assert bcrypt.check_password_hash(pw_hash, 'secret') is True
+
+    assert bcrypt.cache.hits == 1
+    assert bcrypt.cache.misses == 3
+    assert len(bcrypt.cache) == 1
+
+
+def test_no_plaintext() -> None:
+    """
+    Tests no password is kept in the cache.
+    """
+    cache = VerificationCache(4)
+    cache.add(b'$2b$04$hash', b'secret')
+
+    for digest, (_, hash_digest) in cache._entries.items():
+        assert b'secret' not in digest
+        assert b'secret' not in hash_digest
+
+
+def test_lru_eviction() -> None:
+    """
+    Tests the least recently used entry is evicted.
+    """
+    cache = VerificationCache(2)
+    cache.add(b'a', b'1')
+    cache.add(b'b', b'2')
+    assert cache.get(b'a', b'1') is True
+
+    cache.add(b'c', b'3')
+    assert cache.get(b'b', b'2') is False
+    assert cache.get(b'a', b'1') is True
+    assert cache.get(b'c', b'3') is True
+    assert len(cache) == 2
+
+
+def test_expiry() -> None:
+    """
+    Tests entries expire after the ttl.
+    """
+    cache = VerificationCache(2, ttl=0.01)
+    cache.add(b'a', b'1')
+    time.sleep(0.02)
+
+    assert cache.get(b'a', b'1') is False
+    assert len(cache) == 0
+
+
+def test_invalidate(bcrypt: Bcrypt) -> None:
+    """
+    Tests entries for a changed hash are dropped.
+    """
+    pw_hash = bcrypt.generate_password_hash('secret', 4)
+    assert bcrypt.check_password_hash(pw_hash, 'secret') is True
+
+    valid, new_hash = bcrypt.verify_and_update(pw_hash, 'secret')
+    assert valid is True and new_hash is not None
+    assert len(bcrypt.cache) == 0
+
+    bcrypt.cache.add(new_hash, b'secret')
+    bcrypt.cache.invalidate(new_hash.decode('utf-8'))
+    assert len(bcrypt.cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_async_hit(bcrypt: Bcrypt) -> None:
+    """
+    Tests the async check uses the cache.
+    """
+    pw_hash = await bcrypt.async_generate_password_hash('secret')
+
+    assert await bcrypt.async_check_password_hash(pw_hash, 'secret')
+    assert await bcrypt.async_check_password_hash(pw_hash, 'secret')
+    assert bcrypt.cache.hits == 1
@@ -0,0 +1,118 @@
+"""
+Tests the cost calibration of Quart Bcrypt.
+"""
+import json
+import logging
+
+import pytest
+import quart
+
+from quart_bcrypt import Bcrypt
+from quart_bcrypt.backends import BcryptBackend
+from quart_bcrypt.calibration import (
+    calibrate_rounds,
+    calibration_key,
+    load_calibration,
+    store_calibration
+)
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt, tmp_path) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    app.config['BCRYPT_TARGET_MS'] = 5
+    app.config['BCRYPT_CALIBRATION_CACHE'] = str(tmp_path / 'cache.json')
+
+    extension.init_app(app)
+
+    return extension
+
+
+def test_calibrate_rounds() -> None:
+    """
+    Tests the calibration never goes below the
+    minimum cost.
+    """
+    assert calibrate_rounds(0.0001) == BcryptBackend.min_rounds
+    assert calibrate_rounds(5) >= BcryptBackend.min_rounds
+
+
+def test_cache_round_trip(tmp_path) -> None:
+    """
+    Tests storing and loading a calibration keeps
+    the other entries.
+    """
+    path = tmp_path / 'cache.json'
+    assert load_calibration(path, 'a') is None
+
+    store_calibration(path, 'a', 10)
+    store_calibration(path, 'b', 11)
+
+    assert load_calibration(path, 'a') == 10
+    assert load_calibration(path, 'b') == 11
+
+    path.write_text('not json')
+    assert load_calibration(path, 'a') is None
+
+
+@pytest.mark.asyncio
+async def test_calibrate_before_serving(
+    app: quart.Quart, bcrypt: Bcrypt, caplog
+) -> None:
+    """
+    Tests the cost is calibrated and cached before
+    the app starts serving.
+    """
+    caplog.set_level(logging.INFO)
+
+    async with app.test_app():
+        rounds = bcrypt._log_rounds
+
+    assert rounds >= BcryptBackend.min_rounds
+    assert 'from benchmark' in caplog.text
+
+    path = app.config['BCRYPT_CALIBRATION_CACHE']
+    key = calibration_key(5, b'2b')
+    with open(path, encoding='utf-8') as cache:
+        assert json.load(cache) == {key: rounds}
+
+
+@pytest.mark.asyncio
+async def test_calibrate_from_cache(
+    app: quart.Quart, bcrypt: Bcrypt, caplog
+) -> None:
+    """
+    Tests a cached calibration skips the benchmark.
+    """
+    caplog.set_level(logging.INFO)
+    store_calibration(
+        app.config['BCRYPT_CALIBRATION_CACHE'],
+        calibration_key(5, b'2b'), 9
+        )
+
+    async with app.test_app():
+        assert bcrypt._log_rounds == 9
+
+    assert 'from cache' in caplog.text
+
+
+def test_untrusted_cache(tmp_path) -> None:
+    """
+    Tests costs out of range and files writable by
+    others are ignored.
+    """
+    path = tmp_path / 'cache.json'
+    store_calibration(path, 'low', 3)
+    store_calibration(path, 'high', 32)
+    store_calibration(path, 'ok', 10)
+
+    assert load_calibration(path, 'low') is None
+    assert load_calibration(path, 'high') is None
+    assert load_calibration(path, 'ok') == 10
+    assert load_calibration(path, 'low', 'scrypt') == 3
+
+    path.chmod(0o666)
+    assert load_calibration(path, 'ok') is None
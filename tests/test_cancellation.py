@@ -0,0 +1,147 @@
+"""
+Tests cancellation and timeouts of async calls with Quart Bcrypt.
+"""
+import asyncio
+import threading
+
+import pytest
+import quart
+
+from quart_bcrypt import Bcrypt, BcryptOverloaded, BcryptTimeout
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    app.config['BCRYPT_MAX_WORKERS'] = 1
+    app.config['BCRYPT_MAX_CONCURRENCY'] = 1
+    extension.init_app(app)
+
+    return extension
+
+
+async def block(bcrypt: Bcrypt, event: threading.Event) -> asyncio.Task:
+    """
+    Starts a job holding the only slot and worker
+    until the event is set.
+    """
+    task = asyncio.ensure_future(bcrypt._run_job(event.wait, 5))
+    while bcrypt.executor.active_workers == 0:
+        await asyncio.sleep(0.001)
+    return task
+
+
+@pytest.mark.asyncio
+async def test_cancel_queued(bcrypt: Bcrypt) -> None:
+    """
+    Tests a cancelled call waiting for a slot is
+    dropped without hashing.
+    """
+    event = threading.Event()
+    blocker = await block(bcrypt, event)
+    pw_hash = bcrypt.generate_password_hash('secret')
+
+    call = asyncio.ensure_future(
+        bcrypt.async_check_password_hash(pw_hash, 'secret'))
+    await asyncio.sleep(0.01)
+    assert bcrypt.admission.queued == 1
+
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+    await asyncio.sleep(0)
+    assert bcrypt.admission.queued == 0
+
+    event.set()
+    await blocker
+    assert bcrypt.admission.in_flight == 0
+    assert bcrypt.executor.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_cancel_running_holds_slot(bcrypt: Bcrypt) -> None:
+    """
+    Tests the slot of a cancelled running job is
+    only freed once the worker is done.
+    """
+    event = threading.Event()
+    blocker = await block(bcrypt, event)
+
+    blocker.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await blocker
+    assert bcrypt.admission.in_flight == 1
+
+    event.set()
+    for _ in range(100):
+        if not bcrypt.admission.in_flight:
+            break
+        await asyncio.sleep(0.01)
+    assert bcrypt.admission.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancel_submitted(app: quart.Quart, extension: Bcrypt) -> None:
+    """
+    Tests a cancelled job still queued in the pool
+    never runs.
+    """
+    app.config['BCRYPT_MAX_WORKERS'] = 1
+    app.config['BCRYPT_MAX_CONCURRENCY'] = 2
+    extension.init_app(app)
+    event = threading.Event()
+    blocker = await block(extension, event)
+    ran = []
+
+    call = asyncio.ensure_future(extension._run_job(ran.append, 1))
+    await asyncio.sleep(0.01)
+    assert extension.executor.queue_depth == 1
+
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+    assert extension.admission.in_flight == 1
+
+    event.set()
+    await blocker
+    assert ran == []
+    assert extension.admission.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_timeout_waiting(bcrypt: Bcrypt) -> None:
+    """
+    Tests a call waiting longer than its timeout
+    gives up its place.
+    """
+    event = threading.Event()
+    blocker = await block(bcrypt, event)
+
+    with pytest.raises(BcryptTimeout) as error:
+        await bcrypt.async_generate_password_hash('secret', timeout=0.01)
+    assert isinstance(error.value, BcryptOverloaded)
+    assert bcrypt.admission.queued == 0
+
+    event.set()
+    await blocker
+
+
+@pytest.mark.asyncio
+async def test_timeout_too_short(bcrypt: Bcrypt) -> None:
+    """
+    Tests a hash that cannot finish in time is not
+    started.
+    """
+    pw_hash = await bcrypt.async_generate_password_hash('secret')
+    bcrypt._compute_times[('2b', 6)] = 10.0
+
+    with pytest.raises(BcryptTimeout):
+        await bcrypt.async_check_password_hash(pw_hash, 'secret', timeout=1)
+    assert bcrypt.admission.in_flight == 0
+
+    bcrypt._compute_times[('2b', 6)] = 0.001
+    assert await bcrypt.async_check_password_hash(
+        pw_hash, 'secret', timeout=5)
@@ -0,0 +1,206 @@
+"""
+Tests the Quart Bcrypt command line tools.
+"""
+import json
+
+import pytest
+import quart
+
+from quart_bcrypt import Bcrypt
+from quart_bcrypt.cli import audit_hashes, read_hashes
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    extension.init_app(app)
+
+    return extension
+
+
+@pytest.fixture
+def export(tmp_path, bcrypt: Bcrypt):
+    """
+    Returns a CSV export with current, outdated and
+    malformed hashes.
+    """
+    rows = [
+        bcrypt.generate_password_hash('secret'),
+        bcrypt.generate_password_hash('secret', 4),
+        bcrypt.generate_password_hash('secret', 4),
+        b'junk',
+        bcrypt.generate_password_hash('secret', prefix='2a'),
+    ]
+    path = tmp_path / 'users.csv'
+    path.write_text('id,pw_hash\n' + ''.join(
+        f'{index},{pw_hash.decode("ascii")}\n'
+        for index, pw_hash in enumerate(rows)
+        ))
+    return path
+
+
+def test_read_jsonl(tmp_path) -> None:
+    """
+    Tests JSON Lines rows without a hash are read
+    as None.
+    """
+    path = tmp_path / 'users.jsonl'
+    path.write_text(
+        '{"hash": "$2b$12$abc"}\n\n{"hash": 1}\nnot json\n{"id": 2}\n'
+        )
+
+    with path.open() as stream:
+        assert list(read_hashes(stream, 'jsonl', 'hash')) == [
+            '$2b$12$abc', None, None, None
+        ]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_audit_hashes(bcrypt: Bcrypt, workers: int) -> None:
+    """
+    Tests hashes are counted by group, in a process
+    pool when there are several workers.
+    """
+    pw_hash = bcrypt.generate_password_hash('secret').decode('ascii')
+
+    result = audit_hashes(
+        iter([pw_hash, None, pw_hash, 'junk'] * 3), workers, chunk_size=5
+        )
+
+    assert result['total'] == 12
+    assert result['groups'][('bcrypt', '2b', 6, None, None)] == 6
+    assert result['malformed'] == 6
+    assert result['malformed_entries'] == [2, 4, 6, 8, 10, 12]
+
+
+def test_malformed_entries_bounded(bcrypt: Bcrypt) -> None:
+    """
+    Tests only the first malformed line numbers are
+    kept.
+    """
+    result = audit_hashes(
+        iter(['junk'] * 50), 2, chunk_size=3, max_entries=4
+        )
+
+    assert result['malformed'] == 50
+    assert result['malformed_entries'] == [1, 2, 3, 4]
+
+
+def test_audit(app: quart.Quart, export) -> None:
+    """
+    Tests the audit command reports outdated and
+    malformed hashes.
+    """
+    runner = app.test_cli_runner()
+    result = runner.invoke(
+        args=['bcrypt', 'audit', str(export), '--workers', '1', '--json']
+        )
+
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.output)
+    assert report['total'] == 5
+    assert report['outdated'] == 4
+    assert report['malformed_entries'] == [4]
+    assert {
+        'backend': 'bcrypt', 'prefix': '2b', 'cost': 4, 'pepper': None,
+        'prehash': None, 'count': 2,
+    } in report['groups']
+
+    result = runner.invoke(args=['bcrypt', 'audit', str(export)])
+    assert 'Outdated:  4 (target bcrypt $2b$ cost 6)' in result.output
+
+
+def test_audit_missing_column(app: quart.Quart, export) -> None:
+    """
+    Tests a missing CSV column is a usage error.
+    """
+    runner = app.test_cli_runner()
+    result = runner.invoke(
+        args=['bcrypt', 'audit', str(export), '--column', 'password']
+        )
+
+    assert result.exit_code == 2
+    assert "no 'password' column" in result.output
+
+
+def test_estimate(app: quart.Quart, export) -> None:
+    """
+    Tests the estimate command counts the hashes
+    to migrate.
+    """
+    runner = app.test_cli_runner()
+    args = ['bcrypt', 'estimate', str(export), '--workers', '2', '--json']
+
+    report = json.loads(runner.invoke(args=args).output)
+    assert report['migrating'] == 3
+    assert report['malformed'] == 1
+    pool = app.extensions['bcrypt'].executor
+    assert report['hash_workers'] == pool.max_workers
+
+    report = json.loads(
+        runner.invoke(args=args + ['--hash-workers', '2']).output)
+    assert report['hash_workers'] == 2
+    assert report['wall_seconds'] * 2 == pytest.approx(
+        report['cpu_seconds'], abs=0.002)
+
+    report = json.loads(runner.invoke(args=args + ['--all']).output)
+    assert report['migrating'] == 4
+
+    report = json.loads(runner.invoke(args=args + ['--rounds', '4']).output)
+    assert report['migrating'] == 1
+    assert report['target']['cost'] == 4
+
+
+def test_audit_long_passwords(
+    app: quart.Quart, extension: Bcrypt, tmp_path
+) -> None:
+    """
+    Tests untagged hashes are outdated once long
+    passwords are handled, like needs_rehash.
+    """
+    rows = [extension.generate_password_hash('secret') for _ in range(3)]
+    app.config['BCRYPT_HANDLE_LONG_PASSWORDS'] = True
+    app.config['BCRYPT_LEGACY_LONG_PASSWORDS'] = False
+    extension.init_app(app)
+    rows.append(extension.generate_password_hash('secret'))
+
+    path = tmp_path / 'users.csv'
+    path.write_text('pw_hash\n' + ''.join(
+        f'{pw_hash.decode("ascii")}\n' for pw_hash in rows
+        ))
+    result = app.test_cli_runner().invoke(
+        args=['bcrypt', 'audit', str(path), '--workers', '1', '--json']
+        )
+
+    report = json.loads(result.output)
+    assert report['outdated'] == 3
+    assert [extension.needs_rehash(row) for row in rows] == [
+        True, True, True, False
+    ]
+    assert {
+        'backend': 'bcrypt', 'prefix': '2b', 'cost': 6, 'pepper': None,
+        'prehash': 'sha256', 'count': 1,
+    } in report['groups']
+
+
+def test_estimate_times_each_setting_once(
+    app: quart.Quart, export, monkeypatch
+) -> None:
+    """
+    Tests groups with the same backend, prefix and
+    cost are only timed once.
+    """
+    timed = []
+    monkeypatch.setattr(
+        'quart_bcrypt.cli.hash_seconds',
+        lambda *settings: timed.append(settings) or 0.01
+        )
+    args = ['bcrypt', 'estimate', str(export), '--all', '--json']
+
+    report = json.loads(app.test_cli_runner().invoke(args=args).output)
+    assert report['migrating'] == 4
+    assert sorted(timed) == [('bcrypt', '2a', 6), ('bcrypt', '2b', 4),
+                             ('bcrypt', '2b', 6)]
@@ -0,0 +1,122 @@
+"""
+Tests coalescing concurrent checks with Quart Bcrypt.
+"""
+import asyncio
+
+import pytest
+import quart
+
+from quart_bcrypt import Bcrypt, CheckCoalescer, InMemoryMetrics
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    extension.init_app(app)
+
+    return extension
+
+
+@pytest.mark.asyncio
+async def test_identical_checks_coalesced(bcrypt: Bcrypt) -> None:
+    """
+    Tests concurrent checks of the same pair share
+    one computation.
+    """
+    pw_hash = await bcrypt.async_generate_password_hash('secret')
+    metrics = InMemoryMetrics()
+    bcrypt.add_observer(metrics)
+
+    results = await asyncio.gather(
+        *(bcrypt.async_check_password_hash(pw_hash, 'secret')
+          for _ in range(5)),
+        bcrypt.async_check_password_hash(pw_hash, 'hunter2')
+        )
+
+    assert results == [True] * 5 + [False]
+    assert bcrypt.coalescer.flights == 2
+    assert bcrypt.coalescer.coalesced == 4
+    assert metrics.compute_time[('check', 'async')].count == 2
+    assert len(bcrypt.coalescer) == 0
+
+
+@pytest.mark.asyncio
+async def test_later_checks_not_coalesced(bcrypt: Bcrypt) -> None:
+    """
+    Tests a finished check is not reused.
+    """
+    pw_hash = await bcrypt.async_generate_password_hash('secret')
+
+    assert await bcrypt.async_check_password_hash(pw_hash, 'secret')
+    assert await bcrypt.async_check_password_hash(pw_hash, 'secret')
+    assert bcrypt.coalescer.flights == 2
+    assert bcrypt.coalescer.coalesced == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller() -> None:
+    """
+    Tests a cancelled caller does not cancel the
+    check of the others, and the last one does.
+    """
+    coalescer = CheckCoalescer()
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def check() -> bool:
+        started.set()
+        await release.wait()
+        return True
+
+    first = asyncio.ensure_future(coalescer.run(b'hash', b'pw', check))
+    second = asyncio.ensure_future(coalescer.run(b'hash', b'pw', check))
+    await started.wait()
+
+    first.cancel()
+    release.set()
+    assert await second is True
+
+    started.clear()
+    release.clear()
+    third = asyncio.ensure_future(coalescer.run(b'hash', b'pw', check))
+    await started.wait()
+    third.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await third
+    await asyncio.sleep(0.01)
+
+    assert len(coalescer) == 0
+
+
+def test_disabled(app: quart.Quart, extension: Bcrypt) -> None:
+    """
+    Tests coalescing may be turned off.
+    """
+    app.config['BCRYPT_COALESCE_CHECKS'] = False
+    extension.init_app(app)
+
+    assert extension.coalescer is None
+
+
+@pytest.mark.asyncio
+async def test_lanes_not_shared(bcrypt: Bcrypt) -> None:
+    """
+    Tests checks only join one with the same priority
+    and timeout.
+    """
+    pw_hash = await bcrypt.async_generate_password_hash('secret')
+
+    results = await asyncio.gather(
+        bcrypt.async_check_password_hash(
+            pw_hash, 'secret', priority='background', timeout=5),
+        bcrypt.async_check_password_hash(pw_hash, 'secret'),
+        bcrypt.async_check_password_hash(pw_hash, 'secret', timeout=5),
+        bcrypt.async_check_password_hash(pw_hash, 'secret', timeout=5)
+        )
+
+    assert results == [True] * 4
+    assert bcrypt.coalescer.flights == 3
+    assert bcrypt.coalescer.coalesced == 1
@@ -0,0 +1,110 @@
+"""
+Tests dummy checks for unknown users with Quart Bcrypt.
+"""
+import asyncio
+
+import pytest
+import quart
+
+from quart_bcrypt import Bcrypt, BcryptOverloaded, InMemoryMetrics
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    extension.init_app(app)
+
+    return extension
+
+
+def test_dummy_hash_built(bcrypt: Bcrypt) -> None:
+    """
+    Tests the dummy hash is built at init_app with
+    the configured cost and rebuilt when it changes.
+    """
+    dummy = bcrypt.dummy_hash
+
+    assert dummy.startswith(b'$2b$06$')
+    assert bcrypt.dummy_hash is dummy
+
+    bcrypt._log_rounds = 5
+    assert bcrypt.dummy_hash.startswith(b'$2b$05$')
+
+
+def test_check_or_dummy(bcrypt: Bcrypt) -> None:
+    """
+    Tests real hashes are checked and a missing
+    hash is never valid.
+    """
+    pw_hash = bcrypt.generate_password_hash('secret')
+
+    assert bcrypt.check_password_hash_or_dummy(pw_hash, 'secret') is True
+    assert bcrypt.check_password_hash_or_dummy(pw_hash, 'hunter2') is False
+    assert bcrypt.check_password_hash_or_dummy(None, 'secret') is False
+
+
+def test_dummy_observed_as_check(bcrypt: Bcrypt) -> None:
+    """
+    Tests a dummy check does the same work as a
+    real check.
+    """
+    metrics = InMemoryMetrics()
+    bcrypt.add_observer(metrics)
+
+    bcrypt.check_password_hash_or_dummy(None, 'secret')
+
+    histogram = metrics.compute_time[('check', 'sync')]
+    assert histogram.count == 1
+    assert metrics.results[('check', 'sync', 'mismatch')] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_check_or_dummy(bcrypt: Bcrypt) -> None:
+    """
+    Tests the async version.
+    """
+    pw_hash = await bcrypt.async_generate_password_hash('secret')
+
+    assert await bcrypt.async_check_password_hash_or_dummy(
+        pw_hash, 'secret') is True
+    assert await bcrypt.async_check_password_hash_or_dummy(
+        None, 'secret') is False
+
+
+@pytest.mark.asyncio
+async def test_dummy_admission(app: quart.Quart, extension: Bcrypt) -> None:
+    """
+    Tests dummy checks are subject to the same
+    admission limits.
+    """
+    app.config['BCRYPT_MAX_CONCURRENCY'] = 1
+    app.config['BCRYPT_MAX_QUEUE'] = 0
+    extension.init_app(app)
+
+    results = await asyncio.gather(
+        *(extension.async_check_password_hash_or_dummy(None, password)
+          for password in ('secret', 'hunter2', 'letmein')),
+        return_exceptions=True
+        )
+
+    assert results[0] is False
+    assert all(isinstance(result, BcryptOverloaded) for result in results[1:])
+
+
+@pytest.mark.asyncio
+async def test_dummy_not_coalesced(bcrypt: Bcrypt) -> None:
+    """
+    Tests concurrent dummy checks of the same password
+    each run their own check.
+    """
+    results = await asyncio.gather(
+        *(bcrypt.async_check_password_hash_or_dummy(None, 'secret')
+          for _ in range(3))
+        )
+
+    assert results == [False] * 3
+    assert bcrypt.coalescer.flights == 0
+    assert bcrypt.coalescer.coalesced == 0
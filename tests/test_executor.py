@@ -0,0 +1,131 @@
+"""
+Tests the hashing executor of Quart Bcrypt.
+"""
+import threading
+
+import pytest
+import quart
+
+from quart_bcrypt import Bcrypt, HashingExecutor
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    app.config['BCRYPT_MAX_WORKERS'] = 2
+
+    extension.init_app(app)
+
+    return extension
+
+
+def test_max_workers_set(bcrypt: Bcrypt) -> None:
+    """
+    Tests the pool is sized from the app config
+    and started by `init_app`.
+    """
+    assert bcrypt.executor.max_workers == 2
+    assert bcrypt.executor.running is True
+
+
+def test_invalid_max_workers() -> None:
+    """
+    Tests an empty pool is rejected.
+    """
+    with pytest.raises(ValueError):
+        HashingExecutor(0)
+
+
+def test_invalid_kind() -> None:
+    """
+    Tests an unknown executor kind is rejected.
+    """
+    with pytest.raises(ValueError):
+        HashingExecutor(2, 'fiber')
+
+
+@pytest.mark.asyncio
+async def test_runs_in_own_pool(bcrypt: Bcrypt) -> None:
+    """
+    Tests hashing is not run in the default
+    executor of the event loop.
+    """
+    name = await bcrypt.executor.run(
+        lambda: threading.current_thread().name)
+    assert name.startswith(HashingExecutor.thread_name_prefix)
+
+    pw_hash = await bcrypt.async_generate_password_hash('secret')
+    assert await bcrypt.async_check_password_hash(pw_hash, 'secret')
+
+
+@pytest.mark.asyncio
+async def test_counters(bcrypt: Bcrypt) -> None:
+    """
+    Tests the queue depth and active worker
+    counters.
+    """
+    release = threading.Event()
+    running = threading.Semaphore(0)
+
+    def job() -> None:
+        running.release()
+        release.wait()
+
+    futures = [bcrypt.executor.submit(job) for _ in range(3)]
+    running.acquire()
+    running.acquire()
+
+    assert bcrypt.executor.active_workers == 2
+    assert bcrypt.executor.queue_depth == 1
+
+    release.set()
+    for future in futures:
+        future.result()
+
+    assert bcrypt.executor.active_workers == 0
+    assert bcrypt.executor.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_shutdown_after_serving(
+    app: quart.Quart, bcrypt: Bcrypt
+) -> None:
+    """
+    Tests the pool is shut down when the app stops
+    serving and restarted when used again.
+    """
+    async with app.test_app():
+        assert bcrypt.executor.running is True
+
+    assert bcrypt.executor.running is False
+
+    pw_hash = await bcrypt.async_generate_password_hash('secret')
+    assert await bcrypt.async_check_password_hash(pw_hash, 'secret')
+    assert bcrypt.executor.running is True
+
+
+@pytest.mark.asyncio
+async def test_process_pool(app: quart.Quart, extension: Bcrypt) -> None:
+    """
+    Tests hashing in a pool of worker processes
+    spawned before the app starts serving.
+    """
+    app.config['BCRYPT_MAX_WORKERS'] = 2
+    app.config['BCRYPT_EXECUTOR'] = 'process'
+    extension.init_app(app)
+
+    async with app.test_app():
+        assert extension.executor.kind == 'process'
+
+        pw_hash = await extension.async_generate_password_hash('secret')
+        assert await extension.async_check_password_hash(pw_hash, 'secret')
+        assert not await extension.async_check_password_hash(
+            pw_hash, 'hunter2')
+
+        assert extension.executor.queue_depth == 0
+        assert extension.executor.active_workers == 0
+
+    assert extension.executor.running is False
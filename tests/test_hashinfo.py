@@ -0,0 +1,104 @@
+"""
+Tests parsing hashes with Quart Bcrypt.
+"""
+import pytest
+import quart
+
+from quart_bcrypt import Bcrypt, HashInfo, parse_hash, parse_hashes
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    extension.init_app(app)
+
+    return extension
+
+
+def test_parse_bcrypt(bcrypt: Bcrypt) -> None:
+    """
+    Tests the parts of a bcrypt hash are read.
+    """
+    pw_hash = bcrypt.generate_password_hash('secret')
+    info = parse_hash(pw_hash.decode('ascii'))
+
+    assert info == HashInfo(
+        'bcrypt', '2b', 6, pw_hash[7:29], pw_hash[29:]
+        )
+    assert not hasattr(info, '__dict__')
+
+
+def test_parse_scrypt() -> None:
+    """
+    Tests the parts of a scrypt hash are read.
+    """
+    info = parse_hash(b'$scrypt$ln=15,r=8,p=1$c2FsdA$Y2hlY2tzdW0')
+
+    assert (info.backend, info.prefix, info.cost) == ('scrypt', 'scrypt', 15)
+    assert info.salt == b'c2FsdA'
+    assert info.checksum == b'Y2hlY2tzdW0'
+
+
+@pytest.mark.parametrize('pw_hash', [
+    b'',
+    b'secret',
+    b'$2b$12$',
+    b'$2b$12$R9h/cIPz0gi.URNNX3kh2O',
+    b'$2b$99$R9h/cIPz0gi.URNNX3kh2OPST9/PgBkqquzi.Ss7KIUgO2t0jWMUW',
+    b'$2b$12$R9h/cIPz0gi.URNNX3kh2OPST9/PgBkqquzi.Ss7KIUgO2t0jWMU!',
+    b'$2x$12$R9h/cIPz0gi.URNNX3kh2OPST9/PgBkqquzi.Ss7KIUgO2t0jWMUW',
+    b'$scrypt$ln=15$c2FsdA$Y2hlY2tzdW0',
+    'café',
+])
+def test_malformed(pw_hash) -> None:
+    """
+    Tests malformed hashes are rejected.
+    """
+    with pytest.raises(ValueError):
+        parse_hash(pw_hash)
+
+
+def test_parse_column(bcrypt: Bcrypt) -> None:
+    """
+    Tests a column of hashes is parsed lazily with
+    None for malformed entries.
+    """
+    pw_hash = bcrypt.generate_password_hash('secret')
+    column = iter([pw_hash, b'junk', pw_hash.decode('ascii')])
+
+    results = parse_hashes(column)
+    assert next(results).cost == 6
+    assert list(results) == [None, parse_hash(pw_hash)]
+
+
+def test_needs_rehash(bcrypt: Bcrypt) -> None:
+    """
+    Tests outdated and malformed hashes need a new
+    hash, without hashing.
+    """
+    assert not bcrypt.needs_rehash(bcrypt.generate_password_hash('secret'))
+    assert not bcrypt.needs_rehash(
+        bcrypt.generate_password_hash('secret', 7))
+    assert bcrypt.needs_rehash(bcrypt.generate_password_hash('secret', 5))
+    assert bcrypt.needs_rehash(
+        bcrypt.generate_password_hash('secret', prefix='2a'))
+    assert bcrypt.needs_rehash(b'$scrypt$ln=15,r=8,p=1$c2FsdA$Y2hlY2tzdW0')
+    assert bcrypt.needs_rehash('not a hash')
+
+
+def test_is_outdated(bcrypt: Bcrypt) -> None:
+    """
+    Tests parsed settings are judged the same way
+    as needs_rehash.
+    """
+    settings = parse_hash(bcrypt.generate_password_hash('secret')).settings
+
+    assert settings == bcrypt.hash_settings == ('bcrypt', '2b', 6, None, None)
+    assert not bcrypt.is_outdated(settings)
+    assert bcrypt.is_outdated(settings, rounds=7)
+    assert bcrypt.is_outdated(('bcrypt', '2a', 6, None, None))
+    assert bcrypt.is_outdated(('bcrypt', '2b', 6, None, 'sha256'))
+    assert bcrypt.is_outdated(None)
@@ -0,0 +1,67 @@
+"""
+Tests the helper functions of Quart Bcrypt.
+"""
+import pytest
+import quart
+
+from quart_bcrypt import (
+    Bcrypt,
+    async_check_password_hash,
+    async_generate_password_hash,
+    check_password_hash,
+    generate_password_hash
+)
+from quart_bcrypt.helpers import _get_bcrypt
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    app.config['BCRYPT_LOG_ROUNDS'] = 5
+
+    extension.init_app(app)
+
+    return extension
+
+
+def test_shared_instance() -> None:
+    """
+    Tests the helpers reuse one instance outside
+    an app context.
+    """
+    assert _get_bcrypt() is _get_bcrypt()
+
+
+@pytest.mark.asyncio
+async def test_uses_app_extension(app: quart.Quart, bcrypt: Bcrypt) -> None:
+    """
+    Tests the helpers use the extension and config
+    of the current app.
+    """
+    async with app.app_context():
+        assert _get_bcrypt() is bcrypt
+
+        pw_hash = generate_password_hash('secret')
+        assert pw_hash.startswith(b'$2b$05$')
+        assert check_password_hash(pw_hash, 'secret') is True
+
+        pw_hash = await async_generate_password_hash('secret')
+        assert pw_hash.startswith(b'$2b$05$')
+        assert await async_check_password_hash(pw_hash, 'secret') is True
+
+
+@pytest.mark.asyncio
+async def test_app_without_extension() -> None:
+    """
+    Tests the shared instance is used for an app
+    without the extension.
+    """
+    app = quart.Quart(__name__)
+
+    async with app.app_context():
+        assert _get_bcrypt() is not None
+        assert 'bcrypt' not in app.extensions
+        assert _get_bcrypt() is _get_bcrypt()
@@ -0,0 +1,163 @@
+"""
+Tests the instrumentation of Quart Bcrypt.
+"""
+import pytest
+import quart
+
+from quart_bcrypt import Bcrypt, HashEvent, Histogram, InMemoryMetrics
+
+
+class Recorder(object):
+    """
+    An observer keeping every event.
+    """
+
+    def __init__(self) -> None:
+        self.events = []
+
+    def observe(self, event: HashEvent) -> None:
+        self.events.append(event)
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    extension.init_app(app)
+
+    return extension
+
+
+def test_sync_events(bcrypt: Bcrypt) -> None:
+    """
+    Tests the sync functions report an event
+    for each call.
+    """
+    recorder = Recorder()
+    bcrypt.add_observer(recorder)
+
+    pw_hash = bcrypt.generate_password_hash('secret', 5, '2a')
+    bcrypt.check_password_hash(pw_hash, 'hunter2')
+
+    hashed, checked = recorder.events
+    assert hashed.operation == 'hash' and hashed.mode == 'sync'
+    assert (hashed.rounds, hashed.prefix) == (5, '2a')
+    assert hashed.result is None and hashed.queue_wait == 0
+    assert hashed.compute_time > 0
+    assert checked.operation == 'check' and checked.result is False
+    assert checked.long_passwords is False
+
+    bcrypt.remove_observer(recorder)
+    bcrypt.check_password_hash(pw_hash, 'secret')
+    assert len(recorder.events) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_events(bcrypt: Bcrypt) -> None:
+    """
+    Tests the async functions report the queue
+    wait and compute time.
+    """
+    recorder = Recorder()
+    bcrypt.add_observer(recorder)
+
+    pw_hash = await bcrypt.async_generate_password_hash('secret')
+    await bcrypt.async_check_password_hash(pw_hash, 'secret')
+
+    hashed, checked = recorder.events
+    assert hashed.mode == 'async' and hashed.rounds == 6
+    assert hashed.queue_wait >= 0 and hashed.compute_time > 0
+    assert checked.result is True
+
+
+def test_error_event(bcrypt: Bcrypt) -> None:
+    """
+    Tests a bcrypt error is reported and raised.
+    """
+    recorder = Recorder()
+    bcrypt.add_observer(recorder)
+
+    with pytest.raises(ValueError):
+        bcrypt.check_password_hash('not a hash', 'secret')
+
+    event, = recorder.events
+    assert event.error == 'ValueError'
+    assert event.rounds is None
+
+
+def test_failing_observer(bcrypt: Bcrypt) -> None:
+    """
+    Tests a failing observer does not break hashing.
+    """
+    class Broken(object):
+        def observe(self, event: HashEvent) -> None:
+            raise RuntimeError()
+
+    bcrypt.add_observer(Broken())
+    pw_hash = bcrypt.generate_password_hash('secret')
+    assert bcrypt.check_password_hash(pw_hash, 'secret') is True
+
+
+def test_histogram() -> None:
+    """
+    Tests the cumulative buckets and quantiles.
+    """
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(3.05)
+    assert histogram.buckets == [(0.1, 1), (1.0, 3), (float('inf'), 4)]
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(0.25) == 0.1
+
+
+def test_in_memory_metrics(bcrypt: Bcrypt) -> None:
+    """
+    Tests the metrics observer records histograms
+    and results.
+    """
+    metrics = InMemoryMetrics()
+    bcrypt.add_observer(metrics)
+
+    pw_hash = bcrypt.generate_password_hash('secret')
+    bcrypt.check_password_hash(pw_hash, 'secret')
+    bcrypt.check_password_hash(pw_hash, 'hunter2')
+
+    assert metrics.compute_time[('check', 'sync')].count == 2
+    snapshot = metrics.snapshot()
+    outcomes = {
+        (result['operation'], result['outcome']): result['count']
+        for result in snapshot['results']
+    }
+    assert outcomes == {
+        ('hash', 'ok'): 1, ('check', 'match'): 1, ('check', 'mismatch'): 1
+    }
+    assert len(snapshot['compute_seconds']) == 2
+
+
+def test_long_passwords_from_tag(
+    app: quart.Quart, extension: Bcrypt
+) -> None:
+    """
+    Tests checks report whether the checked hash
+    was made with the long password workaround.
+    """
+    recorder = Recorder()
+    extension.init_app(app)
+    untagged = extension.generate_password_hash('secret')
+
+    app.config['BCRYPT_HANDLE_LONG_PASSWORDS'] = True
+    app.config['BCRYPT_LEGACY_LONG_PASSWORDS'] = False
+    extension.init_app(app)
+    extension.add_observer(recorder)
+    tagged = extension.generate_password_hash('secret')
+    extension.check_password_hash(untagged, 'secret')
+    extension.check_password_hash(tagged, 'secret')
+
+    assert [event.long_passwords for event in recorder.events] == [
+        True, False, True
+    ]
@@ -0,0 +1,140 @@
+"""
+Tests peppered hashes with Quart Bcrypt.
+"""
+import pytest
+import quart
+
+from quart_bcrypt import Bcrypt, InMemoryMetrics, PepperKeyring, parse_hash
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    app.config['BCRYPT_PEPPERS'] = {'k1': 'first secret'}
+    extension.init_app(app)
+
+    return extension
+
+
+def rotate(app: quart.Quart, bcrypt: Bcrypt) -> None:
+    """
+    Adds a second key and makes it current.
+    """
+    app.config['BCRYPT_PEPPERS'] = {'k1': 'first secret', 'k2': b'second'}
+    app.config['BCRYPT_PEPPER_KEY'] = None
+    bcrypt.init_app(app)
+
+
+def test_keyring() -> None:
+    """
+    Tests the keyring validates its keys and
+    defaults to the last one.
+    """
+    keyring = PepperKeyring({'a': 'x', 'b': b'y'})
+
+    assert keyring.current == 'b'
+    assert 'a' in keyring and len(keyring) == 2
+    assert keyring.apply(b'secret') != keyring.apply(b'secret', 'a')
+    assert len(keyring.apply(b'x' * 100)) == 64
+    assert keyring.tag('a') == b'$pepper$a'
+
+    with pytest.raises(ValueError):
+        PepperKeyring({})
+    with pytest.raises(ValueError):
+        PepperKeyring({'a$b': 'x'})
+    with pytest.raises(ValueError):
+        PepperKeyring({'a': 'x'}, 'b')
+    with pytest.raises(ValueError):
+        keyring.apply(b'secret', 'c')
+
+
+def test_peppered_hash(bcrypt: Bcrypt) -> None:
+    """
+    Tests new hashes carry the key id and only
+    match with the pepper.
+    """
+    pw_hash = bcrypt.generate_password_hash('secret')
+    info = parse_hash(pw_hash)
+
+    assert pw_hash.startswith(b'$pepper$k1$2b$06$')
+    assert (info.pepper, info.prehash, info.cost) == ('k1', None, 6)
+    assert bcrypt.check_password_hash(pw_hash, 'secret')
+    assert not bcrypt.check_password_hash(pw_hash, 'hunter2')
+    assert not bcrypt.needs_rehash(pw_hash)
+    assert not bcrypt.check_password_hash(pw_hash[10:], 'secret')
+
+
+def test_rotation(app: quart.Quart, bcrypt: Bcrypt) -> None:
+    """
+    Tests hashes of an old key are checked with a
+    single bcrypt run and moved to the new key.
+    """
+    old_hash = bcrypt.generate_password_hash('secret')
+    rotate(app, bcrypt)
+    metrics = InMemoryMetrics()
+    bcrypt.add_observer(metrics)
+
+    assert bcrypt.check_password_hash(old_hash, 'secret')
+    assert metrics.compute_time[('check', 'sync')].count == 1
+    assert bcrypt.needs_rehash(old_hash)
+
+    valid, new_hash = bcrypt.verify_and_update(old_hash, 'secret')
+    assert valid and new_hash.startswith(b'$pepper$k2$')
+    assert bcrypt.pepper.audit([old_hash, new_hash, new_hash, b'junk']) \
+        == {'k1': 1, 'k2': 2}
+
+
+def test_unpeppered_hash(app: quart.Quart, extension: Bcrypt) -> None:
+    """
+    Tests hashes made before a pepper was set keep
+    verifying and need a new hash.
+    """
+    extension.init_app(app)
+    pw_hash = extension.generate_password_hash('secret')
+    app.config['BCRYPT_PEPPERS'] = {'k1': 'first secret'}
+    extension.init_app(app)
+
+    assert extension.check_password_hash(pw_hash, 'secret')
+    assert extension.needs_rehash(pw_hash)
+    assert extension.pepper.audit([pw_hash]) == {None: 1}
+
+
+def test_unknown_key(bcrypt: Bcrypt) -> None:
+    """
+    Tests a hash naming an unknown key is refused.
+    """
+    pw_hash = bcrypt.generate_password_hash('secret')
+
+    with pytest.raises(ValueError):
+        bcrypt.check_password_hash(
+            pw_hash.replace(b'$k1$', b'$k9$'), 'secret')
+
+
+@pytest.mark.asyncio
+async def test_async_and_batch(app: quart.Quart, bcrypt: Bcrypt) -> None:
+    """
+    Tests the async and batch methods pepper and
+    check hashes the same way.
+    """
+    old_hash = await bcrypt.async_generate_password_hash('secret')
+    rotate(app, bcrypt)
+
+    assert await bcrypt.async_check_password_hash(old_hash, 'secret')
+    assert await bcrypt.async_check_password_hash_or_dummy(
+        None, 'secret') is False
+
+    hashes = [
+        new_hash for _, new_hash in
+        bcrypt.generate_password_hashes_many(['secret'] * 2)
+    ]
+    assert all(new_hash.startswith(b'$pepper$k2$') for new_hash in hashes)
+
+    pairs = [(pw_hash, 'secret') for pw_hash in hashes + [old_hash]]
+    results = [
+        result async for _, result in
+        bcrypt.async_check_password_hashes_many(pairs)
+    ]
+    assert all(results)
@@ -0,0 +1,119 @@
+"""
+Tests tagged long password hashes with Quart Bcrypt.
+"""
+import hashlib
+
+import bcrypt as _bcrypt
+import pytest
+import quart
+
+from quart_bcrypt import Bcrypt, InMemoryMetrics, parse_hash
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    app.config['BCRYPT_HANDLE_LONG_PASSWORDS'] = True
+    app.config['BCRYPT_LEGACY_LONG_PASSWORDS'] = False
+    extension.init_app(app)
+
+    return extension
+
+
+def prehashed(password: bytes) -> bytes:
+    """
+    Returns an untagged hash made with the long
+    password workaround, as earlier versions did.
+    """
+    digest = hashlib.sha256(password).hexdigest().encode('ascii')
+    return _bcrypt.hashpw(digest, _bcrypt.gensalt(4))
+
+
+def test_new_hashes_tagged(bcrypt: Bcrypt) -> None:
+    """
+    Tests new hashes are tagged and checked with
+    the workaround.
+    """
+    pw_hash = bcrypt.generate_password_hash('A' * 72)
+
+    assert pw_hash.startswith(b'$sha256$2b$06$')
+    assert parse_hash(pw_hash).prehash == 'sha256'
+    assert bcrypt.check_password_hash(pw_hash, 'A' * 72)
+    assert not bcrypt.check_password_hash(pw_hash, 'A' * 80)
+    assert not bcrypt.needs_rehash(pw_hash)
+
+
+def test_untagged_checked_once(bcrypt: Bcrypt) -> None:
+    """
+    Tests untagged hashes keep verifying with a
+    single bcrypt run while the option is on.
+    """
+    metrics = InMemoryMetrics()
+    bcrypt.add_observer(metrics)
+    pw_hash = _bcrypt.hashpw(b'secret', _bcrypt.gensalt(4))
+
+    assert bcrypt.check_password_hash(pw_hash, 'secret')
+    assert not bcrypt.check_password_hash(pw_hash, 'hunter2')
+    assert metrics.compute_time[('check', 'sync')].count == 2
+    assert parse_hash(pw_hash).prehash is None
+    assert bcrypt.needs_rehash(pw_hash)
+
+    valid, new_hash = bcrypt.verify_and_update(pw_hash, 'secret')
+    assert valid and new_hash.startswith(b'$sha256$')
+
+
+def test_legacy_default(app: quart.Quart, extension: Bcrypt) -> None:
+    """
+    Tests untagged hashes of earlier versions with
+    the option on keep verifying by default.
+    """
+    app.config['BCRYPT_HANDLE_LONG_PASSWORDS'] = True
+    extension.init_app(app)
+
+    assert extension.check_password_hash(prehashed(b'secret'), 'secret')
+
+
+def test_toggle_off(app: quart.Quart, extension: Bcrypt) -> None:
+    """
+    Tests tagged hashes keep verifying once the
+    option is turned off.
+    """
+    app.config['BCRYPT_HANDLE_LONG_PASSWORDS'] = True
+    extension.init_app(app)
+    pw_hash = extension.generate_password_hash('secret')
+
+    app.config['BCRYPT_HANDLE_LONG_PASSWORDS'] = False
+    app.config['BCRYPT_LEGACY_LONG_PASSWORDS'] = False
+    extension.init_app(app)
+
+    assert extension.check_password_hash(pw_hash, 'secret')
+    assert extension.needs_rehash(pw_hash)
+    assert not extension.generate_password_hash('secret').startswith(
+        b'$sha256$')
+
+
+@pytest.mark.asyncio
+async def test_async_and_batch(bcrypt: Bcrypt) -> None:
+    """
+    Tests the async and batch methods tag and
+    check hashes the same way.
+    """
+    pw_hash = await bcrypt.async_generate_password_hash('secret')
+    plain = _bcrypt.hashpw(b'secret', _bcrypt.gensalt(4))
+
+    assert pw_hash.startswith(b'$sha256$')
+    assert await bcrypt.async_check_password_hash(pw_hash, 'secret')
+    assert await bcrypt.async_check_password_hash(plain, 'secret')
+
+    hashes = [
+        new_hash async for _, new_hash in
+        bcrypt.async_generate_password_hashes_many(['secret'] * 2)
+    ]
+    assert all(new_hash.startswith(b'$sha256$') for new_hash in hashes)
+
+    pairs = [(new_hash, 'secret') for new_hash in hashes + [plain]]
+    assert all(
+        result for _, result in bcrypt.check_password_hashes_many(pairs))
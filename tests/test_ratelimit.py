@@ -0,0 +1,130 @@
+"""
+Tests rate limiting password attempts with Quart Bcrypt.
+"""
+import pytest
+import quart
+
+from quart_bcrypt import (
+    Bcrypt,
+    BcryptRateLimited,
+    InMemoryMetrics,
+    MemoryRateLimitStore,
+    RateLimiter
+)
+from quart_bcrypt import ratelimit
+
+
+class Clock(object):
+    """
+    A clock moved by the tests.
+    """
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    """
+    Returns a clock replacing time.monotonic in
+    the rate limiter.
+    """
+    clock = Clock()
+    monkeypatch.setattr(ratelimit.time, 'monotonic', clock)
+    return clock
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    app.config['BCRYPT_RATE_LIMIT'] = 2
+    app.config['BCRYPT_RATE_LIMIT_PERIOD'] = 60
+    extension.init_app(app)
+
+    return extension
+
+
+@pytest.mark.asyncio
+async def test_token_bucket(clock: Clock) -> None:
+    """
+    Tests attempts are limited per key and regained
+    over the period.
+    """
+    limiter = RateLimiter(attempts=2, period=60)
+
+    await limiter.hit('alice')
+    await limiter.hit('alice')
+    with pytest.raises(BcryptRateLimited) as error:
+        await limiter.hit('alice')
+    assert error.value.retry_after == 30
+    assert error.value.code == 429
+
+    await limiter.hit('bob')
+
+    clock.now += 30
+    await limiter.hit('alice')
+    with pytest.raises(BcryptRateLimited):
+        await limiter.hit('alice')
+
+
+@pytest.mark.asyncio
+async def test_eviction(clock: Clock) -> None:
+    """
+    Tests full buckets are evicted periodically.
+    """
+    store = MemoryRateLimitStore(evict_interval=10)
+
+    assert await store.consume('alice', 1.0, 5) == 0
+    assert await store.consume('bob', 0.01, 5) == 0
+    assert len(store) == 2
+
+    clock.now += 10
+    await store.consume('carol', 1.0, 5)
+
+    assert len(store) == 2
+    assert 'alice' not in store._buckets
+
+
+@pytest.mark.asyncio
+async def test_rejected_before_hashing(bcrypt: Bcrypt) -> None:
+    """
+    Tests a limited key is refused before any
+    hashing is queued.
+    """
+    pw_hash = await bcrypt.async_generate_password_hash('secret')
+    await bcrypt.async_check_password_hash(pw_hash, 'hunter2', key='alice')
+    await bcrypt.async_check_password_hash(pw_hash, 'hunter2', key='alice')
+    metrics = InMemoryMetrics()
+    bcrypt.add_observer(metrics)
+
+    with pytest.raises(BcryptRateLimited):
+        await bcrypt.async_check_password_hash(pw_hash, 'secret', key='alice')
+    with pytest.raises(BcryptRateLimited):
+        await bcrypt.async_check_password_hash_or_dummy(
+            None, 'secret', key='alice')
+
+    assert not metrics.results
+    assert await bcrypt.async_check_password_hash(pw_hash, 'secret')
+    assert await bcrypt.async_verify_and_update(
+        pw_hash, 'secret', key='bob') == (True, None)
+
+
+@pytest.mark.asyncio
+async def test_disabled(app: quart.Quart, extension: Bcrypt) -> None:
+    """
+    Tests keys are ignored when rate limiting is
+    not configured.
+    """
+    extension.init_app(app)
+    pw_hash = await extension.async_generate_password_hash('secret')
+
+    assert extension.rate_limiter is None
+    for _ in range(3):
+        assert await extension.async_check_password_hash(
+            pw_hash, 'secret', key='alice')
@@ -0,0 +1,69 @@
+"""
+Tests rehashing on login with Quart Bcrypt.
+"""
+import pytest
+import quart
+
+from quart_bcrypt import Bcrypt
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    extension.init_app(app)
+
+    return extension
+
+
+def test_up_to_date(bcrypt: Bcrypt) -> None:
+    """
+    Tests a current hash is not replaced.
+    """
+    pw_hash = bcrypt.generate_password_hash('secret')
+
+    assert bcrypt.verify_and_update(pw_hash, 'secret') == (True, None)
+    assert bcrypt.verify_and_update(pw_hash, 'hunter2') == (False, None)
+
+
+def test_higher_cost_kept(bcrypt: Bcrypt) -> None:
+    """
+    Tests a hash with a higher cost is not
+    downgraded.
+    """
+    pw_hash = bcrypt.generate_password_hash('secret', 7)
+
+    assert bcrypt.verify_and_update(pw_hash, 'secret') == (True, None)
+
+
+def test_upgrade_cost(bcrypt: Bcrypt) -> None:
+    """
+    Tests a hash with a lower cost is upgraded
+    on a successful check only.
+    """
+    pw_hash = bcrypt.generate_password_hash('secret', 4)
+
+    assert bcrypt.verify_and_update(pw_hash, 'hunter2') == (False, None)
+
+    valid, new_hash = bcrypt.verify_and_update(pw_hash, 'secret')
+    assert valid is True
+    assert new_hash.startswith(b'$2b$06$')
+    assert bcrypt.check_password_hash(new_hash, 'secret')
+
+
+@pytest.mark.asyncio
+async def test_async_upgrade_prefix(bcrypt: Bcrypt) -> None:
+    """
+    Tests a hash with an older prefix is upgraded.
+    """
+    pw_hash = bcrypt.generate_password_hash('secret', prefix='2a')
+
+    valid, new_hash = await bcrypt.async_verify_and_update(pw_hash, 'secret')
+    assert valid is True
+    assert new_hash.startswith(b'$2b$06$')
+
+    valid, new_hash = await bcrypt.async_verify_and_update(
+        new_hash, 'secret')
+    assert (valid, new_hash) == (True, None)
@@ -0,0 +1,109 @@
+"""
+Tests the salt pool of Quart Bcrypt.
+"""
+import os
+
+import pytest
+import quart
+
+from quart_bcrypt import Bcrypt, SaltPool
+from quart_bcrypt.backends import get_backend
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    app.config['BCRYPT_SALT_POOL_SIZE'] = 8
+    extension.init_app(app)
+
+    return extension
+
+
+def test_unique_salts() -> None:
+    """
+    Tests every salt is given out once and the
+    pool is refilled when it runs dry.
+    """
+    pool = SaltPool(get_backend('bcrypt'), 6, b'2b', size=4, low_water=0)
+    salts = [pool.take() for _ in range(10)]
+
+    assert len(set(salts)) == 10
+    assert all(salt.startswith(b'$2b$06$') for salt in salts)
+    assert all(len(salt) == 29 for salt in salts)
+    assert pool.refills == 3
+
+
+def test_invalid_settings() -> None:
+    """
+    Tests the cost and prefix are validated.
+    """
+    with pytest.raises(ValueError):
+        SaltPool(get_backend('bcrypt'), 3, b'2b')
+    with pytest.raises(ValueError):
+        SaltPool(get_backend('bcrypt'), 6, b'2y')
+    with pytest.raises(ValueError):
+        SaltPool(get_backend('bcrypt'), 6, b'2b', size=0)
+
+
+def test_fork_discards_salts(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Tests salts are not given out again in a
+    forked child.
+    """
+    pool = SaltPool(get_backend('bcrypt'), 6, b'2b', size=4, low_water=0)
+    pool.fill()
+    inherited = list(pool._salts)
+
+    pid = os.getpid()
+    monkeypatch.setattr(os, 'getpid', lambda: pid + 1)
+
+    assert pool.take() not in inherited
+    assert not set(pool._salts) & set(inherited)
+
+
+def test_hash_with_pool(bcrypt: Bcrypt) -> None:
+    """
+    Tests hashes for the configured cost use the
+    pool and still check.
+    """
+    assert len(bcrypt.salt_pool) == 8
+
+    pw_hash = bcrypt.generate_password_hash('secret')
+    assert bcrypt.check_password_hash(pw_hash, 'secret')
+    assert len(bcrypt.salt_pool) == 7
+
+    other = bcrypt.generate_password_hash('secret', 4)
+    assert other.startswith(b'$2b$04$')
+    assert len(bcrypt.salt_pool) == 7
+
+
+@pytest.mark.asyncio
+async def test_async_hash_with_pool(bcrypt: Bcrypt) -> None:
+    """
+    Tests async hashes use the pool.
+    """
+    pw_hash = await bcrypt.async_generate_password_hash('secret')
+
+    assert await bcrypt.async_check_password_hash(pw_hash, 'secret')
+    assert len(bcrypt.salt_pool) == 7
+
+
+def test_pool_disabled(app: quart.Quart, extension: Bcrypt) -> None:
+    """
+    Tests the pool is off by default.
+    """
+    extension.init_app(app)
+
+    assert extension.salt_pool is None
+
+
+def test_scrypt_pool() -> None:
+    """
+    Tests the pool works with scrypt.
+    """
+    pool = SaltPool(get_backend('scrypt'), 4, b'scrypt', size=2)
+
+    assert pool.take().startswith(b'$scrypt$ln=4,r=8,p=1$')
@@ -0,0 +1,313 @@
+"""
+Tests hashing through the sidecar daemon with Quart Bcrypt.
+"""
+import asyncio
+import os
+import stat
+import tempfile
+
+import pytest
+import quart
+from bcrypt import gensalt
+
+from quart_bcrypt import (
+    Bcrypt,
+    HashingExecutor,
+    SidecarClient,
+    SidecarUnavailable
+)
+from quart_bcrypt.worker import HashingDaemon
+
+
+@pytest.fixture
+def socket_path() -> str:
+    """
+    Returns a short path for a Unix socket.
+    """
+    directory = tempfile.mkdtemp()
+    yield os.path.join(directory, 'bcrypt.sock')
+    os.rmdir(directory)
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt, socket_path: str) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    app.config['BCRYPT_SIDECAR_SOCKET'] = socket_path
+    app.config['BCRYPT_SIDECAR_CONNECTIONS'] = 1
+    extension.init_app(app)
+
+    return extension
+
+
+@pytest.mark.asyncio
+async def test_hash_in_daemon(bcrypt: Bcrypt, socket_path: str) -> None:
+    """
+    Tests async hashes and checks run in the daemon.
+    """
+    daemon = HashingDaemon(socket_path, HashingExecutor(2))
+    await daemon.start()
+    try:
+        pw_hash = await bcrypt.async_generate_password_hash('secret')
+        assert await bcrypt.async_check_password_hash(pw_hash, 'secret')
+        assert not await bcrypt.async_check_password_hash(pw_hash, 'nope')
+        assert bcrypt.check_password_hash(pw_hash, 'secret')
+
+        assert daemon.served == 3
+        assert bcrypt.sidecar.sent == 3
+        assert bcrypt.sidecar.fallbacks == 0
+        stats = await bcrypt.sidecar.stats()
+        assert stats['workers'] == 2 and stats['served'] == 3
+    finally:
+        await bcrypt.sidecar.close()
+        await daemon.close()
+
+
+@pytest.mark.asyncio
+async def test_pipelined(bcrypt: Bcrypt, socket_path: str) -> None:
+    """
+    Tests concurrent requests share one connection
+    and are answered as they finish.
+    """
+    daemon = HashingDaemon(socket_path, HashingExecutor(4))
+    await daemon.start()
+    try:
+        pw_hash = bcrypt.generate_password_hash('secret')
+        results = await asyncio.gather(*(
+            bcrypt.async_check_password_hash(pw_hash, password)
+            for password in ('secret', 'a', 'b', 'c', 'd', 'e')
+            ))
+
+        assert results == [True] + [False] * 5
+        assert daemon.served == 6
+        assert len([c for c in bcrypt.sidecar._pool if c is not None]) == 1
+    finally:
+        await bcrypt.sidecar.close()
+        await daemon.close()
+
+
+@pytest.mark.asyncio
+async def test_connections_opened_once(socket_path: str) -> None:
+    """
+    Tests concurrent first requests share the
+    connections being opened.
+    """
+    daemon = HashingDaemon(socket_path, HashingExecutor(2))
+    handle, opened = daemon._handle, []
+
+    async def counted(reader, writer) -> None:
+        opened.append(writer)
+        await handle(reader, writer)
+
+    daemon._handle = counted
+    await daemon.start()
+    executor = HashingExecutor(1)
+    client = SidecarClient(socket_path, connections=2)
+    try:
+        salt = gensalt(4)
+        futures = await asyncio.gather(*(
+            client.submit(b'secret', salt, lambda: executor.submit(len, b''))
+            for _ in range(10)
+            ))
+        await asyncio.gather(*map(asyncio.wrap_future, futures))
+
+        assert client.sent == 10
+        assert len(opened) == 2
+    finally:
+        await client.close()
+        executor.shutdown()
+        await daemon.close()
+
+
+@pytest.mark.asyncio
+async def test_daemon_error(bcrypt: Bcrypt, socket_path: str) -> None:
+    """
+    Tests errors of the daemon are raised to the
+    caller.
+    """
+    daemon = HashingDaemon(socket_path, HashingExecutor(1))
+    await daemon.start()
+    try:
+        with pytest.raises(ValueError):
+            await bcrypt.async_check_password_hash(b'$2b$06$short', 'secret')
+    finally:
+        await bcrypt.sidecar.close()
+        await daemon.close()
+
+
+@pytest.mark.asyncio
+async def test_fallback_without_daemon(bcrypt: Bcrypt) -> None:
+    """
+    Tests hashes run in process when no daemon is
+    listening.
+    """
+    pw_hash = await bcrypt.async_generate_password_hash('secret')
+
+    assert await bcrypt.async_check_password_hash(pw_hash, 'secret')
+    assert bcrypt.sidecar.sent == 0
+    assert bcrypt.sidecar.fallbacks == 2
+    assert not bcrypt.sidecar.available
+
+
+@pytest.mark.asyncio
+async def test_fallback_daemon_gone(socket_path: str) -> None:
+    """
+    Tests requests in flight when the daemon goes
+    away are run by their fallback.
+    """
+    async def hang_up(reader, writer) -> None:
+        await reader.read(1)
+        writer.close()
+
+    server = await asyncio.start_unix_server(hang_up, socket_path)
+    executor = HashingExecutor(1)
+    client = SidecarClient(socket_path, connections=2)
+    try:
+        future = await client.submit(
+            b'secret', b'salt', lambda: executor.submit(len, b'hashed'))
+
+        assert await asyncio.wrap_future(future) == 6
+        assert client.sent == 1
+        assert not client.available
+    finally:
+        await client.close()
+        executor.shutdown()
+        server.close()
+        await server.wait_closed()
+        os.unlink(socket_path)
+
+
+@pytest.mark.asyncio
+async def test_daemon_socket_private(socket_path: str) -> None:
+    """
+    Tests the daemon only listens in a private
+    directory and never removes other files.
+    """
+    daemon = HashingDaemon(socket_path, HashingExecutor(1))
+    directory = os.path.dirname(socket_path)
+
+    os.chmod(directory, 0o733)
+    with pytest.raises(PermissionError):
+        await daemon.start()
+    os.chmod(directory, 0o700)
+
+    with open(socket_path, 'w') as placeholder:
+        placeholder.write('keep')
+    with pytest.raises(FileExistsError):
+        await daemon.start()
+    os.unlink(socket_path)
+
+    await daemon.start()
+    try:
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+    finally:
+        await daemon.close()
+    assert not os.path.exists(socket_path)
+
+
+@pytest.mark.asyncio
+async def test_untrusted_socket_refused(socket_path: str, caplog) -> None:
+    """
+    Tests no password is sent to something that is
+    not a socket of the current user.
+    """
+    with open(socket_path, 'w'):
+        pass
+    executor = HashingExecutor(1)
+    client = SidecarClient(socket_path)
+    try:
+        future = await client.submit(
+            b'secret', b'salt', lambda: executor.submit(len, b'hashed'))
+
+        assert await asyncio.wrap_future(future) == 6
+        assert client.fallbacks == 1 and not client.available
+        assert 'is not a socket' in caplog.text
+        with pytest.raises(SidecarUnavailable):
+            await client.stats()
+    finally:
+        executor.shutdown()
+        os.unlink(socket_path)
+
+
+@pytest.mark.asyncio
+async def test_foreign_daemon_refused(
+    socket_path: str, monkeypatch, caplog
+) -> None:
+    """
+    Tests a daemon running as another user is not
+    sent any password.
+    """
+    daemon = HashingDaemon(socket_path, HashingExecutor(1))
+    await daemon.start()
+    monkeypatch.setattr(
+        'quart_bcrypt.sidecar.peer_uid', lambda sock: os.getuid() + 1)
+    executor = HashingExecutor(1)
+    client = SidecarClient(socket_path)
+    try:
+        future = await client.submit(
+            b'secret', b'salt', lambda: executor.submit(len, b'hashed'))
+
+        assert await asyncio.wrap_future(future) == 6
+        assert client.sent == 0 and daemon.served == 0
+        assert 'runs as uid' in caplog.text
+    finally:
+        await client.close()
+        executor.shutdown()
+        await daemon.close()
+
+
+@pytest.mark.asyncio
+async def test_daemon_closes_connections(
+    bcrypt: Bcrypt, socket_path: str
+) -> None:
+    """
+    Tests closing the daemon ends the connections
+    waiting for a request.
+    """
+    daemon = HashingDaemon(socket_path, HashingExecutor(1))
+    await daemon.start()
+    try:
+        await bcrypt.async_generate_password_hash('secret')
+        connections = list(daemon._connections)
+        assert len(connections) == 1
+
+        await daemon.close()
+
+        assert not daemon._connections
+        assert all(task.done() for task in connections)
+        assert not os.path.exists(socket_path)
+    finally:
+        await bcrypt.sidecar.close()
+
+
+@pytest.mark.asyncio
+async def test_sidecar_closed_before_pool(
+    app: quart.Quart, extension: Bcrypt, socket_path: str
+) -> None:
+    """
+    Tests requests in flight at shutdown fall back to
+    the pool before it is shut down.
+    """
+    async def silent(reader, writer) -> None:
+        await reader.read()
+        writer.close()
+
+    server = await asyncio.start_unix_server(silent, socket_path)
+    app.config['BCRYPT_SIDECAR_SOCKET'] = socket_path
+    app.config['BCRYPT_WARMUP'] = False
+    extension.init_app(app)
+    try:
+        async with app.test_app():
+            task = asyncio.ensure_future(
+                extension.async_generate_password_hash('secret'))
+            await asyncio.sleep(0.05)
+            assert extension.sidecar.sent == 1
+
+        assert extension.executor._pool is None
+        assert (await task).startswith(b'$2b$')
+    finally:
+        server.close()
+        await server.wait_closed()
+        os.unlink(socket_path)
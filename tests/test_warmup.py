@@ -0,0 +1,79 @@
+"""
+Tests the warm-up of Quart Bcrypt before serving.
+"""
+import logging
+
+import pytest
+import quart
+
+from quart_bcrypt import Bcrypt
+
+
+@pytest.fixture
+def bcrypt(app: quart.Quart, extension: Bcrypt) -> Bcrypt:
+    """
+    Returns a Quart Bcrypt obeject for
+    testing.
+    """
+    app.config['BCRYPT_MAX_WORKERS'] = 2
+    extension.init_app(app)
+
+    return extension
+
+
+@pytest.mark.asyncio
+async def test_warm_up_before_serving(
+    app: quart.Quart, bcrypt: Bcrypt, caplog
+) -> None:
+    """
+    Tests the workers are spawned and a first hash
+    is run before the app starts serving.
+    """
+    caplog.set_level(logging.INFO)
+    assert bcrypt.warmup_time is None
+
+    async with app.test_app():
+        assert len(bcrypt.executor._pool._threads) == 2
+        assert ('2b', 6) in bcrypt._compute_times
+        assert bcrypt.admission.in_flight == 0
+
+    assert bcrypt.warmup_time > 0
+    assert 'Quart-Bcrypt warmed up in' in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_warm_up_disabled(
+    app: quart.Quart, extension: Bcrypt, caplog
+) -> None:
+    """
+    Tests the warm-up is skipped when BCRYPT_WARMUP
+    is False.
+    """
+    caplog.set_level(logging.INFO)
+    app.config['BCRYPT_WARMUP'] = False
+    extension.init_app(app)
+
+    async with app.test_app():
+        assert not extension.executor._pool._threads
+        assert not extension._compute_times
+
+    assert extension.warmup_time is None
+    assert 'warmed up' not in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_warm_up_with_pepper(
+    app: quart.Quart, extension: Bcrypt
+) -> None:
+    """
+    Tests the warm-up checks the dummy hash the way
+    it was made.
+    """
+    app.config['BCRYPT_PEPPERS'] = {'k1': 'secret'}
+    app.config['BCRYPT_HANDLE_LONG_PASSWORDS'] = True
+    extension.init_app(app)
+
+    async with app.test_app():
+        assert extension.dummy_hash.startswith(b'$pepper$k1$2b$06$')
+
+    assert extension.warmup_time > 0